@@ -11,10 +11,70 @@ from .tiles import (
     normalize_hand,
     tiles_to_multiset,
     remove_tiles,
+    NUM_TILE_KINDS,
+    TILE_NAMES,
+    TILE_INDEX,
+    tile_index,
+    wind_index,
+    tile_name,
+    tiles_to_counts,
+    counts_to_tiles,
+    remove_counts,
+    meld_names,
 )
 from .melds import is_pung, is_chow, is_kong
-from .partition import enumerate_partitions, enumerate_sets
-from .scoring import best_score, score_partition
+from .partition import (
+    enumerate_partitions,
+    enumerate_sets,
+    enumerate_partitions_backtrack,
+    iter_partitions,
+    has_partition,
+    count_orderings,
+    partition_counts,
+    PartitionStats,
+    PARTITION_STATS,
+    PARTITIONS_CACHE,
+    SETS_CACHE,
+    configure_partition_cache,
+    partition_cache_info,
+    clear_partition_caches,
+    SUIT_TABLES,
+    load_suit_tables,
+)
+from .cache import BoundedCache
+from .suit_tables import SuitTables, build_suit_tables
+from .features import HandFeatures, PartitionFeatures, clear_feature_caches, hand_features
+from .rules import EXACT, HandRules, Rule, RuleEvaluator, compile_rules
+from .scoring import (
+    EVALUATOR,
+    REGISTRY,
+    RULE_NAMES,
+    SEARCH_MODES,
+    SEARCH_STATS,
+    SearchStats,
+    RESULT_CACHE,
+    configure_result_cache,
+    result_cache_info,
+    clear_result_cache,
+    load_hand_db,
+    best_score,
+    best_score_many,
+    best_score_prepared,
+    meets_min_8,
+    prepare_hand,
+    check_meta,
+    meta_signature,
+    score_partition,
+)
+from .parallel import ParallelScorer, best_score_parallel, encode_hand
+from .server import ScoringServer, ServerMetrics
+from .profiling import Profiler, disable_profiling, enable_profiling, profiling
+from .waits import WAIT_TYPES, wait_completions, waits, waits_counts
+from .shanten import shanten, shanten_counts
+from .session import HandSession
+from .montecarlo import estimate_hand
+from .ledger import MatchLedger, parse_rounds, settle
+from .hand_db import HandDB, build_hand_db, complete_hands
 
 __all__ = [
     'SUITS',
@@ -29,13 +89,89 @@ __all__ = [
     'normalize_hand',
     'tiles_to_multiset',
     'remove_tiles',
+    'NUM_TILE_KINDS',
+    'TILE_NAMES',
+    'TILE_INDEX',
+    'tile_index',
+    'wind_index',
+    'tile_name',
+    'tiles_to_counts',
+    'counts_to_tiles',
+    'remove_counts',
+    'meld_names',
     'is_pung',
     'is_chow',
     'is_kong',
     'enumerate_partitions',
     'enumerate_sets',
+    'enumerate_partitions_backtrack',
+    'iter_partitions',
+    'has_partition',
+    'count_orderings',
+    'partition_counts',
+    'PartitionStats',
+    'PARTITION_STATS',
+    'PARTITIONS_CACHE',
+    'SETS_CACHE',
+    'configure_partition_cache',
+    'partition_cache_info',
+    'clear_partition_caches',
+    'BoundedCache',
+    'SUIT_TABLES',
+    'load_suit_tables',
+    'SuitTables',
+    'build_suit_tables',
+    'HandDB',
+    'build_hand_db',
+    'complete_hands',
+    'load_hand_db',
+    'HandFeatures',
+    'PartitionFeatures',
+    'hand_features',
+    'clear_feature_caches',
     'best_score',
+    'best_score_many',
+    'best_score_prepared',
+    'meets_min_8',
+    'prepare_hand',
+    'check_meta',
+    'ParallelScorer',
+    'best_score_parallel',
+    'encode_hand',
+    'ScoringServer',
+    'ServerMetrics',
+    'Profiler',
+    'enable_profiling',
+    'disable_profiling',
+    'profiling',
+    'meta_signature',
     'score_partition',
+    'Rule',
+    'RuleEvaluator',
+    'HandRules',
+    'EXACT',
+    'EVALUATOR',
+    'SEARCH_MODES',
+    'SEARCH_STATS',
+    'SearchStats',
+    'RESULT_CACHE',
+    'configure_result_cache',
+    'result_cache_info',
+    'clear_result_cache',
+    'compile_rules',
+    'REGISTRY',
+    'RULE_NAMES',
+    'WAIT_TYPES',
+    'wait_completions',
+    'waits',
+    'waits_counts',
+    'shanten',
+    'shanten_counts',
+    'HandSession',
+    'estimate_hand',
+    'MatchLedger',
+    'parse_rounds',
+    'settle',
 ]
 
 
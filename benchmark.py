@@ -0,0 +1,343 @@
+"""
+Benchmark suite for best_score over a checked-in, categorized hand corpus.
+
+bench_corpus.jsonl holds one {"category", "hand", "meta"} record per line, made by
+generate_corpus with a fixed seed (regenerate it with --generate after changing the
+generator). CATEGORIES:
+
+    chicken      mixed suits, honors, chows and pungs
+    all_chows    four chows and a suited pair
+    flush        one suit, with or without honors
+    kong_shapes  tiles held four times (a pung plus a chow of the same tile)
+    nine_gates   Nine Gates shapes and other one-suit hands with the most partitions
+    special      Lesser Honors and Knitted Tiles, Thirteen Orphans, seven pairs
+
+run_benchmark reports hands/sec of best_score overall and per category, the time
+of each pipeline stage on its own (partitioning, features, rule evaluation,
+exclusions), and peak memory, as a JSON-serializable dict. Partitioning is also
+timed with the in-place backtracking engine (partition_backtrack). clear_caches()
+runs before every pass, so each pass scores the corpus cold; the best of `repeat`
+passes is kept.
+
+    python benchmark.py -o new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import partition
+import scoring
+from features import PartitionFeatures, clear_feature_caches, hand_features
+from partition import clear_partition_caches, enumerate_partitions, enumerate_partitions_backtrack
+from scoring import EVALUATOR, best_score, clear_result_cache, prepare_hand
+from suit_tables import suit_decompositions
+from tiles import TILE_NAMES
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_corpus.jsonl')
+CATEGORIES = ('chicken', 'all_chows', 'flush', 'kong_shapes', 'nine_gates', 'special')
+STAGES = ('partition', 'partition_backtrack', 'features', 'rules', 'exclusions')
+
+_SUITS = 'BCD'
+_HONORS = TILE_NAMES[27:]
+_WINDS = ('E', 'S', 'W', 'N')
+_TERMINALS_HONORS = tuple(f"{s}{r}" for s in _SUITS for r in (1, 9)) + _HONORS
+
+
+# ------------------------------
+# corpus
+# ------------------------------
+def _chow(rng, suits):
+    s = rng.choice(suits)
+    r = rng.randint(1, 7)
+    return [f"{s}{r}", f"{s}{r + 1}", f"{s}{r + 2}"]
+
+
+def _tile(rng, suits, honors):
+    if honors and rng.random() < 0.3:
+        return rng.choice(_HONORS)
+    return f"{rng.choice(suits)}{rng.randint(1, 9)}"
+
+
+def _standard(rng, suits, honors, chow_p):
+    """A random 4 sets + pair hand with no tile more than four times."""
+    while True:
+        hand = []
+        for _ in range(4):
+            hand += _chow(rng, suits) if rng.random() < chow_p else [_tile(rng, suits, honors)] * 3
+        hand += [_tile(rng, suits, honors)] * 2
+        if max(hand.count(t) for t in hand) <= 4:
+            return hand
+
+
+def _kong_shape(rng):
+    while True:
+        hand = []
+        for _ in range(2):
+            s = rng.choice(_SUITS)
+            r = rng.randint(1, 7)
+            hand += [f"{s}{r}"] * 4 + [f"{s}{r + 1}", f"{s}{r + 2}"]
+        hand += [_tile(rng, _SUITS, True)] * 2
+        if max(hand.count(t) for t in hand) <= 4 and sum(hand.count(t) == 4 for t in set(hand)) >= 2:
+            return hand
+
+
+def _rank_vectors(i=0, left=14):
+    if i == 9:
+        if not left:
+            yield ()
+        return
+    for n in range(min(4, left) + 1):
+        for rest in _rank_vectors(i + 1, left - n):
+            yield (n,) + rest
+
+
+def _partition_heavy(n):
+    """The n one-suit hands with the most partitions, most first, cycling through the suits."""
+    ranked = []
+    for v in _rank_vectors():
+        parts = 0
+        for r in range(9):
+            if v[r] >= 2:
+                parts += len(suit_decompositions(v[:r] + (v[r] - 2,) + v[r + 1:]))
+        if parts:
+            ranked.append((-parts, v))
+    ranked.sort()
+    return [[f"{_SUITS[k % 3]}{r + 1}" for r in range(9) for _ in range(v[r])] for k, (_, v) in enumerate(ranked[:n])]
+
+
+def _special(rng, i):
+    kind = i % 3
+    if kind == 0:
+        order = rng.sample(_SUITS, 3)
+        knitted = [f"{s}{r}" for s, start in zip(order, (1, 2, 3)) for r in range(start, 10, 3)]
+        return knitted + rng.sample(_HONORS, 5)
+    if kind == 1:
+        return list(_TERMINALS_HONORS) + [rng.choice(_TERMINALS_HONORS)]
+    return [t for t in rng.sample(TILE_NAMES, 7) for _ in range(2)]
+
+
+def _meta(rng):
+    return {
+        'seat_wind': rng.choice(_WINDS),
+        'prevalent_wind': rng.choice(_WINDS),
+        'win_by': rng.choice(('self', 'discard')),
+        'melds_open': rng.random() < 0.35,
+        'wait_type': rng.choice((None, 'edge', 'closed', 'pair', 'open')),
+    }
+
+
+def generate_corpus(per_category=50, seed=2024):
+    """[(category, hand, meta)] with per_category hands of each of CATEGORIES."""
+    rng = random.Random(seed)
+    gates = [f"{s}{r}" for s in _SUITS for r in (1, 1, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9)]
+    nine_gates = [gates[13 * k:13 * k + 13] + [f"{_SUITS[k]}{r}"] for k in range(3) for r in range(1, 10)]
+    hands = {
+        'chicken': [_standard(rng, _SUITS, True, 0.5) for _ in range(per_category)],
+        'all_chows': [sum((_chow(rng, _SUITS) for _ in range(4)), []) + [_tile(rng, _SUITS, False)] * 2
+                      for _ in range(per_category)],
+        'flush': [_standard(rng, rng.choice(_SUITS), rng.random() < 0.5, 0.6) for _ in range(per_category)],
+        'kong_shapes': [_kong_shape(rng) for _ in range(per_category)],
+        'nine_gates': (nine_gates + _partition_heavy(per_category))[:per_category],
+        'special': [_special(rng, i) for i in range(per_category)],
+    }
+    corpus = []
+    for category in CATEGORIES:
+        for hand in hands[category]:
+            meta = _meta(rng)
+            if rng.random() < 0.2:
+                hand = hand + [f"F{rng.randint(1, 4)}"]
+            corpus.append((category, hand, meta))
+    return corpus
+
+
+def write_corpus(corpus, path=CORPUS_PATH):
+    with open(path, 'w', encoding='utf-8') as fp:
+        for category, hand, meta in corpus:
+            fp.write(json.dumps({'category': category, 'hand': hand, 'meta': meta}) + '\n')
+
+
+def load_corpus(path=CORPUS_PATH):
+    """[(category, hand, meta)] from a corpus file."""
+    with open(path, encoding='utf-8') as fp:
+        records = [json.loads(line) for line in fp if line.strip()]
+    return [(r['category'], r['hand'], r['meta']) for r in records]
+
+
+# ------------------------------
+# timing
+# ------------------------------
+def clear_caches():
+    """Empty every memo scoring fills as it goes, so the next pass runs cold.
+
+    That is the partition and result caches, hand_features and the chow_rule memos,
+    and the suit tables' per-suit lookups. EVALUATOR's compiled rule groups (one per
+    combination of passing preconditions) are kept, as in any long-running scorer.
+    """
+    clear_partition_caches()
+    clear_result_cache()
+    clear_feature_caches()
+    if partition.SUIT_TABLES is not None:
+        partition.SUIT_TABLES.lookup.cache_clear()
+
+
+def _best_of(repeat, run):
+    """Fastest of `repeat` calls of run(), with clear_caches() before each."""
+    best = None
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _time_stages(prepared, repeat):
+    """{stage: seconds} running each stage over the whole corpus, fed by the previous one."""
+    counts_list = [counts for counts, _ in prepared]
+    parts_list = [enumerate_partitions(counts) for counts in counts_list]
+    hands = [hand_features(tuple(counts)) for counts in counts_list]
+    features = [[PartitionFeatures(sets, pair, hand) for sets, pair in parts]
+                for parts, hand in zip(parts_list, hands)]
+    bound = [(EVALUATOR.bind(hand, meta), meta) for hand, (_, meta) in zip(hands, prepared)]
+    hits = [(rules, [rules.partition_hits(f, meta) for f in feats]) for (rules, meta), feats in zip(bound, features)]
+
+    def partition():
+        for counts in counts_list:
+            enumerate_partitions(counts)
+
+    def partition_backtrack():
+        for counts in counts_list:
+            enumerate_partitions_backtrack(counts)
+
+    def build_features():
+        for parts, counts in zip(parts_list, counts_list):
+            hand = hand_features(tuple(counts))
+            for sets, pair in parts:
+                PartitionFeatures(sets, pair, hand)
+
+    def rules():
+        for hand, feats, (_, meta) in zip(hands, features, prepared):
+            bound_rules = EVALUATOR.bind(hand, meta)
+            for f in feats:
+                bound_rules.partition_hits(f, meta)
+
+    def exclusions():
+        for bound_rules, partition_hits in hits:
+            for part_hits in partition_hits:
+                bound_rules.exclusions(part_hits)
+
+    return {
+        'partition': _best_of(repeat, partition),
+        'partition_backtrack': _best_of(repeat, partition_backtrack),
+        'features': _best_of(repeat, build_features),
+        'rules': _best_of(repeat, rules),
+        'exclusions': _best_of(repeat, exclusions),
+    }
+
+
+def _peak_memory(corpus):
+    clear_caches()
+    tracemalloc.start()
+    try:
+        for _, hand, meta in corpus:
+            best_score(hand, meta)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(corpus=None, repeat=3):
+    """Benchmark report (a JSON-serializable dict) for corpus (default: the checked-in one)."""
+    if corpus is None:
+        corpus = load_corpus()
+    prepared = []
+    for _, hand, meta in corpus:
+        counts, flowers = prepare_hand(hand)
+        prepared.append((counts, dict(meta, flowers=flowers)))
+
+    by_category = {}
+    for (category, hand, meta), (counts, _) in zip(corpus, prepared):
+        by_category.setdefault(category, []).append((hand, meta, len(enumerate_partitions(counts))))
+    categories = {}
+    for category, items in by_category.items():
+        def score(items=items):
+            for hand, meta, _ in items:
+                best_score(hand, meta)
+        seconds = _best_of(repeat, score)
+        categories[category] = {
+            'hands': len(items),
+            'seconds': seconds,
+            'hands_per_sec': len(items) / seconds,
+            'mean_partitions': sum(n for _, _, n in items) / len(items),
+        }
+    total = sum(c['seconds'] for c in categories.values())
+    stages = _time_stages(prepared, repeat)
+    return {
+        'engine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'suit_tables': partition.SUIT_TABLES is not None,
+            'hand_db': scoring.HAND_DB is not None,
+            'result_cache': scoring.RESULT_CACHE.max_entries != 0,
+        },
+        'repeat': repeat,
+        'hands': len(corpus),
+        'best_score': {'seconds': total, 'hands_per_sec': len(corpus) / total, 'categories': categories},
+        'stages': {name: {'seconds': s, 'us_per_hand': 1e6 * s / len(corpus)} for name, s in stages.items()},
+        'memory': {
+            'tracemalloc_peak_bytes': _peak_memory(corpus),
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+    }
+
+
+def compare_reports(old, new):
+    """{metric: speedup of new over old} (above 1 is faster) for best_score, each category and each stage."""
+    out = {'best_score': old['best_score']['seconds'] / new['best_score']['seconds']}
+    old_categories = old['best_score']['categories']
+    for category, c in new['best_score']['categories'].items():
+        if category in old_categories:
+            out[f'best_score.{category}'] = old_categories[category]['seconds'] / c['seconds']
+    for stage, s in new['stages'].items():
+        if stage in old['stages']:
+            out[f'stages.{stage}'] = old['stages'][stage]['seconds'] / s['seconds']
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark best_score on the hand corpus.")
+    ap.add_argument('--corpus', default=CORPUS_PATH, help="corpus .jsonl (default: bench_corpus.jsonl)")
+    ap.add_argument('--repeat', type=int, default=3, help="passes per measurement; the fastest is kept")
+    ap.add_argument('-o', '--output', default='-', help="report .json (default: stdout)")
+    ap.add_argument('--compare', metavar='REPORT', help="print ratios against an earlier report to stderr")
+    ap.add_argument('--generate', action='store_true', help="regenerate the corpus file and exit")
+    args = ap.parse_args(argv)
+
+    if args.generate:
+        write_corpus(generate_corpus(), args.corpus)
+        return 0
+    report = run_benchmark(load_corpus(args.corpus), repeat=args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            fp.write(text + '\n')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fp:
+            old = json.load(fp)
+        for metric, ratio in compare_reports(old, report).items():
+            print(f"{metric}: {ratio:.2f}x", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Bounded, observable caches used by the partitioner and the result cache.
+
+BoundedCache is a small key/value store with an entry limit, a byte budget, an
+optional time-to-live and either LRU or LFU eviction. It counts hits, misses,
+evictions and expirations so long-running workers can check that memory stays
+flat while the hit rate stays high.
+
+Byte sizes are estimates supplied by a sizeof(key, value) callable; they only
+need to be consistent, not exact.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+POLICIES = ('lru', 'lfu')
+
+_MISSING = object()
+
+
+def shallow_sizeof(key, value):
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class BoundedCache:
+    """Cache with optional max_entries / max_bytes limits and 'lru' or 'lfu' eviction.
+
+    A limit of None means unbounded; max_entries=0 disables caching entirely.
+    With ttl (seconds, measured by clock) an entry expires that long after it was put;
+    expired entries count as misses and are dropped on lookup or when a later put runs.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 policy: str = 'lru', sizeof: Callable[[Any, Any], int] = shallow_sizeof,
+                 ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy!r} (expected one of {POLICIES})")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._reset_storage()
+
+    def _reset_storage(self):
+        self._data = {}
+        self._sizes = {}
+        self.nbytes = 0
+        # lru: recency order; lfu: frequency -> keys in insertion/recency order
+        self._order = OrderedDict()
+        self._freq = {}
+        self._buckets = {}
+        self._min_freq = 0
+        # key -> expiry time, in put order (expiry order while the ttl is unchanged)
+        self._expires = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key: Hashable, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        deadline = self._expires.get(key) if self._expires else None
+        if deadline is not None and deadline <= self.clock():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.policy == 'lru':
+            self._order.move_to_end(key)
+        else:
+            self._touch_lfu(key)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        if self.max_entries == 0:
+            return
+        size = self.sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would never fit; don't flush the cache for it
+        if key in self._data:
+            self._discard(key)
+        if self.ttl is not None:
+            self._expire()
+        # make room first so a fresh LFU entry is not its own eviction victim
+        self._shrink(extra_entries=1, extra_bytes=size)
+        self._data[key] = value
+        self._sizes[key] = size
+        self.nbytes += size
+        if self.ttl is not None:
+            self._expires[key] = self.clock() + self.ttl
+        if self.policy == 'lru':
+            self._order[key] = None
+        else:
+            self._freq[key] = 1
+            self._buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_freq = 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._reset_storage()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def resize(self, max_entries=_MISSING, max_bytes=_MISSING, ttl=_MISSING) -> None:
+        """Change the limits in place, evicting immediately if the cache is now over them.
+
+        A new ttl applies to entries put from now on.
+        """
+        if max_entries is not _MISSING:
+            self.max_entries = max_entries
+        if max_bytes is not _MISSING:
+            self.max_bytes = max_bytes
+        if ttl is not _MISSING:
+            self.ttl = ttl
+        if self.max_entries == 0:
+            self._reset_storage()
+            return
+        self._shrink()
+
+    def set_policy(self, policy: str) -> None:
+        """Switch eviction policy; entries are dropped, counters are kept."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy!r} (expected one of {POLICIES})")
+        if policy != self.policy:
+            self.policy = policy
+            self._reset_storage()
+
+    def info(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'policy': self.policy,
+            'entries': len(self._data),
+            'bytes': self.nbytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    # ------------------------------
+    # internals
+    # ------------------------------
+    def _touch_lfu(self, key):
+        f = self._freq[key]
+        bucket = self._buckets[f]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[f]
+            if self._min_freq == f:
+                self._min_freq = f + 1
+        self._freq[key] = f + 1
+        self._buckets.setdefault(f + 1, OrderedDict())[key] = None
+
+    def _discard(self, key):
+        del self._data[key]
+        self.nbytes -= self._sizes.pop(key)
+        self._expires.pop(key, None)
+        if self.policy == 'lru':
+            del self._order[key]
+        else:
+            f = self._freq.pop(key)
+            bucket = self._buckets[f]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[f]
+                if self._min_freq == f:
+                    self._min_freq = min(self._buckets) if self._buckets else 0
+
+    def _expire(self):
+        now = self.clock()
+        expires = self._expires
+        while expires:
+            key, deadline = next(iter(expires.items()))
+            if deadline > now:
+                break
+            self._discard(key)
+            self.expirations += 1
+
+    def _victim(self):
+        if self.policy == 'lru':
+            return next(iter(self._order))
+        return next(iter(self._buckets[self._min_freq]))
+
+    def _over_limit(self, extra_entries, extra_bytes):
+        if self.max_entries is not None and len(self._data) + extra_entries > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.nbytes + extra_bytes > self.max_bytes
+
+    def _shrink(self, extra_entries=0, extra_bytes=0):
+        while self._data and self._over_limit(extra_entries, extra_bytes):
+            self._discard(self._victim())
+            self.evictions += 1
@@ -0,0 +1,180 @@
+"""
+Streaming JSON Lines scorer.
+
+Reads one record per line, {"hand": [...], "meta": {...}} (optionally with an "id"),
+and writes one result per line:
+
+    {"line": 1, "id": ..., "result": {...best_score result...}}
+    {"line": 2, "error": "..."}
+
+Input and output are streamed through generators in chunks, so memory stays flat
+regardless of input size. Files ending in .gz are (de)compressed transparently;
+gzip on stdin is detected from its magic bytes.
+
+    python cli.py games.jsonl.gz -o scores.jsonl.gz --workers 8 --progress 10
+    cat hands.jsonl | python cli.py > scores.jsonl
+"""
+
+import argparse
+import gzip
+import io
+import json
+import sys
+import time
+from collections import deque
+from itertools import islice, tee
+
+from scoring import best_score_many, check_meta, prepare_hand
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def open_input(path):
+    """Open path ('-' for stdin) for text reading, decompressing gzip input."""
+    if path in (None, '-'):
+        raw = sys.stdin.buffer
+        if raw.peek(2)[:2] == GZIP_MAGIC:
+            raw = gzip.GzipFile(fileobj=raw, mode='rb')
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def open_output(path, compress=False):
+    """Open path ('-' for stdout) for text writing; .gz paths or compress=True write gzip."""
+    if path in (None, '-'):
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'), encoding='utf-8')
+        return sys.stdout
+    if compress or path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def parse_records(lines):
+    """Yield (line_no, record, error) for every non-blank line; exactly one of record/error is set."""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(rec, dict) or not isinstance(rec.get('hand'), list):
+            yield line_no, None, "Record must be an object with a 'hand' list."
+            continue
+        if not isinstance(rec.get('meta', {}), dict):
+            yield line_no, None, "'meta' must be an object."
+            continue
+        yield line_no, rec, None
+
+
+def _local_imap(pairs, chunk_size):
+    """Single-process counterpart of ParallelScorer.imap(ordered=True), chunk by chunk."""
+    index = 0
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return
+        for result in best_score_many([h for h, _ in chunk], [m for _, m in chunk]):
+            yield index, result
+            index += 1
+
+
+def score_records(records, workers=1, chunk_size=256):
+    """Yield one output dict per parsed record, in input order.
+
+    Invalid records become {"line", "error"} outputs and never reach the scorer; the
+    rest stream through best_score_many (workers=1) or a ParallelScorer.
+    """
+    # entries waiting for output, in input order; bounded by the scorer's read-ahead
+    queue = deque()
+
+    def valid_pairs():
+        for line_no, rec, error in records:
+            if error is None:
+                try:
+                    prepare_hand(rec['hand'])
+                    check_meta(rec.get('meta', {}))
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                queue.append({'line': line_no, 'error': error})
+                continue
+            out = {'line': line_no}
+            if 'id' in rec:
+                out['id'] = rec['id']
+            queue.append(out)
+            yield rec['hand'], rec.get('meta', {})
+
+    scorer = None
+    if workers > 1:
+        from parallel import ParallelScorer
+        scorer = ParallelScorer(workers=workers, chunk_size=chunk_size)
+        # imap pulls hands and metas in lockstep, so the tee never buffers more than one pair
+        a, b = tee(valid_pairs())
+        results = scorer.imap((h for h, _ in a), (m for _, m in b), ordered=True)
+    else:
+        results = _local_imap(valid_pairs(), chunk_size)
+    try:
+        for _, result in results:
+            while 'error' in queue[0]:
+                yield queue.popleft()
+            out = queue.popleft()
+            out['result'] = result
+            yield out
+        while queue:
+            yield queue.popleft()
+    finally:
+        if scorer is not None:
+            scorer.close()
+
+
+def write_results(outputs, fp, progress=None, log=sys.stderr):
+    """Write outputs as JSON Lines; every `progress` seconds report throughput to log."""
+    count = 0
+    start = last = time.perf_counter()
+    for out in outputs:
+        fp.write(json.dumps(out, separators=(',', ':')))
+        fp.write('\n')
+        count += 1
+        if progress:
+            now = time.perf_counter()
+            if now - last >= progress:
+                last = now
+                print(f"{count} records, {count / (now - start):.0f} records/s", file=log)
+    if progress:
+        elapsed = time.perf_counter() - start
+        print(f"done: {count} records in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} records/s)",
+              file=log)
+    return count
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Score Mahjong hands from JSON Lines.")
+    ap.add_argument('input', nargs='?', default='-', help="input .jsonl or .jsonl.gz (default: stdin)")
+    ap.add_argument('-o', '--output', default='-', help="output .jsonl or .jsonl.gz (default: stdout)")
+    ap.add_argument('--gzip', action='store_true', help="gzip the output even without a .gz suffix")
+    ap.add_argument('--workers', type=int, default=1, help="scoring processes (default: 1, in-process)")
+    ap.add_argument('--chunk-size', type=int, default=256, help="hands per scoring chunk")
+    ap.add_argument('--progress', type=float, default=0, metavar='SECONDS',
+                    help="report throughput to stderr every SECONDS")
+    args = ap.parse_args(argv)
+
+    with open_input(args.input) as fin:
+        fout = open_output(args.output, compress=args.gzip)
+        try:
+            outputs = score_records(parse_records(fin), workers=args.workers, chunk_size=args.chunk_size)
+            write_results(outputs, fout, progress=args.progress)
+        finally:
+            if fout is sys.stdout:
+                fout.flush()
+            else:
+                fout.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ Provide a single entry point: process_exclusions(breakdown: dict) -> dict
 It removes keys from breakdown that are excluded by any present rule.
 
 Rule names must match those used in breakdown from score_partition.
+scoring compiles EXCLUSIONS into per-rule bitmasks (rules.compile_exclusions) and
+applies them before totalling, so score_partition's results are already excluded.
 """
 
 from typing import Dict
@@ -79,13 +81,13 @@ EXCLUSIONS = {
         'Two Melded Kongs',
     },
     'Last Tile Draw': {
-        'Self-Drawn',
+        'Self Drawn',
     },
     'Last Tile Claim': {
         'Concealed Hand (won by discard)',
     },
     'Out with Replacement Tile': {
-        'Self-Drawn',
+        'Self Drawn',
     },
     'Robbing the Kong': {
         'Concealed Hand (won by discard)',
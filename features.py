@@ -0,0 +1,136 @@
+"""
+Features shared by every points/ tier module.
+
+HandFeatures depends only on the hand's count vector and is computed once per hand.
+PartitionFeatures is computed once per (sets, pair) in score_partition and carries
+what the rules used to recompute individually: chow starts (as a sorted signature
+and per-suit bitmasks), pung/kong tile bitmasks and dragon/wind pung counts.
+
+Bitmasks use bit i for tile index i (see tiles.TILE_NAMES); per-suit chow masks
+use bit r-1 for a chow starting at rank r.
+"""
+
+from functools import lru_cache
+
+from tiles import DRAGON_IDS, HONOR_IDS, IDX_RANK, IDX_SUIT, TERMINAL_HONOR_IDS, TERMINAL_IDS, WIND_IDS
+
+
+def ids_mask(ids):
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+def popcount(x):
+    return bin(x).count('1')
+
+
+TERMINAL_MASK = ids_mask(TERMINAL_IDS)
+HONOR_MASK = ids_mask(HONOR_IDS)
+WIND_MASK = ids_mask(WIND_IDS)
+DRAGON_MASK = ids_mask(DRAGON_IDS)
+TERMINAL_HONOR_MASK = ids_mask(TERMINAL_HONOR_IDS)
+SUIT_MASKS = (0x1FF, 0x1FF << 9, 0x1FF << 18)
+
+
+def suit_bits(mask, s):
+    """The 9 rank bits (bit r-1 for rank r) of suit s in a tile bitmask."""
+    return (mask >> (9 * s)) & 0x1FF
+
+
+class HandFeatures:
+    """Tile-level facts about a hand's count vector."""
+
+    __slots__ = ('counts', 'tile_mask', 'four_mask', 'n_suits', 'has_honor', 'has_terminal_honor')
+
+    def __init__(self, counts):
+        self.counts = counts
+        mask = four = 0
+        for i, n in enumerate(counts):
+            if n:
+                mask |= 1 << i
+                if n == 4:
+                    four |= 1 << i
+        self.tile_mask = mask
+        self.four_mask = four
+        self.n_suits = sum(1 for m in SUIT_MASKS if mask & m)
+        self.has_honor = bool(mask & HONOR_MASK)
+        self.has_terminal_honor = bool(mask & TERMINAL_HONOR_MASK)
+
+
+@lru_cache(maxsize=1024)
+def hand_features(counts):
+    """HandFeatures for a count vector (tuple), cached since every partition of a hand shares it."""
+    return HandFeatures(counts)
+
+
+class PartitionFeatures:
+    """Meld-level facts about one (sets, pair) of a hand.
+
+    chow_sig is the sorted tuple of chow start tile indices; rules that only look at
+    chows are memoized on it, since the same signature recurs across hands.
+    pung_mask covers pungs and kongs (every set of identical tiles), kong_mask kongs only.
+    """
+
+    __slots__ = ('sets', 'pair', 'hand', 'counts', 'chow_sig', 'chow_masks', 'n_chows', 'pung_mask', 'kong_mask',
+                 'n_pungs', 'n_kongs', 'n_dragon_pungs', 'n_wind_pungs')
+
+    def __init__(self, sets, pair, hand):
+        self.sets = sets
+        self.pair = pair
+        self.hand = hand
+        self.counts = hand.counts
+        starts = []
+        chow_masks = [0, 0, 0]
+        pungs = kongs = 0
+        n_pungs = n_kongs = 0
+        for s in sets:
+            t = s[0]
+            if s[1] == t:
+                pungs |= 1 << t
+                n_pungs += 1
+                if len(s) == 4:
+                    kongs |= 1 << t
+                    n_kongs += 1
+            else:
+                starts.append(t)
+                chow_masks[IDX_SUIT[t]] |= 1 << (IDX_RANK[t] - 1)
+        starts.sort()
+        self.chow_sig = tuple(starts)
+        self.chow_masks = chow_masks
+        self.n_chows = len(starts)
+        self.pung_mask = pungs
+        self.kong_mask = kongs
+        self.n_pungs = n_pungs
+        self.n_kongs = n_kongs
+        self.n_dragon_pungs = popcount(pungs & DRAGON_MASK)
+        self.n_wind_pungs = popcount(pungs & WIND_MASK)
+
+
+# Rules that only look at chows take a chow signature and are memoized on it. A
+# signature is a multiset of at most 4 of the 21 chow starts, a small fixed set, so
+# the caches need no bound.
+CHOW_RULES = []
+
+
+def chow_rule(fn):
+    """Memoize a chow-signature rule, registered in CHOW_RULES."""
+    cached = lru_cache(maxsize=None)(fn)
+    CHOW_RULES.append(cached)
+    return cached
+
+
+def clear_feature_caches():
+    """Empty the hand_features and chow_rule memos (e.g. to time scoring cold)."""
+    hand_features.cache_clear()
+    for fn in CHOW_RULES:
+        fn.cache_clear()
+
+
+def chow_starts_by_suit(chow_sig):
+    """{suit: [start ranks...]} for a chow signature, with repeats kept."""
+    by_suit = {}
+    for t in chow_sig:
+        by_suit.setdefault(IDX_SUIT[t], []).append(IDX_RANK[t])
+    return by_suit
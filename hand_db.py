@@ -0,0 +1,226 @@
+"""
+Indexed on-disk database of complete concealed 14-tile hands.
+
+Every multiset of 14 tiles that splits into 4 sets and a pair (11,498,658 of them)
+gets one record: its partitions, in enumerate_partitions order, and the hits of the
+TILES rules, which depend on the tiles alone. scoring.best_score consults a loaded
+database instead of enumerating partitions and evaluating TILES rules, and falls
+back to the search for hands that are not in it.
+
+File layout (little-endian unless noted):
+    header   MAGIC, u32 version, u32 number of hands, u32 data bytes, u32 rule registry size
+    keys     KEY_BYTES per hand, ascending: the count vector as a base-5 number, big-endian
+    offsets  u32 per hand + 1: start of its record in data
+    data     per hand: u8 partitions, then per partition the pair tile and 4 meld codes;
+             u8 hits, then per hit u8 rule id and u8 points
+
+Meld codes are the chow's first tile index, or NUM_TILE_KINDS + tile index for a pung.
+Keys sort like the count vectors, so lookups binary-search the mapped key array.
+
+The full database is about 250 MB and takes around ten minutes to build, so it is not
+checked in:
+
+    python hand_db.py hands.db            # every complete hand
+    python hand_db.py hands.db corpus.jsonl  # only the hands in a JSON Lines file
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from features import hand_features
+from partition import enumerate_partitions
+from scoring import EVALUATOR
+from suit_tables import suit_decompositions
+from tiles import NUM_TILE_KINDS, normalize_hand, tiles_to_counts
+
+MAGIC = b'MJHD'
+VERSION = 1
+KEY_BYTES = 10  # 5 ** 34 < 2 ** 80
+
+_HEADER = struct.Struct('<4sIIII')
+
+
+def hand_key(counts):
+    """KEY_BYTES-byte key of a 34-slot count vector; keys sort like the vectors."""
+    key = 0
+    for n in counts:
+        key = key * 5 + n
+    return key.to_bytes(KEY_BYTES, 'big')
+
+
+def _vectors(size, total):
+    if size == 0:
+        yield ()
+        return
+    for n in range(min(4, total) + 1):
+        for rest in _vectors(size - 1, total - n):
+            yield (n,) + rest
+
+
+def _components():
+    """Sorted [(counts, sets, pair)] of the suit and of the honor vectors that can be part of a complete hand."""
+    suits = []
+    for v in _vectors(9, 14):
+        n = sum(v)
+        if n % 3 == 0 and suit_decompositions(v):
+            suits.append((bytes(v), n // 3, 0))
+        elif n % 3 == 2 and any(v[r] >= 2 and suit_decompositions(v[:r] + (v[r] - 2,) + v[r + 1:])
+                                for r in range(9)):
+            suits.append((bytes(v), n // 3, 1))
+    honors = []
+    for v in _vectors(7, 14):
+        if all(n in (0, 2, 3) for n in v) and v.count(2) <= 1:
+            honors.append((bytes(v), v.count(3), v.count(2)))
+    return suits, honors
+
+
+def complete_hands():
+    """Yield the count vector (bytes) of every complete 14-tile hand, in key order."""
+    suits, honors = _components()
+    # (sets, pair) left -> suit vectors that fit, in key order; honor vectors that use exactly that
+    fitting = {(s, p): [v for v in suits if v[1] <= s and v[2] <= p] for s in range(5) for p in range(2)}
+    by_shape = {}
+    for v, sets, pair in honors:
+        by_shape.setdefault((sets, pair), []).append(v)
+    for b, sb, pb in suits:
+        for c, sc, pc in fitting[4 - sb, 1 - pb]:
+            for d, sd, pd in fitting[4 - sb - sc, 1 - pb - pc]:
+                for h in by_shape[4 - sb - sc - sd, 1 - pb - pc - pd]:
+                    yield b + c + d + h
+
+
+def _encode(counts):
+    parts = enumerate_partitions(counts)
+    hits = EVALUATOR.tile_hits(hand_features(tuple(counts)))
+    out = bytearray((len(parts),))
+    for sets, pair in parts:
+        out.append(pair[0])
+        for m in sets:
+            out.append(m[0] + NUM_TILE_KINDS if m[0] == m[1] else m[0])
+    out.append(len(hits))
+    for i, pts in hits:
+        out += bytes((i, pts))
+    return out
+
+
+def build_hand_db(path, hands=None, progress=None, log=sys.stderr):
+    """Write the database of hands (count vectors; default: every complete hand) to path.
+
+    Hands without a standard partition are left out. Returns the number of hands written.
+    """
+    if hands is None:
+        hands = complete_hands()
+    else:
+        hands = sorted({bytes(h) for h in hands}, key=hand_key)
+    tmp_data = path + '.data'
+    keys = bytearray()
+    offsets = array('I', [0])
+    with open(tmp_data, 'wb') as data:
+        size = 0
+        for counts in hands:
+            if sum(counts) != 14 or not enumerate_partitions(counts):
+                continue
+            record = _encode(counts)
+            data.write(record)
+            size += len(record)
+            keys += hand_key(counts)
+            offsets.append(size)
+            if progress and len(offsets) % progress == 0:
+                print(f"{len(offsets) - 1} hands", file=log)
+    n = len(offsets) - 1
+    with open(path, 'wb') as fp, open(tmp_data, 'rb') as data:
+        fp.write(_HEADER.pack(MAGIC, VERSION, n, size, EVALUATOR.size))
+        fp.write(keys)
+        offsets.tofile(fp)
+        while True:
+            chunk = data.read(1 << 20)
+            if not chunk:
+                break
+            fp.write(chunk)
+    os.remove(tmp_data)
+    return n
+
+
+class HandDB:
+    """A memory-mapped hand database; get(counts) -> (partitions, TILES rule hits) or None."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, n_data, n_rules = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a version {VERSION} hand database")
+        if n_rules != EVALUATOR.size:
+            self._mm.close()
+            raise ValueError(f"{path}: built for {n_rules} rules, registry has {EVALUATOR.size}; rebuild it")
+        self.n_hands = n
+        self.nbytes = len(self._mm)
+        self._keys = _HEADER.size
+        self._view = memoryview(self._mm)
+        start = self._keys + KEY_BYTES * n
+        self._offsets = self._view[start:start + 4 * (n + 1)].cast('I')
+        self._data = start + 4 * (n + 1)
+        self._pairs = tuple((t, t) for t in range(NUM_TILE_KINDS))
+        self._melds = tuple((t, t + 1, t + 2) for t in range(27)) + (None,) * (NUM_TILE_KINDS - 27) + tuple(
+            (t, t, t) for t in range(NUM_TILE_KINDS))
+
+    def __len__(self):
+        return self.n_hands
+
+    def _find(self, key):
+        mm = self._mm
+        lo, hi = 0, self.n_hands
+        base = self._keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            at = base + mid * KEY_BYTES
+            if mm[at:at + KEY_BYTES] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_hands:
+            at = base + lo * KEY_BYTES
+            if mm[at:at + KEY_BYTES] == key:
+                return lo
+        return -1
+
+    def get(self, counts):
+        """(partitions, [(rule id, points)] of TILES rules) for a count vector, or None if not stored."""
+        i = self._find(hand_key(counts))
+        if i < 0:
+            return None
+        at = self._data + self._offsets[i]
+        record = self._mm[at:self._data + self._offsets[i + 1]]
+        melds = self._melds
+        parts = []
+        pos = 1
+        for _ in range(record[0]):
+            parts.append((tuple(melds[c] for c in record[pos + 1:pos + 5]), self._pairs[record[pos]]))
+            pos += 5
+        hits = [(record[j], record[j + 1]) for j in range(pos + 1, pos + 1 + 2 * record[pos], 2)]
+        return parts, hits
+
+    def close(self):
+        self._offsets.release()
+        self._view.release()
+        self._mm.close()
+
+
+def _read_hands(path):
+    with open(path, encoding='utf-8') as fp:
+        for line in fp:
+            if line.strip():
+                main, _ = normalize_hand(json.loads(line)['hand'])
+                yield tiles_to_counts(main)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1]
+    source = _read_hands(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(f"{build_hand_db(target, source, progress=100_000)} hands written to {target}")
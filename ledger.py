@@ -0,0 +1,200 @@
+"""
+Match ledger: score and settle whole matches, streaming running totals per player.
+
+Rounds are JSON Lines records in play order:
+
+    {"match": "m1", "players": ["A", "B", "C", "D"], "winner": "A", "discarder": "C",
+     "hand": ["B1", ...], "meta": {...}}
+
+discarder is null for a self-drawn win and winner is null for a drawn round (no
+hand needed). players may be left out when the previous record was of the same
+match. meta['win_by'] is set from discarder, so it need not be given.
+
+Rounds are read in blocks. Each block's winning hands are scored through the
+batch path (best_score_many, or a ParallelScorer for workers > 1) and settled the
+MCR way: the hand is worth base + flower points and every other player pays the
+winner 8 base points, the discarder paying the hand's points on top; on a
+self-draw every other player pays 8 plus the hand's points. One output line comes
+out per round:
+
+    {"line": 1, "match": "m1", "winner": "A", "discarder": "C", "points": 22,
+     "payments": {"A": 46, "B": -8, "C": -30, "D": -8}, "totals": {"A": 46, ...}}
+
+totals are the running totals of that round's players over everything read so far.
+A malformed record, or a win whose hand is invalid or under 8 points, becomes a
+{"line", "error"} line and settles nothing. Only one block of rounds and the
+per-player totals are held in memory, however long a run without wins.
+
+    python ledger.py season.jsonl.gz -o ledger.jsonl --workers 8 --progress 10
+"""
+
+import argparse
+import json
+import sys
+from itertools import islice
+
+from cli import open_input, open_output, write_results
+from scoring import best_score_many, check_meta, prepare_hand
+
+BASE_POINTS = 8
+
+
+def settle(points, winner, discarder, players):
+    """{player: points won (+) or paid (-)} for one win; discarder None means self-drawn."""
+    payments = {}
+    for p in players:
+        if p != winner:
+            payments[p] = -(BASE_POINTS + points) if discarder is None or p == discarder else -BASE_POINTS
+    payments[winner] = -sum(payments.values())
+    return payments
+
+
+def parse_rounds(lines):
+    """Yield (line_no, record, error) for every non-blank line; exactly one of record/error is set."""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(rec, dict):
+            yield line_no, None, "Record must be an object."
+            continue
+        yield line_no, rec, None
+
+
+class MatchLedger:
+    """Running totals per player over a stream of rounds.
+
+    totals maps every player seen to their total; process() can be called again to
+    continue the same season.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self._match = None
+        self._players = None
+
+    def _check(self, rec):
+        """The round's players, or raise ValueError."""
+        players = rec.get('players')
+        if players is None:
+            if self._players is None or rec.get('match') != self._match:
+                raise ValueError("'players' is missing for a new match.")
+            players = self._players
+        elif (not isinstance(players, list) or len(players) < 2
+              or not all(isinstance(p, (str, int)) for p in players) or len(set(players)) != len(players)):
+            raise ValueError("'players' must be a list of at least 2 distinct names or ids.")
+        winner = rec.get('winner')
+        discarder = rec.get('discarder')
+        if winner is not None:
+            if winner not in players:
+                raise ValueError("'winner' is not one of the players.")
+            if discarder is not None and (discarder not in players or discarder == winner):
+                raise ValueError("'discarder' must be another of the players.")
+            if not isinstance(rec.get('hand'), list):
+                raise ValueError("A win needs a 'hand' list.")
+            prepare_hand(rec['hand'])
+            check_meta(rec.get('meta', {}))
+        self._match = rec.get('match')
+        self._players = players
+        return players
+
+    def _apply(self, out, payments):
+        totals = self.totals
+        for p, change in payments.items():
+            totals[p] = totals.get(p, 0) + change
+        out['payments'] = payments
+        out['totals'] = {p: totals[p] for p in payments}
+        return out
+
+    def process(self, records, workers=1, chunk_size=256):
+        """Yield one output dict per parsed (line_no, record, error), in input order.
+
+        Rounds are read a block at a time (chunk_size rounds, or 2 * workers chunks
+        with workers > 1); a block's wins are scored in one batch and its outputs
+        yielded before the next block is read.
+        """
+        scorer = None
+        block = chunk_size
+        if workers > 1:
+            from parallel import ParallelScorer
+            scorer = ParallelScorer(workers=workers, chunk_size=chunk_size)
+            block = 2 * workers * chunk_size
+        records = iter(records)
+        try:
+            while True:
+                rounds = list(islice(records, block))
+                if not rounds:
+                    return
+                yield from self._settle_block(rounds, scorer)
+        finally:
+            if scorer is not None:
+                scorer.close()
+
+    def _settle_block(self, rounds, scorer):
+        entries = []  # (out, players); players is None for an error
+        hands = []
+        metas = []
+        for line_no, rec, error in rounds:
+            if error is None:
+                try:
+                    players = self._check(rec)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                entries.append(({'line': line_no, 'error': error}, None))
+                continue
+            out = {'line': line_no, 'match': rec.get('match'), 'winner': rec.get('winner'),
+                   'discarder': rec.get('discarder')}
+            entries.append((out, players))
+            if out['winner'] is not None:
+                meta = dict(rec.get('meta', {}))
+                meta['win_by'] = 'self' if out['discarder'] is None else 'discard'
+                hands.append(rec['hand'])
+                metas.append(meta)
+        results = iter(scorer.score(hands, metas) if scorer is not None else best_score_many(hands, metas))
+        for out, players in entries:
+            if players is None:
+                yield out
+            elif out['winner'] is None:
+                out['points'] = 0
+                yield self._apply(out, dict.fromkeys(players, 0))
+            else:
+                result = next(results)
+                if not result['valid'] or not result['meets_min_8']:
+                    yield {'line': out['line'], 'error': "Winning hand is not valid." if not result['valid']
+                           else "Winning hand has fewer than 8 points."}
+                    continue
+                out['points'] = result['base_points'] + result['flower_points']
+                yield self._apply(out, settle(out['points'], out['winner'], out['discarder'], players))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Score and settle Mahjong matches from JSON Lines rounds.")
+    ap.add_argument('input', nargs='?', default='-', help="input .jsonl or .jsonl.gz (default: stdin)")
+    ap.add_argument('-o', '--output', default='-', help="output .jsonl or .jsonl.gz (default: stdout)")
+    ap.add_argument('--gzip', action='store_true', help="gzip the output even without a .gz suffix")
+    ap.add_argument('--workers', type=int, default=1, help="scoring processes (default: 1, in-process)")
+    ap.add_argument('--chunk-size', type=int, default=256, help="hands per scoring chunk")
+    ap.add_argument('--progress', type=float, default=0, metavar='SECONDS',
+                    help="report throughput to stderr every SECONDS")
+    args = ap.parse_args(argv)
+
+    with open_input(args.input) as fin:
+        fout = open_output(args.output, compress=args.gzip)
+        try:
+            outputs = MatchLedger().process(parse_rounds(fin), workers=args.workers, chunk_size=args.chunk_size)
+            write_results(outputs, fout, progress=args.progress)
+        finally:
+            if fout is sys.stdout:
+                fout.flush()
+            else:
+                fout.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,19 @@
-from tiles import is_suit, suit, rank
+from tiles import IDX_RANK
+
+# Melds are sorted tuples of tile indices (see tiles.TILE_NAMES).
 
 
 def is_pung(m):
-    return len(m) == 3 and len(set(m)) == 1
+    return len(m) == 3 and m[0] == m[2]
 
 
 def is_chow(m):
     if len(m) != 3:
         return False
-    if not all(is_suit(t) for t in m):
-        return False
-    s = suit(m[0])
-    if any(suit(t) != s for t in m):
-        return False
-    rs = sorted(rank(t) for t in m)
-    return rs[1] == rs[0] + 1 and rs[2] == rs[1] + 1
+    r = IDX_RANK[m[0]]
+    # suited, consecutive, and the start rank leaves room for +2 within the suit
+    return r is not None and r <= 7 and m[1] == m[0] + 1 and m[2] == m[0] + 2
 
 
 def is_kong(m):
-    return len(m) == 4 and len(set(m)) == 1
-
-
+    return len(m) == 4 and m[0] == m[3]
@@ -0,0 +1,176 @@
+"""
+Monte Carlo estimate of what a partial hand is worth: "if I keep these tiles, what
+is my expected final score and how often do I win?"
+
+Each sample draws the missing tiles (14 minus the kept ones) at random from the
+unseen tiles: the 4 copies of every kind minus the kept and the visible tiles
+(discards, other players' melds). The completed hand is scored with best_score. A
+sample is a win when the hand is valid and meets the 8-point minimum, and it then
+scores its base points; otherwise it scores 0.
+
+Samples are drawn in batches of `batch`, each scored with one best_score_prepared
+call (so repeated completions are scored once) and with its own RNG seeded from
+(seed, batch number). Batches run on a process pool when workers > 1 and are
+merged in batch order, so the result depends on seed and batch but not on workers.
+After min_samples, sampling stops early once the confidence intervals of the win
+rate (Wilson) and of the mean score (normal) are within tol_win_rate and
+tol_mean of their estimates.
+"""
+
+import random
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from scoring import best_score_prepared
+from tiles import NUM_TILE_KINDS, counts_to_tiles, normalize_hand, tiles_to_counts
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _simulate(payload):
+    """Stats of one batch: {'n', 'wins', 'sum', 'sumsq', 'scores': Counter, 'rules': Counter}."""
+    kept, unseen, draw, meta, n, seed = payload
+    rng = random.Random(seed)
+    prepared = []
+    for _ in range(n):
+        counts = list(kept)
+        for t in rng.sample(unseen, draw):
+            counts[t] += 1
+        prepared.append((counts, meta['flowers']))
+    stats = {'n': n, 'wins': 0, 'sum': 0, 'sumsq': 0, 'scores': Counter(), 'rules': Counter()}
+    for result in best_score_prepared(prepared, meta):
+        score = 0
+        if result['valid'] and result['meets_min_8']:
+            score = result['base_points']
+            stats['wins'] += 1
+            stats['rules'].update(result['breakdown'].keys())
+        stats['sum'] += score
+        stats['sumsq'] += score * score
+        stats['scores'][score] += 1
+    return stats
+
+
+def _merge(total, stats):
+    for key in ('n', 'wins', 'sum', 'sumsq'):
+        total[key] += stats[key]
+    total['scores'].update(stats['scores'])
+    total['rules'].update(stats['rules'])
+
+
+def _wilson(wins, n, z):
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * ((p * (1 - p) / n + z * z / (4 * n * n)) ** 0.5) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _mean_ci(total, z):
+    n = total['n']
+    mean = total['sum'] / n
+    var = max(0.0, total['sumsq'] / n - mean * mean) * n / (n - 1) if n > 1 else 0.0
+    half = z * (var / n) ** 0.5
+    return mean - half, mean + half
+
+
+def _percentiles(scores, n):
+    out = {}
+    ordered = sorted(scores.items())
+    for q in PERCENTILES:
+        rank = max(1, -(-q * n // 100))  # nearest rank
+        seen = 0
+        for score, count in ordered:
+            seen += count
+            if seen >= rank:
+                out[f'p{q}'] = score
+                break
+    return out
+
+
+def _unseen(counts, visible):
+    left = [4 - n for n in counts]
+    for t in visible:
+        left[t] -= 1
+    if min(left) < 0:
+        raise ValueError("Kept and visible tiles hold more than 4 of a tile.")
+    return [t for t in range(NUM_TILE_KINDS) for _ in range(left[t])]
+
+
+def estimate_hand(kept, meta, visible=(), seed=0, workers=1, batch=1000, min_samples=2000,
+                  max_samples=100_000, confidence=0.95, tol_win_rate=0.005, tol_mean=0.25):
+    """Expected score and win rate of completing the kept tiles from the unseen ones.
+
+    kept and visible are tile names; flowers in kept count as the hand's flowers.
+    Returns {'samples', 'draw', 'stopped_early', 'win_rate', 'win_rate_ci',
+    'mean_score', 'mean_score_ci', 'mean_score_if_win', 'percentiles',
+    'rule_frequencies'}. Scores are base points, 0 for samples that don't win.
+    percentiles are over all samples; rule_frequencies give the share of samples
+    whose winning hand scored each rule, most frequent first.
+    """
+    main, flowers = normalize_hand(kept)
+    if len(main) > 14:
+        raise ValueError("Keep at most 14 non-flower tiles.")
+    seen, _ = normalize_hand(visible)
+    counts = tiles_to_counts(main)
+    unseen = _unseen(counts, counts_to_tiles(tiles_to_counts(seen)))
+    draw = 14 - len(main)
+    if draw > len(unseen):
+        raise ValueError("Not enough unseen tiles to complete the hand.")
+    if draw == 0:
+        min_samples = max_samples = batch = 1  # nothing to draw: one exact score
+    meta = dict(meta)
+    meta['flowers'] = flowers
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    total = {'n': 0, 'wins': 0, 'sum': 0, 'sumsq': 0, 'scores': Counter(), 'rules': Counter()}
+    n_batches = -(-max_samples // batch)
+    payloads = ((counts, unseen, draw, meta, min(batch, max_samples - i * batch), f"{seed}:{i}")
+                for i in range(n_batches))
+    stopped_early = False
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        pending = deque()
+        while True:
+            while pool is not None and len(pending) < 2 * workers:
+                payload = next(payloads, None)
+                if payload is None:
+                    break
+                pending.append(pool.submit(_simulate, payload))
+            if pool is not None:
+                if not pending:
+                    break
+                stats = pending.popleft().result()
+            else:
+                payload = next(payloads, None)
+                if payload is None:
+                    break
+                stats = _simulate(payload)
+            _merge(total, stats)
+            n = total['n']
+            if n >= min_samples and n < max_samples:
+                lo, hi = _wilson(total['wins'], n, z)
+                mlo, mhi = _mean_ci(total, z)
+                if (hi - lo) / 2 <= tol_win_rate and (mhi - mlo) / 2 <= tol_mean:
+                    stopped_early = True
+                    break
+    finally:
+        if pool is not None:
+            for future in pending:
+                future.cancel()
+            pool.shutdown()
+
+    n = total['n']
+    wins = total['wins']
+    return {
+        'samples': n,
+        'draw': draw,
+        'stopped_early': stopped_early,
+        'win_rate': wins / n,
+        'win_rate_ci': _wilson(wins, n, z),
+        'mean_score': total['sum'] / n,
+        'mean_score_ci': _mean_ci(total, z),
+        'mean_score_if_win': total['sum'] / wins if wins else 0.0,
+        'percentiles': _percentiles(total['scores'], n),
+        'rule_frequencies': {name: c / n for name, c in total['rules'].most_common()},
+    }
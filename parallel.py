@@ -0,0 +1,137 @@
+"""
+Process-pool batch scoring for large hand corpora.
+
+Hands are sent to workers as compact encodings (the 34-byte count vector plus any
+flower tiles) in chunks, with each distinct meta sent once per chunk. Workers stay
+alive for the life of a ParallelScorer, so their partition caches stay warm
+between chunks.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from scoring import prepare_hand, best_score_prepared, meta_signature
+
+
+def encode_hand(hand14):
+    """Compact, picklable encoding of a hand: (34-byte count vector, flower tiles)."""
+    counts, flowers = prepare_hand(hand14)
+    return bytes(counts), tuple(flowers)
+
+
+def _encode_chunk(start, items):
+    """Build the payload for one chunk: hands as encodings, metas deduplicated into a table."""
+    encoded = []
+    meta_table = []
+    meta_ids = []
+    seen = {}
+    for offset, (hand, meta) in enumerate(items):
+        try:
+            encoded.append(encode_hand(hand))
+        except ValueError as e:
+            raise ValueError(f"Hand {start + offset}: {e}") from None
+        sig = meta_signature(meta)
+        idx = seen.get(sig)
+        if idx is None:
+            idx = seen[sig] = len(meta_table)
+            meta_table.append(dict(meta))
+        meta_ids.append(idx)
+    return start, encoded, meta_table, meta_ids
+
+
+def _score_chunk(payload):
+    start, encoded, meta_table, meta_ids = payload
+    metas = [meta_table[i] for i in meta_ids]
+    return start, best_score_prepared(encoded, metas)
+
+
+class ParallelScorer:
+    """Score hands across a ProcessPoolExecutor.
+
+    workers defaults to os.cpu_count(); chunk_size is the number of hands per task.
+    Use as a context manager (or call close()) so the pool is shut down.
+    """
+
+    def __init__(self, workers=None, chunk_size=512):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def imap(self, hands, metas, ordered=True):
+        """Yield (index, result) for every hand.
+
+        hands/metas may be lazy iterables of equal length (metas may also be a single
+        dict). With ordered=True results come in input order, otherwise as chunks
+        complete. At most two chunks per worker are in flight or buffered, so input is
+        consumed incrementally.
+        """
+        if isinstance(metas, dict):
+            pairs = ((h, metas) for h in hands)
+        else:
+            pairs = _strict_zip(hands, metas)
+        max_in_flight = 2 * self.workers
+        pending = set()
+        done_chunks = {}
+        next_start = 0
+        start = 0
+        exhausted = False
+        while True:
+            # finished-but-unyielded chunks count too, so a slow head chunk bounds memory
+            while not exhausted and len(pending) + len(done_chunks) < max_in_flight:
+                items = list(islice(pairs, self.chunk_size))
+                if not items:
+                    exhausted = True
+                    break
+                pending.add(self._pool.submit(_score_chunk, _encode_chunk(start, items)))
+                start += len(items)
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                chunk_start, results = fut.result()
+                if not ordered:
+                    for offset, result in enumerate(results):
+                        yield chunk_start + offset, result
+                else:
+                    done_chunks[chunk_start] = results
+            while next_start in done_chunks:
+                results = done_chunks.pop(next_start)
+                for offset, result in enumerate(results):
+                    yield next_start + offset, result
+                next_start += len(results)
+
+    def score(self, hands, metas):
+        """Return best_score results for all hands, in input order."""
+        return [result for _, result in self.imap(hands, metas, ordered=True)]
+
+
+def _strict_zip(hands, metas):
+    hands = iter(hands)
+    metas = iter(metas)
+    sentinel = object()
+    while True:
+        h = next(hands, sentinel)
+        m = next(metas, sentinel)
+        if h is sentinel and m is sentinel:
+            return
+        if h is sentinel or m is sentinel:
+            raise ValueError("hands and metas have different lengths.")
+        yield h, m
+
+
+def best_score_parallel(hands, metas, workers=None, chunk_size=512):
+    """One-shot convenience: score hands on a temporary pool and return results in order."""
+    with ParallelScorer(workers=workers, chunk_size=chunk_size) as scorer:
+        return scorer.score(hands, metas)
@@ -1,60 +1,302 @@
-from collections import Counter
-from functools import lru_cache
+import os
+import sys
 
+from cache import BoundedCache
 from melds import is_chow
-from tiles import is_suit, suit, rank, tiles_to_multiset, remove_tiles
+from suit_tables import DEFAULT_PATH, SuitTables
+from tiles import NUM_TILE_KINDS
 
 
-@lru_cache(maxsize=None)
-def enumerate_partitions(pool):
-    """Yield partitions as tuples: (sets_list, pair) where sets_list has 4 melds (pung/chow/kong), pair is 2 identical tiles.
-       Kongs are recorded as sets too (len 4)."""
-    tiles = list(pool)
-    if len(tiles) == 0:
-        return []
+# Interned melds shared by the partitioners; the backtracking engine never builds tuples while searching
+_PAIRS = tuple((t, t) for t in range(NUM_TILE_KINDS))
+_PUNGS = tuple((t, t, t) for t in range(NUM_TILE_KINDS))
+_KONGS = tuple((t, t, t, t) for t in range(NUM_TILE_KINDS))
+_CHOWS = tuple((t, t + 1, t + 2) if is_chow((t, t + 1, t + 2)) else None for t in range(NUM_TILE_KINDS))
+
+# Cache keys are the count vector packed as 34 bytes (plus one byte of need_sets for
+# enumerate_sets) instead of tuples of tiles.
+_NEED_SUFFIX = tuple(bytes((n,)) for n in range(5))
+
+
+def _partitions_nbytes(key, parts):
+    # melds are interned, so each entry only owns its list, partition tuples and sets tuples
+    return (sys.getsizeof(key) + sys.getsizeof(parts)
+            + sum(sys.getsizeof(p) + sys.getsizeof(p[0]) for p in parts))
+
+
+def _sets_nbytes(key, sets_lists):
+    return sys.getsizeof(key) + sys.getsizeof(sets_lists) + sum(sys.getsizeof(s) for s in sets_lists)
+
+
+PARTITIONS_CACHE = BoundedCache(max_entries=100_000, max_bytes=64 * 1024 * 1024, sizeof=_partitions_nbytes)
+SETS_CACHE = BoundedCache(max_entries=200_000, max_bytes=64 * 1024 * 1024, sizeof=_sets_nbytes)
+
+
+def configure_partition_cache(max_entries=None, max_bytes=None, policy=None, sets_max_entries=None,
+                              sets_max_bytes=None):
+    """Resize the partitioner caches and/or switch their eviction policy ('lru' or 'lfu').
+
+    Arguments left as None are unchanged. Changing the policy starts from an empty cache.
+    """
+    if policy is not None:
+        PARTITIONS_CACHE.set_policy(policy)
+        SETS_CACHE.set_policy(policy)
+    if max_entries is not None:
+        PARTITIONS_CACHE.resize(max_entries=max_entries)
+    if max_bytes is not None:
+        PARTITIONS_CACHE.resize(max_bytes=max_bytes)
+    if sets_max_entries is not None:
+        SETS_CACHE.resize(max_entries=sets_max_entries)
+    if sets_max_bytes is not None:
+        SETS_CACHE.resize(max_bytes=sets_max_bytes)
+
+
+def partition_cache_info():
+    return {'partitions': PARTITIONS_CACHE.info(), 'sets': SETS_CACHE.info()}
+
+
+def clear_partition_caches():
+    PARTITIONS_CACHE.clear()
+    SETS_CACHE.clear()
+
+
+# Memory-mapped per-suit decompositions (see suit_tables.py); 14-tile hands are assembled
+# from them instead of searched. Loaded at import when the default table file exists.
+SUIT_TABLES = SuitTables(DEFAULT_PATH) if os.path.exists(DEFAULT_PATH) else None
+
+
+def load_suit_tables(path=DEFAULT_PATH):
+    """Use the suit table file at path for enumerate_partitions; path=None goes back to searching."""
+    global SUIT_TABLES
+    old = SUIT_TABLES
+    SUIT_TABLES = SuitTables(path) if path is not None else None
+    if old is not None:
+        old.close()
+    PARTITIONS_CACHE.clear()
+    return SUIT_TABLES
+
+
+def enumerate_partitions(counts):
+    """Return partitions of a 34-slot count vector as tuples: (sets_list, pair) where sets_list has 4 melds
+       (pung/chow/kong) and pair is 2 identical tiles. Melds are sorted tuples of tile indices.
+       Kongs are recorded as sets too (len 4). Each distinct (sets, pair) appears exactly once.
+       Results are shared through PARTITIONS_CACHE; treat them as read-only.
+       14-tile hands are assembled from SUIT_TABLES when it is loaded."""
+    key = bytes(counts)
+    out = PARTITIONS_CACHE.get(key)
+    if out is not None:
+        return out
+    if SUIT_TABLES is not None and sum(key) == 14 and max(key) <= 4:
+        out = SUIT_TABLES.partitions(key)
+        PARTITIONS_CACHE.put(key, out)
+        return out
     out = []
-    cnt = Counter(tiles)
-    # choose pair
-    pairs = [t for t, n in cnt.items() if n >= 2]
-    for p in pairs:
-        rem = remove_tiles(pool, (p, p))
-        if rem is None:
-            continue
-        for sets_list in enumerate_sets(rem, need_sets=4):
-            out.append((sets_list, (p, p)))
+    if any(key):
+        # choose pair
+        rem = bytearray(key)
+        for p in range(NUM_TILE_KINDS):
+            if rem[p] < 2:
+                continue
+            rem[p] -= 2
+            for sets_list in enumerate_sets(bytes(rem), need_sets=4):
+                out.append((sets_list, _PAIRS[p]))
+            rem[p] += 2
+    PARTITIONS_CACHE.put(key, out)
     return out
 
 
-@lru_cache(maxsize=None)
-def enumerate_sets(pool, need_sets):
+def iter_partitions(counts):
+    """Yield enumerate_partitions(counts) one partition at a time, in the same order.
+
+    A cached list is replayed as is; otherwise partitions come straight from
+    _backtrack_partitions as they are found, without filling PARTITIONS_CACHE, so a
+    consumer that stops early never builds the rest.
+    """
+    cached = PARTITIONS_CACHE.get(bytes(counts))
+    if cached is not None:
+        return iter(cached)
+    return _backtrack_partitions(counts)
+
+
+def _backtrack_partitions(counts):
+    """Yield every (sets, pair) of counts from an in-place search; no cache is read or filled.
+
+    One mutable copy of the count vector is decremented and restored in place, and
+    every step consumes all copies of the lowest remaining tile (k chows starting
+    there plus an optional pung or kong of it), so nothing is sorted or counted
+    again per step. Each distinct (sets, pair) is produced exactly once, in
+    enumerate_partitions order.
+    """
+    c = list(counts)
+    if not any(c):
+        return
+    sets = []
+
+    def search(i, need):
+        while i < NUM_TILE_KINDS and not c[i]:
+            i += 1
+        if i == NUM_TILE_KINDS:
+            if need == 0:
+                yield tuple(sets)
+            return
+        n = c[i]
+        chow = _CHOWS[i]
+        for trip in (0, 3, 4):
+            k = n - trip  # chows that must start at i to use up the rest of tile i
+            if k < 0:
+                break
+            used = k + (trip > 0)
+            if used > need:
+                continue
+            if k and (chow is None or c[i + 1] < k or c[i + 2] < k):
+                continue
+            c[i] = 0
+            if trip == 3:
+                sets.append(_PUNGS[i])
+            elif trip == 4:
+                sets.append(_KONGS[i])
+            if k:
+                c[i + 1] -= k
+                c[i + 2] -= k
+                sets.extend((chow,) * k)
+            yield from search(i + 1, need - used)
+            if k:
+                c[i + 1] += k
+                c[i + 2] += k
+            del sets[len(sets) - used:]
+            c[i] = n
+
+    for p in range(NUM_TILE_KINDS):
+        if c[p] >= 2:
+            c[p] -= 2
+            for found in search(0, 4):
+                yield found, _PAIRS[p]
+            c[p] += 2
+
+
+def has_partition(counts):
+    """Whether counts splits into 4 sets and a pair; stops at the first partition found."""
+    return next(iter_partitions(counts), None) is not None
+
+
+def enumerate_sets(counts, need_sets):
+    """All ways to split counts into need_sets melds, each multiset of melds once.
+
+    Canonical order: the lowest remaining tile is always used up first, by k chows
+    starting at it plus an optional pung or kong of it, so the same melds are never
+    produced in a different order.
+    """
+    counts = bytes(counts)
+    key = counts + _NEED_SUFFIX[need_sets]
+    out = SETS_CACHE.get(key)
+    if out is not None:
+        return out
+    out = _enumerate_sets(counts, need_sets)
+    SETS_CACHE.put(key, out)
+    return out
+
+
+def _enumerate_sets(counts, need_sets):
+    i = 0
+    while i < NUM_TILE_KINDS and not counts[i]:
+        i += 1
+    if i == NUM_TILE_KINDS:
+        return [tuple()] if need_sets == 0 else []
     if need_sets == 0:
-        return [tuple()] if len(pool) == 0 else []
-    tiles = list(pool)
+        return []
     out = []
-    # try pung
-    cnt = Counter(tiles)
-    for t, n in list(cnt.items()):
-        if n >= 3:
-            rem = remove_tiles(pool, (t, t, t))
-            for rest in enumerate_sets(rem, need_sets - 1):
-                out.append(((t, t, t),) + rest)
-        # try kong
-        if n >= 4:
-            rem = remove_tiles(pool, (t, t, t, t))
-            for rest in enumerate_sets(rem, need_sets - 1):
-                out.append(((t, t, t, t),) + rest)
-    # try chow (only suit tiles)
-    suit_tiles = [t for t in set(tiles) if is_suit(t)]
-    for t in suit_tiles:
-        s = suit(t)
-        r = rank(t)
-        if r <= 7:
-            a = (f"{s}{r}", f"{s}{r+1}", f"{s}{r+2}")
-            if all(Counter(tiles)[x] > 0 for x in a):
-                rem = remove_tiles(pool, a)
-                if rem is not None:
-                    for rest in enumerate_sets(rem, need_sets - 1):
-                        out.append((tuple(sorted(a)),) + rest)
+    n = counts[i]
+    chow = _CHOWS[i]
+    for trip in (0, 3, 4):
+        k = n - trip  # chows that must start at i to use up the rest of tile i
+        if k < 0:
+            break
+        used = k + (trip > 0)
+        if used > need_sets:
+            continue
+        if k and (chow is None or counts[i + 1] < k or counts[i + 2] < k):
+            continue
+        rem = bytearray(counts)
+        rem[i] = 0
+        head = ()
+        if trip:
+            head = (_PUNGS[i] if trip == 3 else _KONGS[i],)
+        if k:
+            rem[i + 1] -= k
+            rem[i + 2] -= k
+            head += (chow,) * k
+        for rest in enumerate_sets(bytes(rem), need_sets - used):
+            out.append(head + rest)
     return out
 
 
+def count_orderings(sets):
+    """Number of orderings of sets as distinct sequences (4! over repeated melds).
+
+    This is how many times an order-sensitive enumeration (trying every meld at
+    every depth) would have produced the same partition.
+    """
+    n = 1
+    for i in range(1, len(sets) + 1):
+        n *= i
+    seen = {}
+    for m in sets:
+        seen[m] = seen.get(m, 0) + 1
+    for k in seen.values():
+        for i in range(2, k + 1):
+            n //= i
+    return n
+
+
+def partition_counts(counts):
+    """Return (raw, distinct) partition counts for one hand.
+
+    raw counts every meld ordering an order-sensitive search would visit; distinct
+    is what enumerate_partitions returns and best_score actually scores.
+    """
+    parts = enumerate_partitions(counts)
+    return sum(count_orderings(sets) for sets, _ in parts), len(parts)
+
+
+class PartitionStats:
+    """Running raw vs. distinct partition totals over the hands passed to record().
+
+    Scorers only call record() while enabled is set, since counting orderings costs
+    a pass over every partition of every hand.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.hands = 0
+        self.raw = 0
+        self.distinct = 0
+
+    def record(self, parts):
+        self.hands += 1
+        self.raw += sum(count_orderings(sets) for sets, _ in parts)
+        self.distinct += len(parts)
+
+    def as_dict(self):
+        return {
+            'hands': self.hands,
+            'raw_partitions': self.raw,
+            'distinct_partitions': self.distinct,
+            'rule_evaluations_saved': self.raw - self.distinct,
+        }
+
+
+# Aggregated by best_score over every standard hand it scores; off until
+# PARTITION_STATS.enabled is set
+PARTITION_STATS = PartitionStats()
+
+
+def enumerate_partitions_backtrack(counts):
+    """Backtracking partitioner with the same output shape as enumerate_partitions.
+
+    The list of _backtrack_partitions(counts): always searched afresh on a single
+    mutable count vector, never read from or stored in the partition caches.
+    """
+    return list(_backtrack_partitions(counts))
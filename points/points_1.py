@@ -1,87 +1,54 @@
-from melds import is_chow, is_kong
-from tiles import HONORS, WINDS, DRAGONS, is_suit, rank, suit
+from features import TERMINAL_MASK, WIND_MASK, chow_rule, chow_starts_by_suit, popcount
+from rules import EXACT, META, PARTITION, TILES, Rule
+from tiles import IDX_SUIT, IDX_RANK, wind_index
 
 
-def points_pure_double_chow(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    seen = set()
-    pts = 0
-    for i in range(len(chows)):
-        for j in range(i + 1, len(chows)):
-            if chows[i] == chows[j] and chows[i] not in seen:
-                pts += 1
-                seen.add(chows[i])
-    return pts
+@chow_rule
+def points_pure_double_chow(chow_sig):
+    return sum(1 for t in set(chow_sig) if chow_sig.count(t) >= 2)
 
 
-def points_mixed_double_chow(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
+@chow_rule
+def points_mixed_double_chow(chow_sig):
     pts = 0
-    for i in range(len(chows)):
-        for j in range(i + 1, len(chows)):
-            r1 = min(rank(x) for x in chows[i])
-            r2 = min(rank(x) for x in chows[j])
-            if r1 == r2 and suit(chows[i][0]) != suit(chows[j][0]):
+    for i in range(len(chow_sig)):
+        for j in range(i + 1, len(chow_sig)):
+            a, b = chow_sig[i], chow_sig[j]
+            if IDX_RANK[a] == IDX_RANK[b] and IDX_SUIT[a] != IDX_SUIT[b]:
                 pts += 1
     return pts
 
 
-def points_short_straight(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    pts = 0
-    used = set()
-    for i in range(len(chows)):
-        s1 = suit(chows[i][0])
-        r1 = min(rank(x) for x in chows[i])
-        for j in range(i + 1, len(chows)):
-            s2 = suit(chows[j][0])
-            r2 = min(rank(x) for x in chows[j])
-            if s1 == s2 and {r1, r2} in ({1, 4}, {2, 5}, {3, 6}, {4, 7}):
-                key = tuple(sorted([(s1, r1), (s2, r2)]))
-                if key not in used:
-                    pts += 1
-                    used.add(key)
-    return pts
+@chow_rule
+def points_short_straight(chow_sig):
+    # each distinct pair of chows three ranks apart in one suit
+    starts = set(chow_sig)
+    return sum(1 for t in starts if IDX_RANK[t] <= 4 and t + 3 in starts)
 
 
-def points_two_terminal_chows(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    bysuit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        bysuit.setdefault(s, set()).add(r)
-    pts = 0
-    for s, starts in bysuit.items():
-        if 1 in starts and 7 in starts:
-            pts += 1
-    return pts
+@chow_rule
+def points_two_terminal_chows(chow_sig):
+    return sum(1 for starts in chow_starts_by_suit(chow_sig).values() if 1 in starts and 7 in starts)
 
 
-def points_pung_term_or_honor(sets, seat_wind=None, prevalent_wind=None):
-    pts = 0
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1:
-            t = s[0]
-            if is_suit(t) and rank(t) in (1, 9):
-                pts += 1
-            elif t in WINDS:
-                if t != f"W{seat_wind}" and t != f"W{prevalent_wind}":
-                    pts += 1
-    return pts
+def points_pung_term_or_honor(f, seat_wind=None, prevalent_wind=None):
+    winds = f.pung_mask & WIND_MASK
+    for w in (wind_index(seat_wind), wind_index(prevalent_wind)):
+        if w is not None:
+            winds &= ~(1 << w)
+    return popcount(f.pung_mask & TERMINAL_MASK) + popcount(winds)
 
 
-def points_melded_kong(sets):
-    return sum(1 for s in sets if is_kong(s))
+def points_melded_kong(f):
+    return f.n_kongs
 
 
-def points_one_voided_suit(all_tiles):
-    suits_present = {suit(t) for t in all_tiles if is_suit(t)}
-    return 1 if len(suits_present) <= 2 else 0
+def points_one_voided_suit(hand):
+    return 1 if hand.n_suits <= 2 else 0
 
 
-def points_no_honor(all_tiles):
-    return 1 if all(t not in HONORS for t in all_tiles) else 0
+def points_no_honor(hand):
+    return 1 if not hand.has_honor else 0
 
 
 def points_self_drawn(win_by):
@@ -89,26 +56,25 @@ def points_self_drawn(win_by):
 
 
 def points_wait_types(wait_type):
-    return 1 if wait_type in {'edge', 'closed', 'pair'} else 0
-
-
-def compute_points_1(sets, pair, all_tiles, meta):
-    seat_wind = meta.get('seat_wind')
-    prevalent_wind = meta.get('prevalent_wind')
-    win_by = meta.get('win_by')
-    wait_type = meta.get('wait_type')
-    p1 = {
-        'Pure Double Chow': points_pure_double_chow(sets),
-        'Mixed Double Chow': points_mixed_double_chow(sets),
-        'Short Straight': points_short_straight(sets),
-        'Two Terminal Chows': points_two_terminal_chows(sets),
-        'Pung of Terminals/Honors (non-seat/prevalent)': points_pung_term_or_honor(sets, seat_wind, prevalent_wind),
-        'Melded Kong': points_melded_kong(sets),
-        'One Voided Suit': points_one_voided_suit(all_tiles),
-        'No Honor Tiles': points_no_honor(all_tiles),
-        'Self Drawn': points_self_drawn(win_by),
-        'Wait Type (edge/closed/pair)': points_wait_types(wait_type),
-    }
-    return sum(p1.values()), {k: v for k, v in p1.items() if v}
-
-
+    return 1 if wait_type in ('edge', 'closed', 'pair') else 0
+
+
+RULES = (
+    Rule(0, 'Pure Double Chow', 1, 1, PARTITION, lambda f, meta: points_pure_double_chow(f.chow_sig), {'n_chows': 2},
+         bound=EXACT),
+    Rule(1, 'Mixed Double Chow', 1, 1, PARTITION, lambda f, meta: points_mixed_double_chow(f.chow_sig), {'n_chows': 2},
+         bound=EXACT),
+    Rule(2, 'Short Straight', 1, 1, PARTITION, lambda f, meta: points_short_straight(f.chow_sig), {'n_chows': 2},
+         bound=EXACT),
+    Rule(3, 'Two Terminal Chows', 1, 1, PARTITION, lambda f, meta: points_two_terminal_chows(f.chow_sig),
+         {'n_chows': 2}, bound=EXACT),
+    Rule(4, 'Pung of Terminals/Honors (non-seat/prevalent)', 1, 1, PARTITION,
+         lambda f, meta: points_pung_term_or_honor(f, meta.get('seat_wind'), meta.get('prevalent_wind')),
+         {'n_pungs': 1}, bound='n_pungs'),
+    Rule(5, 'Melded Kong', 1, 1, PARTITION, lambda f, meta: points_melded_kong(f), {'n_kongs': 1},
+         bound='n_kongs'),
+    Rule(6, 'One Voided Suit', 1, 1, TILES, lambda hand, meta: points_one_voided_suit(hand)),
+    Rule(7, 'No Honor Tiles', 1, 1, TILES, lambda hand, meta: points_no_honor(hand)),
+    Rule(8, 'Self Drawn', 1, 1, META, lambda hand, meta: points_self_drawn(meta.get('win_by'))),
+    Rule(9, 'Wait Type (edge/closed/pair)', 1, 1, META, lambda hand, meta: points_wait_types(meta.get('wait_type'))),
+)
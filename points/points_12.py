@@ -1,7 +1,17 @@
-from tiles import HONORS, is_suit, rank, suit
+from features import ids_mask, suit_bits
+from rules import PARTITION, TILES, Rule
+from tiles import IDX_SUIT, IDX_RANK
 
+# rank bits of the three knitted sequences: 1,4,7 / 2,5,8 / 3,6,9
+KNITTED_BITS = (0b001001001, 0b010010010, 0b100100100)
 
-def points_lesser_honors_and_knitted_tiles(all_tiles):
+
+def _is_knitted(tile_mask):
+    """True if the suited tiles are exactly 1,4,7 in one suit, 2,5,8 in a second and 3,6,9 in the third."""
+    return sorted(suit_bits(tile_mask, s) for s in (0, 1, 2)) == list(KNITTED_BITS)
+
+
+def points_lesser_honors_and_knitted_tiles(counts):
     """
     12 points: The hand is entirely composed of single (unpaired) honors and single tiles 
     from different knitted sequences. If this rule is satisfied, the player can win without 
@@ -9,115 +19,23 @@ def points_lesser_honors_and_knitted_tiles(all_tiles):
     
     Knitted sequences are singles of 1,4,7 in one suit, 2,5,8 in a second suit and 3,6,9 in the third suit.
     """
-    # Check if all tiles are single (unpaired)
-    tile_counts = {}
-    for tile in all_tiles:
-        tile_counts[tile] = tile_counts.get(tile, 0) + 1
-    
     # All tiles must appear exactly once (unpaired)
-    if any(count != 1 for count in tile_counts.values()):
-        return 0
-    
-    # Separate honors and suit tiles
-    honors = [t for t in all_tiles if t in HONORS]
-    suit_tiles = [t for t in all_tiles if is_suit(t)]
-    
-    # Check knitted sequences
-    # Sequence 1: 1,4,7 in one suit
-    # Sequence 2: 2,5,8 in a second suit  
-    # Sequence 3: 3,6,9 in the third suit
-    
-    suits_present = {suit(t) for t in suit_tiles}
-    if len(suits_present) != 3:
-        return 0  # Need exactly 3 suits
-    
-    # Group tiles by suit and rank
-    tiles_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    for t in suit_tiles:
-        s = suit(t)
-        r = rank(t)
-        if s in tiles_by_suit:
-            tiles_by_suit[s].add(r)
-    
-    # Check if we have the correct knitted sequences
-    sequence1_ranks = {1, 4, 7}
-    sequence2_ranks = {2, 5, 8}
-    sequence3_ranks = {3, 6, 9}
-    
-    # Find which suit has which sequence
-    suits_with_sequences = []
-    
-    for s in ['B', 'C', 'D']:
-        ranks = tiles_by_suit[s]
-        if ranks == sequence1_ranks:
-            suits_with_sequences.append(('sequence1', s))
-        elif ranks == sequence2_ranks:
-            suits_with_sequences.append(('sequence2', s))
-        elif ranks == sequence3_ranks:
-            suits_with_sequences.append(('sequence3', s))
-    
-    # Must have exactly one of each sequence
-    if len(suits_with_sequences) != 3:
+    if any(count > 1 for count in counts):
         return 0
-    
-    # Check that we have one of each sequence
-    sequences_found = {seq for seq, _ in suits_with_sequences}
-    if sequences_found != {'sequence1', 'sequence2', 'sequence3'}:
+    if not _is_knitted(ids_mask(t for t, n in enumerate(counts) if n)):
         return 0
-    
-    # All conditions met: single honors + single tiles from different knitted sequences
     return 12
 
 
-def points_knitted_straight(sets, all_tiles):
+def points_knitted_straight(f):
     """
     12 points: Winning with a hand that has 1,4,7 in one suit, 2,5,8 in a second suit and 3,6,9 in the third suit. 
     This knitted straight is considered to be 3 Chows for the requirement of 4 triples and a pair.
     """
     # Check if we have exactly 4 sets (the knitted straight counts as 3 chows + 1 other set)
-    if len(sets) != 4:
+    if len(f.sets) != 4:
         return 0
-    
-    # Check if the knitted straight pattern exists in the tiles
-    # We need to find 1,4,7 in one suit, 2,5,8 in a second suit, and 3,6,9 in the third suit
-    suit_tiles = [t for t in all_tiles if is_suit(t)]
-    
-    # Group tiles by suit and rank
-    tiles_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    for t in suit_tiles:
-        s = suit(t)
-        r = rank(t)
-        if s in tiles_by_suit:
-            tiles_by_suit[s].add(r)
-    
-    # Check if we have the correct knitted sequences
-    sequence1_ranks = {1, 4, 7}
-    sequence2_ranks = {2, 5, 8}
-    sequence3_ranks = {3, 6, 9}
-    
-    # Find which suit has which sequence
-    suits_with_sequences = []
-    
-    for s in ['B', 'C', 'D']:
-        ranks = tiles_by_suit[s]
-        if ranks == sequence1_ranks:
-            suits_with_sequences.append(('sequence1', s))
-        elif ranks == sequence2_ranks:
-            suits_with_sequences.append(('sequence2', s))
-        elif ranks == sequence3_ranks:
-            suits_with_sequences.append(('sequence3', s))
-    
-    # Must have exactly one of each sequence
-    if len(suits_with_sequences) != 3:
-        return 0
-    
-    # Check that we have one of each sequence
-    sequences_found = {seq for seq, _ in suits_with_sequences}
-    if sequences_found != {'sequence1', 'sequence2', 'sequence3'}:
-        return 0
-    
-    # All conditions met: knitted straight pattern found
-    return 12
+    return 12 if _is_knitted(f.hand.tile_mask) else 0
 
 
 def _is_knitted_chow(s):
@@ -126,14 +44,14 @@ def _is_knitted_chow(s):
         return False
     
     # Must be a chow (consecutive ranks in same suit)
-    if not all(is_suit(t) for t in s):
+    if not all(IDX_SUIT[t] is not None for t in s):
         return False
     
-    suit_name = suit(s[0])
-    if not all(suit(t) == suit_name for t in s):
+    suit_name = IDX_SUIT[s[0]]
+    if not all(IDX_SUIT[t] == suit_name for t in s):
         return False
     
-    ranks = sorted(rank(t) for t in s)
+    ranks = sorted(IDX_RANK[t] for t in s)
     
     # Check if it's one of the knitted patterns
     knitted_patterns = [{1, 4, 7}, {2, 5, 8}, {3, 6, 9}]
@@ -150,23 +68,23 @@ def _forms_knitted_straight(sets):
         return False
     
     # Must be in different suits
-    suits = {suit(s[0]) for s in sets}
+    suits = {IDX_SUIT[s[0]] for s in sets}
     if len(suits) != 3:
         return False
     
     # Must have the three different knitted patterns
     patterns = []
     for s in sets:
-        ranks = sorted(rank(t) for t in s)
+        ranks = sorted(IDX_RANK[t] for t in s)
         patterns.append(set(ranks))
     
     required_patterns = [{1, 4, 7}, {2, 5, 8}, {3, 6, 9}]
     return all(pattern in patterns for pattern in required_patterns)
 
 
-def compute_points_12(sets, pair, all_tiles, meta):
-    p12 = {
-        'Lesser Honors and Knitted Tiles': points_lesser_honors_and_knitted_tiles(all_tiles),
-        'Knitted Straight': points_knitted_straight(sets, all_tiles),
-    }
-    return sum(p12.values()), {k: v for k, v in p12.items() if v}
+RULES = (
+    Rule(39, 'Lesser Honors and Knitted Tiles', 12, 12, TILES,
+         lambda hand, meta: points_lesser_honors_and_knitted_tiles(hand.counts)),
+    Rule(40, 'Knitted Straight', 12, 12, PARTITION, lambda f, meta: points_knitted_straight(f),
+         when=lambda hand, meta: _is_knitted(hand.tile_mask)),
+)
@@ -1,56 +1,47 @@
-from melds import is_kong
-from tiles import DRAGONS, WINDS, HONORS, is_suit, rank
+from features import TERMINAL_HONOR_MASK, suit_bits
+from rules import META, PARTITION, TILES, Rule
+from tiles import wind_index
 
 
-def points_dragon_pung(sets):
-    return sum(2 for s in sets if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in DRAGONS)
+def points_dragon_pung(f):
+    return 2 * f.n_dragon_pungs
 
 
-def points_seat_wind_pung(sets, seat_wind):
-    if not seat_wind:
-        return 0
-    return sum(2 for s in sets if len(s) in (3, 4) and len(set(s)) == 1 and s[0] == f"W{seat_wind}")
+def _wind_pung(f, wind):
+    w = wind_index(wind)
+    return 2 if w is not None and f.pung_mask >> w & 1 else 0
 
 
-def points_prevalent_wind_pung(sets, prevalent_wind):
-    if not prevalent_wind:
-        return 0
-    return sum(2 for s in sets if len(s) in (3, 4) and len(set(s)) == 1 and s[0] == f"W{prevalent_wind}")
+def _can_pung_wind(hand, wind):
+    w = wind_index(wind)
+    return w is not None and hand.counts[w] >= 3
+
+
+def points_seat_wind_pung(f, seat_wind):
+    return _wind_pung(f, seat_wind)
+
+
+def points_prevalent_wind_pung(f, prevalent_wind):
+    return _wind_pung(f, prevalent_wind)
 
 
 def points_concealed_hand(melds_open, win_by):
     return 2 if (not melds_open and win_by == 'discard') else 0
 
 
-def points_all_chows(sets, is_chow_fn):
-    return 2 if all(len(s) == 3 and is_chow_fn(s) for s in sets) else 0
+def points_all_chows(f):
+    return 2 if f.n_chows == len(f.sets) else 0
 
 
-def points_tile_hog(sets, all_tiles):
+def points_tile_hog(f):
     # 2pt: holds all 4 copies of any tile without using them as a Kong
-    from collections import Counter
-    cnt = Counter(all_tiles)
-    hogs = {t for t, n in cnt.items() if n == 4}
-    if not hogs:
-        return 0
-    for s in sets:
-        if is_kong(s) and s[0] in hogs:
-            hogs.discard(s[0])
-    return 2 if hogs else 0
+    return 2 if f.hand.four_mask & ~f.kong_mask else 0
 
 
-def points_double_pung(sets):
+def points_double_pung(f):
     # 2pt: exactly one award if there exists a rank with pungs/kongs in ≥2 suits
-    by_rank_to_suits = {}
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and is_suit(s[0]):
-            r = rank(s[0])
-            suit_char = s[0][0]
-            by_rank_to_suits.setdefault(r, set()).add(suit_char)
-    for suits in by_rank_to_suits.values():
-        if len(suits) >= 2:
-            return 2
-    return 0
+    b0, b1, b2 = (suit_bits(f.pung_mask, s) for s in (0, 1, 2))
+    return 2 if (b0 & b1) | (b0 & b2) | (b1 & b2) else 0
 
 
 def points_two_concealed_pungs(sets, concealed_mask):
@@ -75,36 +66,29 @@ def points_concealed_kong(sets, concealed_mask):
     return 2 * sum(1 for idx, s in enumerate(sets) if concealed_mask[idx] and len(s) == 4 and len(set(s)) == 1)
 
 
-def points_all_simples(all_tiles):
-    for t in all_tiles:
-        if not is_suit(t):
-            return 0
-        r = rank(t)
-        if r in (1, 9):
-            return 0
-    return 2
-
-
-def compute_points_2(sets, pair, all_tiles, meta, is_chow_fn):
-    seat_wind = meta.get('seat_wind')
-    prevalent_wind = meta.get('prevalent_wind')
-    win_by = meta.get('win_by')
-    concealed_mask = meta.get('concealed_melds')  # Optional[List[bool]] same length as sets
-    p2 = {
-        'Dragon Pung/Kong': points_dragon_pung(sets),
-        'Seat Wind Pung/Kong': points_seat_wind_pung(sets, seat_wind),
-        'Prevalent Wind Pung/Kong': points_prevalent_wind_pung(sets, prevalent_wind),
-        'Concealed Hand (won by discard)': points_concealed_hand(meta.get('melds_open', False), win_by),
-        'All Chows': points_all_chows(sets, is_chow_fn),
-        'Tile Hog': points_tile_hog(sets, all_tiles),
-        'Double Pung': points_double_pung(sets),
-        'Two Concealed Pungs': points_two_concealed_pungs(sets, concealed_mask),
-        'Concealed Kong': points_concealed_kong(sets, concealed_mask),
-        'All Simples': points_all_simples(all_tiles),
-    }
-    return sum(p2.values()), {k: v for k, v in p2.items() if v}
-
-
-
-
-
+def points_all_simples(hand):
+    return 0 if hand.tile_mask & TERMINAL_HONOR_MASK else 2
+
+
+RULES = (
+    Rule(10, 'Dragon Pung/Kong', 2, 2, PARTITION, lambda f, meta: points_dragon_pung(f), {'n_dragon_pungs': 1},
+         bound='n_dragon_pungs'),
+    Rule(11, 'Seat Wind Pung/Kong', 2, 2, PARTITION, lambda f, meta: points_seat_wind_pung(f, meta.get('seat_wind')),
+         {'n_wind_pungs': 1}, when=lambda hand, meta: _can_pung_wind(hand, meta.get('seat_wind'))),
+    Rule(12, 'Prevalent Wind Pung/Kong', 2, 2, PARTITION,
+         lambda f, meta: points_prevalent_wind_pung(f, meta.get('prevalent_wind')), {'n_wind_pungs': 1},
+         when=lambda hand, meta: _can_pung_wind(hand, meta.get('prevalent_wind'))),
+    Rule(13, 'Concealed Hand (won by discard)', 2, 2, META,
+         lambda hand, meta: points_concealed_hand(meta.get('melds_open', False), meta.get('win_by'))),
+    Rule(14, 'All Chows', 2, 2, PARTITION, lambda f, meta: points_all_chows(f), {'n_chows': 4}),
+    Rule(15, 'Tile Hog', 2, 2, PARTITION, lambda f, meta: points_tile_hog(f), {'hand.four_mask': 1}),
+    Rule(16, 'Double Pung', 2, 2, PARTITION, lambda f, meta: points_double_pung(f), {'n_pungs': 2}),
+    # concealed_melds: Optional[List[bool]] aligned with f.sets
+    Rule(17, 'Two Concealed Pungs', 2, 2, PARTITION,
+         lambda f, meta: points_two_concealed_pungs(f.sets, meta.get('concealed_melds')), {'n_pungs': 2},
+         when=lambda hand, meta: isinstance(meta.get('concealed_melds'), (list, tuple))),
+    Rule(18, 'Concealed Kong', 2, 2, PARTITION,
+         lambda f, meta: points_concealed_kong(f.sets, meta.get('concealed_melds')), {'n_kongs': 1},
+         bound='n_kongs', when=lambda hand, meta: isinstance(meta.get('concealed_melds'), (list, tuple))),
+    Rule(19, 'All Simples', 2, 2, TILES, lambda hand, meta: points_all_simples(hand)),
+)
@@ -1,25 +1,17 @@
-from tiles import HONORS, is_suit, rank
+from features import TERMINAL_HONOR_MASK, chow_rule
+from rules import META, PARTITION, Rule
+from tiles import TERMINAL_HONOR_IDS, IDX_RANK
 
 
-def _set_is_outside(s, is_chow_fn):
-    if len(s) in (3, 4) and len(set(s)) == 1:
-        t = s[0]
-        if t in HONORS:
-            return True
-        return is_suit(t) and rank(t) in (1, 9)
-    if len(s) == 3 and is_chow_fn(s):
-        rs = sorted(rank(x) for x in s)
-        return rs[0] == 1 or rs[-1] == 9
-    return False
+@chow_rule
+def _chows_outside(chow_sig):
+    return all(IDX_RANK[t] in (1, 7) for t in chow_sig)
 
 
-def points_outside_hand(sets, pair, is_chow_fn):
-    if not all(_set_is_outside(s, is_chow_fn) for s in sets):
+def points_outside_hand(f):
+    if f.pung_mask & ~TERMINAL_HONOR_MASK or not _chows_outside(f.chow_sig):
         return 0
-    p = pair[0]
-    if p in HONORS:
-        return 4
-    if is_suit(p) and rank(p) in (1, 9):
+    if f.pair[0] in TERMINAL_HONOR_IDS:
         return 4
     return 0
 
@@ -28,17 +20,13 @@ def points_fully_concealed_hand(melds_open, win_by):
     return 4 if (not melds_open and win_by == 'self') else 0
 
 
-def points_two_melded_kongs(sets, is_kong_fn):
-    return 4 if sum(1 for s in sets if is_kong_fn(s)) == 2 else 0
-
-
-
-def compute_points_4(sets, pair, all_tiles, meta, is_chow_fn, is_kong_fn):
-    p4 = {
-        'Outside Hand': points_outside_hand(sets, pair, is_chow_fn),
-        'Two Melded Kongs': points_two_melded_kongs(sets, is_kong_fn),
-        'Fully Concealed Hand (self-draw)': points_fully_concealed_hand(meta.get('melds_open', False), meta.get('win_by')),
-    }
-    return sum(p4.values()), {k: v for k, v in p4.items() if v}
+def points_two_melded_kongs(f):
+    return 4 if f.n_kongs == 2 else 0
 
 
+RULES = (
+    Rule(20, 'Outside Hand', 4, 4, PARTITION, lambda f, meta: points_outside_hand(f), {'hand.has_terminal_honor': 1}),
+    Rule(21, 'Two Melded Kongs', 4, 4, PARTITION, lambda f, meta: points_two_melded_kongs(f), {'n_kongs': 2}),
+    Rule(22, 'Fully Concealed Hand (self-draw)', 4, 4, META,
+         lambda hand, meta: points_fully_concealed_hand(meta.get('melds_open', False), meta.get('win_by'))),
+)
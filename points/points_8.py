@@ -1,78 +1,52 @@
 from itertools import permutations
-from melds import is_chow, is_kong
-from tiles import is_suit, rank, suit
-
-
-def points_mixed_straight(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    starts_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        if s in starts_by_suit:
-            starts_by_suit[s].add(r)
-    for s1, s2, s3 in permutations(['B', 'C', 'D'], 3):
+from features import chow_rule, ids_mask, popcount, suit_bits
+from melds import is_kong
+from rules import EXACT, META, PARTITION, TILES, Rule
+from tiles import TILE_INDEX, IDX_SUIT, IDX_RANK
+
+# 8 points: only tiles that look the same upside down
+REVERSIBLE_IDS = frozenset(TILE_INDEX[t] for t in (
+    'D1', 'D2', 'D3', 'D4', 'D5', 'D8', 'D9', 'B2', 'B4', 'B5', 'B6', 'B8', 'B9', 'DW'))
+REVERSIBLE_MASK = ids_mask(REVERSIBLE_IDS)
+
+
+@chow_rule
+def points_mixed_straight(chow_sig):
+    starts_by_suit = {0: set(), 1: set(), 2: set()}
+    for t in chow_sig:
+        starts_by_suit[IDX_SUIT[t]].add(IDX_RANK[t])
+    for s1, s2, s3 in permutations([0, 1, 2], 3):
         if 1 in starts_by_suit[s1] and 4 in starts_by_suit[s2] and 7 in starts_by_suit[s3]:
             return 8
     return 0
 
 
-def points_reversible_tiles(all_tiles):
-    allowed = {'D1','D2','D3','D4','D5','D8','D9','B2','B4','B5','B6','B8','B9','DW'}
-    for t in all_tiles:
-        if t not in allowed:
-            return 0
-    return 8
+def points_reversible_tiles(hand):
+    return 0 if hand.tile_mask & ~REVERSIBLE_MASK else 8
 
 
-def points_mixed_triple_chow(sets):
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
+@chow_rule
+def points_mixed_triple_chow(chow_sig):
     starts_by_suit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        starts_by_suit.setdefault(s, set()).add(r)
+    for t in chow_sig:
+        starts_by_suit.setdefault(IDX_SUIT[t], set()).add(IDX_RANK[t])
     pts = 0
-    suits = ['B', 'C', 'D']
+    suits = [0, 1, 2]
     if all(s in starts_by_suit for s in suits):
         common = starts_by_suit[suits[0]] & starts_by_suit[suits[1]] & starts_by_suit[suits[2]]
         pts += 8 * len(common)
     return pts
 
 
-def points_mixed_shifted_pungs(sets):
+def points_mixed_shifted_pungs(f):
     # 8 points: Three Pungs or Kongs in the three different suits, shifted up by one
-    pungs_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1:  # Pung or Kong
-            t = s[0]
-            if is_suit(t):
-                s_suit = suit(t)
-                s_rank = rank(t)
-                if s_suit in pungs_by_suit:
-                    pungs_by_suit[s_suit].add(s_rank)
-    
-    # Check for shifted pungs: rank, rank+1, rank+2 in different suits
-    for base_rank in range(1, 8):  # Can't have rank 9 shifted up
-        ranks_needed = {base_rank, base_rank + 1, base_rank + 2}
-        suits_found = set()
-        
-        for s_suit, ranks in pungs_by_suit.items():
-            if ranks_needed & ranks:  # If this suit has any of the needed ranks
-                for rank_val in ranks_needed & ranks:
-                    suits_found.add((s_suit, rank_val))
-        
-        # Check if we have exactly one pung from each of the three suits
-        if len(suits_found) == 3:
-            suit_ranks = list(suits_found)
-            # Verify they are in different suits and properly shifted
-            suits_used = {sr[0] for sr in suit_ranks}
-            ranks_used = {sr[1] for sr in suit_ranks}
-            
-            if len(suits_used) == 3 and ranks_used == ranks_needed:
-                return 8
-    
+    by_suit = [suit_bits(f.pung_mask, s) for s in (0, 1, 2)]
+    for base in range(7):  # Can't have rank 9 shifted up
+        window = 0b111 << base
+        in_window = [b & window for b in by_suit]
+        # exactly one pung per suit inside the window, covering all three ranks
+        if all(popcount(b) == 1 for b in in_window) and in_window[0] | in_window[1] | in_window[2] == window:
+            return 8
     return 0
 
 
@@ -115,7 +89,7 @@ def points_robbing_the_kong(meta):
     return 8 if robbing_kong else 0
 
 
-def points_chicken_hand(sets, pair, all_tiles, meta):
+def points_chicken_hand(meta):
     # 8 points: Winning with a hand that would otherwise be worth 0 points other than flowers
     # This is a complex rule that requires checking if the hand would score 0 without this rule
     
@@ -132,19 +106,19 @@ def points_chicken_hand(sets, pair, all_tiles, meta):
     return 0
 
 
-def compute_points_8(sets, pair, all_tiles, meta):
-    p8 = {
-        'Mixed Triple Chow': points_mixed_triple_chow(sets),
-        'Mixed Straight': points_mixed_straight(sets),
-        'Reversible Tiles': points_reversible_tiles(all_tiles),
-        'Mixed Shifted Pungs': points_mixed_shifted_pungs(sets),
-        'Two Concealed Kongs': points_two_concealed_kongs(sets, meta.get('concealed_melds')),
-        'Last Tile Draw': points_last_tile_draw(meta),
-        'Last Tile Claim': points_last_tile_claim(meta),
-        'Out with Replacement Tile': points_out_with_replacement_tile(meta),
-        'Robbing the Kong': points_robbing_the_kong(meta),
-        'Chicken Hand': points_chicken_hand(sets, pair, all_tiles, meta),
-    }
-    return sum(p8.values()), {k: v for k, v in p8.items() if v}
-
-
+RULES = (
+    Rule(29, 'Mixed Triple Chow', 8, 8, PARTITION, lambda f, meta: points_mixed_triple_chow(f.chow_sig), {'n_chows': 3},
+         bound=EXACT),
+    Rule(30, 'Mixed Straight', 8, 8, PARTITION, lambda f, meta: points_mixed_straight(f.chow_sig), {'n_chows': 3},
+         bound=EXACT),
+    Rule(31, 'Reversible Tiles', 8, 8, TILES, lambda hand, meta: points_reversible_tiles(hand)),
+    Rule(32, 'Mixed Shifted Pungs', 8, 8, PARTITION, lambda f, meta: points_mixed_shifted_pungs(f), {'n_pungs': 3}),
+    Rule(33, 'Two Concealed Kongs', 8, 8, PARTITION,
+         lambda f, meta: points_two_concealed_kongs(f.sets, meta.get('concealed_melds')), {'n_kongs': 2},
+         when=lambda hand, meta: meta.get('concealed_melds') is not None),
+    Rule(34, 'Last Tile Draw', 8, 8, META, lambda hand, meta: points_last_tile_draw(meta)),
+    Rule(35, 'Last Tile Claim', 8, 8, META, lambda hand, meta: points_last_tile_claim(meta)),
+    Rule(36, 'Out with Replacement Tile', 8, 8, META, lambda hand, meta: points_out_with_replacement_tile(meta)),
+    Rule(37, 'Robbing the Kong', 8, 8, META, lambda hand, meta: points_robbing_the_kong(meta)),
+    Rule(38, 'Chicken Hand', 8, 8, META, lambda hand, meta: points_chicken_hand(meta)),
+)
@@ -0,0 +1,178 @@
+"""
+Opt-in profiling of the scoring pipeline: call counts and cumulative time per
+pipeline stage and per rule function.
+
+    from profiling import profiling
+
+    with profiling() as prof:
+        best_score(hand, meta)
+    prof.as_dict()     # {'stages': ..., 'rules': ..., 'paths': ...}
+    prof.collapsed()   # "best_score;evaluate;points_6;All Pungs 12" lines, for flamegraph.pl
+
+While profiling is on, scoring's module globals (EVALUATOR, enumerate_partitions,
+hand_features, ...) are replaced by timed wrappers, and turning it off puts the
+originals back, so nothing is checked or wrapped while it is off.
+
+Time is recorded per call path. Stages nest: best_score > lesser_honors, partition,
+features, bind, evaluate > exclusions, and bound (search='bound'). Rule functions
+appear as points_<tier>;<rule name> under the stage that called them. Calls that
+bypass scoring's globals (e.g. through `from scoring import EVALUATOR` done before
+profiling started) are not seen. A Profiler is not thread-safe: profile one
+thread at a time.
+"""
+
+import time
+from contextlib import contextmanager
+
+import scoring
+from rules import HandRules, RuleEvaluator
+
+STAGES = ('best_score', 'lesser_honors', 'partition', 'features', 'bind', 'evaluate', 'exclusions', 'bound')
+
+
+class Profiler:
+    """Calls and cumulative seconds per call path (a tuple of frame names)."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = {}  # path -> [calls, seconds]
+        self.rule_tiers = {}  # rule name -> tier
+        self._stack = []
+
+    def reset(self):
+        self.stats.clear()
+
+    def timed(self, frames, fn):
+        """fn wrapped to record each call under frames, nested in the timed call running it."""
+        stack = self._stack
+        stats = self.stats
+        clock = self.clock
+        depth = len(frames)
+
+        def wrapper(*args, **kwargs):
+            stack.extend(frames)
+            path = tuple(stack)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                del stack[-depth:]
+                entry = stats.get(path)
+                if entry is None:
+                    stats[path] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+
+        return wrapper
+
+    def _self_seconds(self):
+        """{path: seconds not spent in a recorded callee}."""
+        own = {path: seconds for path, (_, seconds) in self.stats.items()}
+        for path, (_, seconds) in self.stats.items():
+            for cut in range(len(path) - 1, 0, -1):
+                if path[:cut] in own:
+                    own[path[:cut]] -= seconds
+                    break
+        return own
+
+    def as_dict(self):
+        """{'stages': {stage: calls, seconds}, 'rules': {name: tier, calls, seconds},
+        'paths': {'a;b;c': calls, seconds, self_seconds}}; stages and rules sum over paths."""
+        stages = {}
+        rules = {}
+        paths = {}
+        own = self._self_seconds()
+        for path, (calls, seconds) in sorted(self.stats.items()):
+            paths[';'.join(path)] = {'calls': calls, 'seconds': seconds, 'self_seconds': own[path]}
+            name = path[-1]
+            if len(path) > 1 and path[-2].startswith('points_'):
+                entry = rules.setdefault(name, {'tier': self.rule_tiers.get(name), 'calls': 0, 'seconds': 0.0})
+            else:
+                entry = stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += calls
+            entry['seconds'] += seconds
+        return {'stages': stages, 'rules': rules, 'paths': paths}
+
+    def collapsed(self):
+        """Collapsed-stack text ("frame;frame;frame microseconds" per line) of self times."""
+        lines = []
+        for path, seconds in sorted(self._self_seconds().items()):
+            micros = round(seconds * 1e6)
+            if micros > 0:
+                lines.append(f"{';'.join(path)} {micros}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+class _ProfiledHandRules(HandRules):
+    """HandRules timing evaluate, with its exclusions as their own stage, and partition_bound."""
+
+    def __init__(self, evaluator, hand_hits, groups):
+        super().__init__(evaluator, hand_hits, groups)
+        timed = evaluator.profiler.timed
+        # instance attributes shadow the methods, so HandRules.evaluate calls the timed exclusions
+        self.evaluate = timed(('evaluate',), super().evaluate)
+        self.exclusions = timed(('exclusions',), super().exclusions)
+        self.partition_bound = timed(('bound',), super().partition_bound)
+
+
+def _profiled_evaluator(evaluator, profiler):
+    """A copy of evaluator whose rule functions, bind and HandRules are timed by profiler."""
+    rules = []
+    for r in evaluator.rules:
+        profiler.rule_tiers[r.name] = r.tier
+        rules.append(r._replace(fn=profiler.timed((f'points_{r.tier}', r.name), r.fn)))
+    profiled = RuleEvaluator(rules)
+    profiled.excludes = evaluator.excludes
+    profiled.profiler = profiler
+    profiled.bound_type = _ProfiledHandRules
+    profiled.bind = profiler.timed(('bind',), profiled.bind)
+    return profiled
+
+
+_PROFILER = None
+_ORIGINALS = {}
+_STAGE_FUNCTIONS = {
+    '_best_score_counts': 'best_score',
+    'lesser_honors_result': 'lesser_honors',
+    'enumerate_partitions': 'partition',
+    'hand_features': 'features',
+    'PartitionFeatures': 'features',
+}
+
+
+def enable_profiling(profiler=None):
+    """Start profiling scoring into profiler (default: a new Profiler) and return it."""
+    global _PROFILER
+    if _PROFILER is not None:
+        disable_profiling()
+    profiler = profiler or Profiler()
+    for name, stage in _STAGE_FUNCTIONS.items():
+        _ORIGINALS[name] = getattr(scoring, name)
+        setattr(scoring, name, profiler.timed((stage,), _ORIGINALS[name]))
+    _ORIGINALS['EVALUATOR'] = scoring.EVALUATOR
+    scoring.EVALUATOR = _profiled_evaluator(scoring.EVALUATOR, profiler)
+    _PROFILER = profiler
+    return profiler
+
+
+def disable_profiling():
+    """Stop profiling and restore scoring; returns the profiler that was active (or None)."""
+    global _PROFILER
+    profiler = _PROFILER
+    for name, fn in _ORIGINALS.items():
+        setattr(scoring, name, fn)
+    _ORIGINALS.clear()
+    _PROFILER = None
+    return profiler
+
+
+@contextmanager
+def profiling(profiler=None):
+    """Profile scoring for the duration of a with block; yields the Profiler."""
+    profiler = enable_profiling(profiler)
+    try:
+        yield profiler
+    finally:
+        disable_profiling()
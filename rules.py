@@ -0,0 +1,274 @@
+"""
+Declarative rule registry.
+
+Each points/ tier module declares its rules as a RULES tuple of Rule records:
+a stable integer id, name, points, tier, inputs and preconditions. compile_rules()
+turns the full registry and its exclusion table into one RuleEvaluator, and
+RuleEvaluator.bind(hand, meta) specializes it to one hand:
+
+- TILES and META rules don't depend on the partition, so they are evaluated once
+  per (hand, meta) with fn(hand_features, meta) and reused for every partition.
+  TILES rules must not read meta either: their hits depend on the tiles alone, so
+  they can be computed once per tile multiset (tile_hits) and stored.
+- PARTITION rules are evaluated per partition with fn(partition_features, meta).
+
+Preconditions say when a rule can possibly score:
+- `needs` maps feature attributes to minimum values, e.g. {'n_chows': 2}.
+  PartitionFeatures attributes are checked per partition; 'hand.*' attributes
+  once per hand.
+- `when(hand, meta)` is checked once per hand, e.g. for rules that need a meta flag.
+Rules whose hand-level preconditions fail are left out of the bound HandRules, and
+the rest are grouped by their per-partition needs. A group is skipped as soon as
+one check fails, so a rule costs nothing on hands it cannot apply to.
+
+A rule's `bound` caps what fn can return for one partition: None means `points`,
+an int is a fixed cap, a feature attribute name caps it at points * that count
+(e.g. 'n_kongs' for a rule scoring per kong), and EXACT uses fn's own result, for
+rules cheap enough (e.g. memoized) to evaluate while bounding.
+
+Rule ids are stable: they key bitmasks (bit id) and points arrays (index id), and
+breakdowns list rules in id order. New rules take new ids; ids are never reused.
+A partition's result is a bitmask of the rules that scored plus a points array.
+Exclusions ("does not combine with") are compiled into one bitmask per rule: every
+rule that scored removes the rules it excludes, and the total is summed after that.
+"""
+
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, NamedTuple, Optional, Union
+
+TILES = 'tiles'
+META = 'meta'
+PARTITION = 'partition'
+INPUTS = (TILES, META, PARTITION)
+
+EXACT = 'exact'
+
+
+class Rule(NamedTuple):
+    id: int
+    name: str
+    points: int  # points per occurrence; fn returns the awarded total
+    tier: int
+    inputs: str
+    fn: Callable
+    needs: Dict[str, int] = {}
+    bound: Optional[Union[int, str]] = None
+    when: Optional[Callable] = None
+
+
+class RuleEvaluator:
+    """Compiled form of a rule registry and its exclusion table, indexed by rule id."""
+
+    def __init__(self, rules, exclusions=None):
+        self.rules = tuple(rules)
+        self.index = {r.name: r.id for r in self.rules}
+        if len(self.index) != len(self.rules):
+            raise ValueError("Duplicate rule names in registry.")
+        if len({r.id for r in self.rules}) != len(self.rules) or any(r.id < 0 for r in self.rules):
+            raise ValueError("Rule ids must be unique non-negative integers.")
+        for r in self.rules:
+            if r.inputs not in INPUTS:
+                raise ValueError(f"Rule {r.name!r}: unknown inputs {r.inputs!r} (expected one of {INPUTS})")
+        self.size = max((r.id for r in self.rules), default=-1) + 1
+        names = [None] * self.size
+        for r in self.rules:
+            names[r.id] = r.name
+        self.names = tuple(names)  # by id; None for unused ids
+        self.excludes = compile_exclusions(exclusions or {}, self.index, self.size)
+        # META and TILES rules as (id, fn, hand-level needs, when); partition rules split into
+        # those with hand-level preconditions (checked in bind) and those without
+        self._hand_rules = []
+        self._tile_rules = []
+        self._partition_rules = {}
+        self._conditional = []
+        always = []
+        for r in self.rules:
+            i = r.id
+            hand_needs = tuple((attrgetter(k[5:]), least) for k, least in r.needs.items() if k.startswith('hand.'))
+            part_needs = tuple(sorted((k, least) for k, least in r.needs.items() if not k.startswith('hand.')))
+            if r.inputs != PARTITION:
+                if part_needs:
+                    raise ValueError(f"Rule {r.name!r}: {r.inputs} rules can only need 'hand.*' attributes")
+                rules = self._tile_rules if r.inputs == TILES else self._hand_rules
+                rules.append((i, r.fn, hand_needs, r.when))
+                continue
+            self._partition_rules[i] = (r, part_needs)
+            if hand_needs or r.when is not None:
+                self._conditional.append((i, hand_needs, r.when))
+            else:
+                always.append(i)
+        self._always = tuple(always)
+        self._compile = lru_cache(maxsize=256)(self._compile_partition_rules)
+        self.bound_type = HandRules  # what bind returns; profiling swaps in a timed subclass
+
+    def tile_hits(self, hand):
+        """[(rule id, points)] of the TILES rules that score for these HandFeatures."""
+        meta = {}
+        hits = []
+        for i, fn, hand_needs, when in self._tile_rules:
+            if _passes(hand, meta, hand_needs, when):
+                pts = fn(hand, meta)
+                if pts:
+                    hits.append((i, pts))
+        return hits
+
+    def bind(self, hand, meta, tile_hits=None):
+        """HandRules for one hand's HandFeatures and meta.
+
+        tile_hits may be passed in when the TILES rule hits are already known (e.g. stored).
+        """
+        hand_hits = self.tile_hits(hand) if tile_hits is None else list(tile_hits)
+        for i, fn, hand_needs, when in self._hand_rules:
+            if _passes(hand, meta, hand_needs, when):
+                pts = fn(hand, meta)
+                if pts:
+                    hand_hits.append((i, pts))
+        enabled = tuple(i for i, hand_needs, when in self._conditional if _passes(hand, meta, hand_needs, when))
+        return self.bound_type(self, hand_hits, self._compile(enabled))
+
+    def exclude(self, mask):
+        """mask with every rule excluded by a rule in mask removed."""
+        removed = 0
+        excludes = self.excludes
+        rest = mask
+        while rest:
+            low = rest & -rest
+            removed |= excludes[low.bit_length() - 1]
+            rest ^= low
+        return mask & ~removed
+
+    def breakdown(self, mask, points):
+        """Breakdown dict {name: points} for the rules in mask, in id order."""
+        out = {}
+        names = self.names
+        while mask:
+            low = mask & -mask
+            i = low.bit_length() - 1
+            out[names[i]] = points[i]
+            mask ^= low
+        return out
+
+    def _compile_partition_rules(self, enabled):
+        """[(checks, [(rule id, fn)], fixed bound, [(count getter, points)], [exact fn])] per distinct needs.
+
+        enabled lists the conditional rules whose hand-level preconditions passed.
+        """
+        groups = {}
+        for i in sorted(self._always + enabled):
+            r, part_needs = self._partition_rules[i]
+            groups.setdefault(part_needs, []).append((i, r))
+        compiled = []
+        for key, rules in groups.items():
+            fixed = 0
+            scaled = []
+            exact = []
+            for _, r in rules:
+                if r.bound == EXACT:
+                    exact.append(r.fn)
+                elif isinstance(r.bound, str):
+                    scaled.append((attrgetter(r.bound), r.points))
+                else:
+                    fixed += r.points if r.bound is None else r.bound
+            checks = tuple((attrgetter(k), least) for k, least in key)
+            compiled.append((checks, tuple((i, r.fn) for i, r in rules), fixed, tuple(scaled), tuple(exact)))
+        return tuple(compiled)
+
+
+class HandRules:
+    """RuleEvaluator bound to one (hand, meta): hand-level hits plus the partition rules that can still apply."""
+
+    def __init__(self, evaluator, hand_hits, groups):
+        self.evaluator = evaluator
+        self.hand_hits = hand_hits
+        self.hand_points = sum(pts for _, pts in hand_hits)
+        self._groups = groups
+        points = [0] * evaluator.size
+        mask = removed = 0
+        for i, pts in hand_hits:
+            points[i] = pts
+            mask |= 1 << i
+            removed |= evaluator.excludes[i]
+        self._points = points
+        self._mask = mask
+        self._removed = removed
+
+    def partition_hits(self, f, meta):
+        """[(rule id, points)] of the PARTITION rules that score for these PartitionFeatures."""
+        hits = []
+        for checks, rules, _, _, _ in self._groups:
+            for get, least in checks:
+                if get(f) < least:
+                    break
+            else:
+                for i, fn in rules:
+                    pts = fn(f, meta)
+                    if pts:
+                        hits.append((i, pts))
+        return hits
+
+    def partition_bound(self, f, meta):
+        """Upper bound on the PARTITION rule points these PartitionFeatures can score."""
+        total = 0
+        for checks, _, fixed, scaled, exact in self._groups:
+            for get, least in checks:
+                if get(f) < least:
+                    break
+            else:
+                total += fixed
+                for get, points in scaled:
+                    total += points * get(f)
+                for fn in exact:
+                    total += fn(f, meta)
+        return total
+
+    def evaluate(self, f, meta):
+        """(total, mask, points) for one partition, after exclusions.
+
+        mask has bit id set for every rule that scored and wasn't excluded; points[id]
+        holds what each rule scored (excluded rules keep their value but leave mask).
+        """
+        return self.exclusions(self.partition_hits(f, meta))
+
+    def exclusions(self, partition_hits):
+        """evaluate's (total, mask, points) for the hand-level hits plus partition_hits."""
+        points = self._points[:]
+        mask = self._mask
+        removed = self._removed
+        excludes = self.evaluator.excludes
+        for i, pts in partition_hits:
+            points[i] = pts
+            mask |= 1 << i
+            removed |= excludes[i]
+        total = 0
+        for i, pts in self.hand_hits:
+            if not removed >> i & 1:
+                total += pts
+        for i, pts in partition_hits:
+            if not removed >> i & 1:
+                total += pts
+        return total, mask & ~removed, points
+
+
+def _passes(hand, meta, hand_needs, when):
+    for get, least in hand_needs:
+        if get(hand) < least:
+            return False
+    return when is None or bool(when(hand, meta))
+
+
+def compile_exclusions(exclusions, index, size):
+    """Per rule id, the bitmask of rule ids it excludes, from a {name: {excluded names}} table."""
+    excludes = [0] * size
+    for rule, excluded in exclusions.items():
+        if rule not in index:
+            raise ValueError(f"Exclusion for unknown rule {rule!r}")
+        for name in excluded:
+            if name not in index:
+                raise ValueError(f"Rule {rule!r} excludes unknown rule {name!r}")
+            excludes[index[rule]] |= 1 << index[name]
+    return excludes
+
+
+def compile_rules(rules, exclusions=None):
+    return RuleEvaluator(rules, exclusions)
@@ -1,591 +1,298 @@
-from collections import Counter
-
-from melds import is_chow, is_kong
-from tiles import DRAGONS, HONORS, WINDS, is_suit, rank, suit, normalize_hand, tiles_to_multiset
-from partition import enumerate_partitions
-from points.points_1 import compute_points_1
-from points.points_2 import compute_points_2
-from points.points_4 import compute_points_4
-from points.points_6 import compute_points_6
-from points.points_8 import compute_points_8
-from points.points_12 import compute_points_12
-from points.points_16 import compute_points_16
-from points.points_24 import compute_points_24
-from points.points_64 import compute_points_64
-from points.points_88 import compute_points_88
-from combine_rules import process_exclusions
+import sys
 
+from cache import BoundedCache
+from features import PartitionFeatures, hand_features
+from tiles import normalize_hand, tiles_to_counts, meld_names
+from partition import enumerate_partitions, iter_partitions, PARTITION_STATS
+from points import points_1, points_2, points_4, points_6, points_8, points_12, points_16, points_24, points_64, \
+    points_88
+from rules import compile_rules
+from combine_rules import EXCLUSIONS
 
-def count_flowers(flowers):
-    return len(flowers)  # 1 point each (doesn't count toward 8)
 
+# Every rule, by tier then as declared in the tier module (breakdowns follow rule id order)
+REGISTRY = (points_1.RULES + points_2.RULES + points_4.RULES + points_6.RULES + points_8.RULES + points_12.RULES +
+            points_16.RULES + points_24.RULES + points_64.RULES + points_88.RULES)
+EVALUATOR = compile_rules(REGISTRY, EXCLUSIONS)
+RULE_NAMES = EVALUATOR.names  # by rule id
 
-def points_pure_double_chow(sets):
-    # 1pt: two identical chows in same suit
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    seen = set()
-    pts = 0
-    for i in range(len(chows)):
-        for j in range(i + 1, len(chows)):
-            if chows[i] == chows[j] and chows[i] not in seen:
-                pts += 1
-                seen.add(chows[i])
-    return pts
-
-
-def points_mixed_double_chow(sets):
-    # 1pt: same numbers different suits
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    pts = 0
-    for i in range(len(chows)):
-        for j in range(i + 1, len(chows)):
-            r1 = min(rank(x) for x in chows[i])
-            r2 = min(rank(x) for x in chows[j])
-            if r1 == r2 and suit(chows[i][0]) != suit(chows[j][0]):
-                pts += 1
-    return pts
-
-
-def points_short_straight(sets):
-    # 1pt: two chows forming 1-6 straight in same suit
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    pts = 0
-    used = set()
-    for i in range(len(chows)):
-        s1 = suit(chows[i][0])
-        r1 = min(rank(x) for x in chows[i])
-        for j in range(i + 1, len(chows)):
-            s2 = suit(chows[j][0])
-            r2 = min(rank(x) for x in chows[j])
-            if s1 == s2 and {r1, r2} in ({1, 4}, {2, 5}, {3, 6}, {4, 7}):
-                key = tuple(sorted([(s1, r1), (s2, r2)]))
-                if key not in used:
-                    pts += 1
-                    used.add(key)
-    return pts
-
-
-def points_two_terminal_chows(sets):
-    # 1pt: have 123 and 789 in same suit
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    bysuit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        bysuit.setdefault(s, set()).add(r)
-    pts = 0
-    for s, starts in bysuit.items():
-        if 1 in starts and 7 in starts:
-            pts += 1
-    return pts
-
-
-def points_pung_term_or_honor(sets, seat_wind=None, prevalent_wind=None):
-    # 1pt per Pung/Kong of terminals (1/9) or honor (non seat/prevalent wind)
-    pts = 0
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1:
-            t = s[0]
-            if is_suit(t) and rank(t) in (1, 9):
-                pts += 1
-            elif t in WINDS:
-                if t != f"W{seat_wind}" and t != f"W{prevalent_wind}":
-                    pts += 1
-    return pts
-
-
-def points_melded_kong(sets):
-    # 1pt per melded kong; we assume all kongs given in sets are melded unless flagged otherwise.
-    return sum(1 for s in sets if is_kong(s))
-
-
-def points_one_voided_suit(all_tiles):
-    # 1pt: hand has no tiles from one suit (i.e., uses exactly 2 suits at most)
-    suits_present = {suit(t) for t in all_tiles if is_suit(t)}
-    return 1 if len(suits_present) <= 2 else 0
-
-
-def points_no_honor(all_tiles):
-    # 1pt: no honors
-    return 1 if all(t not in HONORS for t in all_tiles) else 0
-
-
-def points_self_drawn(win_by):
-    # 1pt: self drawn
-    return 1 if win_by == 'self' else 0
-
-
-def points_wait_types(wait_type):
-    # 1pt: edge, closed, or pair wait (only if single wait)
-    return 1 if wait_type in {'edge', 'closed', 'pair'} else 0
-
-
-def points_dragon_pung(sets):
-    # 2pt per dragon pung/kong
-    return sum(2 for s in sets if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in DRAGONS)
-
-
-def points_wind_pungs(sets, seat_wind, prevalent_wind):
-    # 2pt for seat wind pung/kong; 2pt for prevalent wind pung/kong
-    pts = 0
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in WINDS:
-            if s[0] == f"W{seat_wind}":
-                pts += 2
-            if s[0] == f"W{prevalent_wind}":
-                pts += 2
-    return pts
-
-
-def points_concealed_hand(melds_open, win_by):
-    # 2pt if no melded sets and win by discard (classic MCR)
-    return 2 if (not melds_open and win_by == 'discard') else 0
-
-
-# ------------------------------
-# Additional rules (2, 6, 8, 16, 24, 88 point tiers)
-# Reference: Chinese Official Mahjong Scoring Rules (MCR) — see https://playmahjong.io/chinese-official-rules
-# ------------------------------
-
-def points_all_chows(sets):
-    # 2pt: all 4 melds are chows
-    return 2 if all(len(s) == 3 and is_chow(s) for s in sets) else 0
-
-
-def points_all_simples(all_tiles):
-    # 2pt: no terminals (1/9) and no honors
-    for t in all_tiles:
-        if not is_suit(t):
-            return 0
-        r = rank(t)
-        if r in (1, 9):
-            return 0
-    return 2
-
-
-def points_all_pungs(sets):
-    # 6pt: all melds are pungs/kongs
-    if all((len(s) in (3, 4)) and (len(set(s)) == 1) for s in sets):
-        return 6
-    return 0
-
-
-def points_mixed_shifted_chows(sets):
-    # 6pt: three chows in different suits with starting ranks r, r+1, r+2
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    starts_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        if s in starts_by_suit:
-            starts_by_suit[s].add(r)
-    pts = 0
-    # try all r and suit permutations
-    suits = ['B', 'C', 'D']
-    for r in range(1, 8):  # start ranks 1..7 valid for chows
-        # check if there exists a bijection of suits to r,r+1,r+2
-        from itertools import permutations
-        found = False
-        for perm in permutations(suits, 3):
-            if (r in starts_by_suit[perm[0]] and
-                (r + 1) in starts_by_suit[perm[1]] and
-                (r + 2) in starts_by_suit[perm[2]]):
-                found = True
-                break
-        if found:
-            pts += 6
-    return pts
-
-
-def points_two_dragon_pungs(sets):
-    # 6pt: two distinct dragon pungs/kongs
-    dragons = set()
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in DRAGONS:
-            dragons.add(s[0])
-    return 6 if len(dragons) >= 2 else 0
-
-
-def points_all_types(all_tiles):
-    # 6pt: has B, C, D suits and at least one honor
-    suits_present = {suit(t) for t in all_tiles if is_suit(t)}
-    has_honor = any(t in HONORS for t in all_tiles)
-    if suits_present == {'B', 'C', 'D'} and has_honor:
-        return 6
-    return 0
-
-
-def points_mixed_triple_chow(sets):
-    # 8pt: same-number chows in all three suits
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    starts_by_suit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        starts_by_suit.setdefault(s, set()).add(r)
-    suits = ['B', 'C', 'D']
-    pts = 0
-    if all(s in starts_by_suit for s in suits):
-        common = starts_by_suit[suits[0]] & starts_by_suit[suits[1]] & starts_by_suit[suits[2]]
-        pts += 8 * len(common)
-    return pts
-
-
-def points_pure_straight(sets):
-    # 16pt: have 123, 456, 789 in the same suit
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    bysuit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        bysuit.setdefault(s, set()).add(r)
-    pts = 0
-    for s, starts in bysuit.items():
-        if {1, 4, 7}.issubset(starts):
-            pts += 16
-    return pts
-
-
-def points_mixed_straight(sets):
-    # 8pt: 123, 456, 789 each in a different suit (uses all three suits)
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    starts_by_suit = {'B': set(), 'C': set(), 'D': set()}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        if s in starts_by_suit:
-            starts_by_suit[s].add(r)
-    from itertools import permutations
-    for s1, s2, s3 in permutations(['B', 'C', 'D'], 3):
-        if 1 in starts_by_suit[s1] and 4 in starts_by_suit[s2] and 7 in starts_by_suit[s3]:
-            return 8
-    return 0
-
-
-def points_half_flush(all_tiles):
-    # 6pt: one suit plus honors
-    suits_present = {suit(t) for t in all_tiles if is_suit(t)}
-    has_honor = any(t in HONORS for t in all_tiles)
-    if len(suits_present) == 1 and has_honor:
-        return 6
-    return 0
-
-
-def points_full_flush(all_tiles):
-    # 24pt: one suit only, no honors
-    suits_present = {suit(t) for t in all_tiles if is_suit(t)}
-    has_honor = any(t in HONORS for t in all_tiles)
-    if len(suits_present) == 1 and not has_honor:
-        return 24
-    return 0
-
-
-def points_big_three_dragons(sets):
-    # 88pt: pungs/kongs of all 3 dragons
-    dragons = set()
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in DRAGONS:
-            dragons.add(s[0])
-    return 88 if len(dragons) == 3 else 0
-
-
-def points_big_four_winds(sets):
-    # 88pt: pungs/kongs of all 4 winds
-    winds = set()
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in WINDS:
-            winds.add(s[0])
-    return 88 if len(winds) == 4 else 0
-
-
-def points_three_kongs(sets):
-    # 16pt: exactly 3 kongs
-    k = sum(1 for s in sets if is_kong(s))
-    return 16 if k == 3 else 0
-
-
-def points_four_kongs(sets):
-    # 88pt: exactly 4 kongs
-    k = sum(1 for s in sets if is_kong(s))
-    return 88 if k == 4 else 0
-
-
-def points_big_three_winds(sets):
-    # 64pt: pungs/kongs of 3 different winds
-    winds = set()
-    for s in sets:
-        if len(s) in (3, 4) and len(set(s)) == 1 and s[0] in WINDS:
-            winds.add(s[0])
-    return 64 if len(winds) == 3 else 0
-
-
-def points_all_terminals_and_honors(all_tiles):
-    # 64pt: tiles are all terminals or honors
-    for t in all_tiles:
-        if t in HONORS:
-            continue
-        if not is_suit(t) or rank(t) not in (1, 9):
-            return 0
-    return 64
-
-
-def points_pure_terminal_chows(sets):
-    # 64pt: two 123 chows, two 789 chows and a pair of 5s in one suit
-    chows = [s for s in sets if len(s) == 3 and is_chow(s)]
-    if len(chows) != 4:
-        return 0
-    bysuit = {}
-    for c in chows:
-        s = suit(c[0])
-        r = min(rank(x) for x in c)
-        bysuit.setdefault(s, []).append(r)
-    for s, starts in bysuit.items():
-        if starts.count(1) == 2 and starts.count(7) == 2:
-            return 64
-    return 0
-
-
-def points_all_green(all_tiles):
-    # 88pt: only 2,3,4,6,8 of Bamboo and Green Dragon
-    green_suits = {'B2', 'B3', 'B4', 'B6', 'B8'}
-    for t in all_tiles:
-        if t == 'DG':
-            continue
-        if t in green_suits:
-            continue
-        if is_suit(t) and suit(t) == 'B' and rank(t) in (2, 3, 4, 6, 8):
-            continue
-        return 0
-    return 88
-
-
-def points_nine_gates(all_tiles, melds_open):
-    # 88pt: concealed, one suit, tiles 1112345678999 + any same-suit tile
-    if melds_open:
-        return 0
-    suit_counts = {}
-    for t in all_tiles:
-        if not is_suit(t):
-            return 0
-        suit_counts.setdefault(suit(t), []).append(rank(t))
-    if len(suit_counts) != 1:
-        return 0
-    ranks = sorted(next(iter(suit_counts.values())))
-    # Need at least the multiset: 1x3, 2..8 at least 1, 9x3
-    from collections import Counter as _C
-    c = _C(ranks)
-    need = {1: 3, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1, 8: 1, 9: 3}
-    for r, n in need.items():
-        if c[r] < n:
-            return 0
-    # and total is 14
-    if len(ranks) != 14:
-        return 0
-    return 88
-
-
-def points_thirteen_orphans(all_tiles, melds_open):
-    # 88pt: terminals and honors 13 unique + one duplicate; concealed
-    if melds_open:
-        return 0
-    terminals = {f"B{r}" for r in (1, 9)} | {f"C{r}" for r in (1, 9)} | {f"D{r}" for r in (1, 9)}
-    key_tiles = terminals | HONORS
-    if len(all_tiles) != 14:
-        return 0
-    if any(t not in key_tiles for t in all_tiles):
-        return 0
-    from collections import Counter as _C
-    c = _C(all_tiles)
-    if sum(1 for t in key_tiles if c[t] >= 1) != 13:
-        return 0
-    if sum(1 for t in key_tiles if c[t] == 2) != 1:
-        return 0
-    return 88
-
-
-def points_seven_shifted_pairs(all_tiles, melds_open):
-    # 88pt: seven pairs in one suit, ranks r..r+6
-    if melds_open:
-        return 0
-    from collections import Counter as _C
-    c = _C(all_tiles)
-    pairs = [t for t, n in c.items() if n == 2 and is_suit(t)]
-    if len(pairs) != 7:
-        return 0
-    suits = {suit(t) for t in pairs}
-    if len(suits) != 1:
-        return 0
-    ranks = sorted(rank(t) for t in pairs)
-    base = ranks[0]
-    if ranks == list(range(base, base + 7)):
-        return 88
-    return 0
-
-
-# ------------------------------
-# 8-point rules
-# ------------------------------
-def points_reversible_tiles(all_tiles):
-    # 8pt: only reversible tiles
-    allowed = {
-        # Circles/Dots (assumed suit 'D')
-        'D1','D2','D3','D4','D5','D8','D9',
-        # Bamboo (suit 'B')
-        'B2','B4','B5','B6','B8','B9',
-        # White Dragon
-        'DW',
-    }
-    for t in all_tiles:
-        if t not in allowed:
-            return 0
-    return 8
-
-# ------------------------------
-# 4-point rules
-# ------------------------------
-def _set_is_outside(s):
-    # returns True if set contains a terminal or honor
-    if len(s) in (3, 4) and len(set(s)) == 1:
-        t = s[0]
-        if t in HONORS:
-            return True
-        return is_suit(t) and rank(t) in (1, 9)
-    # chow case
-    if len(s) == 3 and is_chow(s):
-        rs = sorted(rank(x) for x in s)
-        return rs[0] == 1 or rs[-1] == 9
-    return False
 
+# best_score search modes: 'exhaustive' scores every partition, 'bound' skips partitions
+# whose upper bound can't beat the best so far. Both return the same result.
+SEARCH_MODES = ('bound', 'exhaustive')
 
-def points_outside_hand(sets, pair):
-    # 4pt: every meld and the pair are terminals/honors-inclusive
-    if not all(_set_is_outside(s) for s in sets):
-        return 0
-    p = pair[0]
-    if p in HONORS:
-        return 4
-    if is_suit(p) and rank(p) in (1, 9):
-        return 4
-    return 0
 
+class SearchStats:
+    """Running partition counts of best_score's search: scored vs. pruned by bound."""
 
-def points_two_melded_kongs(sets):
-    # 4pt: exactly two kongs (treated as melded in this model)
-    return 4 if sum(1 for s in sets if is_kong(s)) == 2 else 0
+    def __init__(self):
+        self.reset()
 
+    def reset(self):
+        self.hands = 0
+        self.partitions = 0
+        self.scored = 0
+        self.ceiling_stops = 0
 
-def points_fully_concealed_hand(melds_open, win_by):
-    # 4pt: fully concealed hand winning by self-draw
-    return 4 if (not melds_open and win_by == 'self') else 0
+    def record(self, partitions, scored, stopped):
+        self.hands += 1
+        self.partitions += partitions
+        self.scored += scored
+        self.ceiling_stops += stopped
 
+    def as_dict(self):
+        return {
+            'hands': self.hands,
+            'partitions': self.partitions,
+            'scored': self.scored,
+            'pruned': self.partitions - self.scored,
+            'ceiling_stops': self.ceiling_stops,
+        }
 
-def score_partition(sets, pair, all_tiles, meta):
-    """Apply implemented rules and return (base_points_without_flowers, flower_points, breakdown dict)."""
-    seat_wind = meta.get('seat_wind')  # 'E','S','W','N'
-    prevalent_wind = meta.get('prevalent_wind')  # 'E','S','W','N'
-    win_by = meta.get('win_by')  # 'self' or 'discard'
-    melds_open = meta.get('melds_open', False)
-    wait_type = meta.get('wait_type')  # None|'edge'|'closed'|'pair'
-    flowers = meta.get('flowers', [])
 
-    # 1-point rules (module)
-    p1_total, p1 = compute_points_1(sets, pair, all_tiles, meta)
+# Aggregated by best_score over every standard hand it scores
+SEARCH_STATS = SearchStats()
 
-    # 2-point rules (module)
-    p2_total, p2 = compute_points_2(sets, pair, all_tiles, meta, is_chow)
-    
-    # 4-point rules (module)
-    p4_total, p4 = compute_points_4(sets, pair, all_tiles, meta, is_chow, is_kong)
-    
-    # 6-point rules (module)
-    p6_total, p6 = compute_points_6(sets, pair, all_tiles, meta, is_chow, suit, rank, HONORS)
 
-    # 8-point rules (module)
-    p8_total, p8 = compute_points_8(sets, pair, all_tiles, meta)
+def _result_nbytes(key, result):
+    return (sys.getsizeof(key) + sum(sys.getsizeof(k) for k in key) + sys.getsizeof(result)
+            + sum(sys.getsizeof(v) for v in result.values()))
 
-    # 12-point rules (module)
-    p12_total, p12 = compute_points_12(sets, pair, all_tiles, meta)
 
-    # Exclusions: Mixed Triple Chow does not combine with Mixed Double Chow
-    if p8.get('Mixed Triple Chow', 0) and p1.get('Mixed Double Chow', 0):
-        p4_adj = 0  # no 4-pt impact here, but keep variable for pattern
-        p1_total -= p1['Mixed Double Chow']
-        del p1['Mixed Double Chow']
+# Opt-in cache of best_score results, keyed by (packed count vector, meta signature incl.
+# flowers); disabled (max_entries=0) until configure_result_cache turns it on.
+RESULT_CACHE = BoundedCache(max_entries=0, sizeof=_result_nbytes)
 
-    # Reversible Tiles excludes One Voided Suit
-    if p8.get('Reversible Tiles', 0) and p1.get('One Voided Suit', 0):
-        p1_total -= p1['One Voided Suit']
-        del p1['One Voided Suit']
 
-    # 16-point rules (module)
-    p16_total, p16 = compute_points_16(sets, pair, all_tiles, meta)
+def configure_result_cache(max_entries=None, max_bytes=None, ttl=None):
+    """Enable or resize the best_score result cache; ttl is in seconds.
 
-    # 24-point rules (module)
-    p24_total, p24 = compute_points_24(sets, pair, all_tiles, meta)
+    Arguments left as None are unchanged; max_entries=0 turns the cache off again.
+    """
+    if max_entries is not None:
+        RESULT_CACHE.resize(max_entries=max_entries)
+    if max_bytes is not None:
+        RESULT_CACHE.resize(max_bytes=max_bytes)
+    if ttl is not None:
+        RESULT_CACHE.resize(ttl=ttl)
 
-    # 64-point rules (module)
-    p64_total, p64 = compute_points_64(sets, pair, all_tiles, meta, is_chow, suit, rank)
 
-    # 88-point rules (module)
-    p88_total, p88 = compute_points_88(sets, pair, all_tiles, meta, is_suit, suit, rank)
+def result_cache_info():
+    return RESULT_CACHE.info()
 
-    flowers_pts = count_flowers(flowers)
 
-    breakdown = {**{k: v for k, v in p1.items() if v},
-                 **{k: v for k, v in p2.items() if v},
-                 **{k: v for k, v in p4.items() if v},
-                 **{k: v for k, v in p6.items() if v},
-                 **{k: v for k, v in p8.items() if v},
-                 **{k: v for k, v in p12.items() if v},
-                 **{k: v for k, v in p16.items() if v},
-                 **{k: v for k, v in p24.items() if v},
-                 **{k: v for k, v in p64.items() if v},
-                 **{k: v for k, v in p88.items() if v}}
+def clear_result_cache():
+    RESULT_CACHE.clear()
+
 
-    # Apply global exclusions across tiers
-    breakdown = process_exclusions(breakdown)
+# Loaded hand_db.HandDB, consulted by best_score before enumerating partitions
+HAND_DB = None
 
-    total = p1_total + p2_total + p4_total + p6_total + p8_total + p12_total + p16_total + p24_total + p64_total + p88_total
-    return total, flowers_pts, breakdown
 
+def load_hand_db(path):
+    """Use the hand database at path (see hand_db.py) in best_score; path=None stops using it."""
+    global HAND_DB
+    from hand_db import HandDB
+    old = HAND_DB
+    HAND_DB = HandDB(path) if path is not None else None
+    if old is not None:
+        old.close()
+    return HAND_DB
 
-def best_score(hand14, meta):
+
+def count_flowers(flowers):
+    return len(flowers)  # 1 point each (doesn't count toward 8)
+
+
+def score_partition(sets, pair, counts, meta, rules=None):
+    """Apply implemented rules and return (base_points_without_flowers, flower_points, breakdown dict).
+
+    Base points and breakdown both leave out rules excluded by another rule that scored.
+
+    sets/pair are tuples of tile indices and counts is the hand's 34-slot count vector.
+    rules (EVALUATOR.bind(hand_features(counts), meta)) may be passed in when scoring
+    several partitions of the same hand.
+    """
+    hand = hand_features(tuple(counts))
+    if rules is None:
+        rules = EVALUATOR.bind(hand, meta)
+    total, mask, points = rules.evaluate(PartitionFeatures(sets, pair, hand), meta)
+    return total, count_flowers(meta.get('flowers', [])), EVALUATOR.breakdown(mask, points)
+
+
+def prepare_hand(hand14):
+    """Split flowers off and convert the 14 main tiles to a count vector."""
     main, flowers = normalize_hand(hand14)
-    meta = dict(meta)
-    meta['flowers'] = flowers
     if len(main) != 14:
         raise ValueError("Need 14 non-flower tiles (flowers are allowed separately).")
-    
-    # Check for special "Lesser Honors and Knitted Tiles" rule first
+    return tiles_to_counts(main), flowers
+
+
+_META_SCALARS = (str, int, float, bool, type(None))
+
+
+def check_meta(meta):
+    """Raise ValueError unless meta is a dict of JSON scalars or lists of them, as batch front ends accept it.
+
+    Lists such as concealed_melds are allowed. best_score itself tolerates odd values
+    (they just don't match any rule); this is for rejecting a malformed input record
+    with a message. 'flowers' is ignored, as scoring replaces it.
+    """
+    if not isinstance(meta, dict):
+        raise ValueError("'meta' must be an object.")
+    for key, value in meta.items():
+        if key == 'flowers' or isinstance(value, _META_SCALARS):
+            continue
+        if not isinstance(value, (list, tuple)) or not all(isinstance(v, _META_SCALARS) for v in value):
+            raise ValueError(f"meta {key!r} must be a string, number, boolean, null or a list of those.")
+
+
+def best_score(hand14, meta, search='exhaustive'):
+    counts, flowers = prepare_hand(hand14)
+    meta = dict(meta)
+    meta['flowers'] = flowers
+    return _best_score_counts(counts, meta, search=search)
+
+
+def meets_min_8(hand14, meta):
+    """best_score(hand14, meta)['meets_min_8'] (False for invalid hands), without scoring every partition.
+
+    Partitions are streamed from iter_partitions and scoring stops at the first one
+    worth 8 points, so the rest are never enumerated.
+    """
+    counts, flowers = prepare_hand(hand14)
+    special = lesser_honors_result(counts, flowers)
+    if special is not None:
+        return special['meets_min_8']
+    meta = dict(meta)
+    meta['flowers'] = flowers
+    stored = HAND_DB.get(counts) if HAND_DB is not None else None
+    parts, tile_hits = stored if stored is not None else (iter_partitions(counts), None)
+    rules = None
+    for sets, pair in parts:
+        if rules is None:
+            hand = hand_features(counts)
+            rules = EVALUATOR.bind(hand, meta, tile_hits)
+        if rules.evaluate(PartitionFeatures(sets, pair, hand), meta)[0] >= 8:
+            return True
+    return False
+
+
+def lesser_honors_result(counts, flowers):
+    """Result for a "Lesser Honors and Knitted Tiles" hand, or None if counts isn't one.
+
+    That hand wins without the standard 4 sets and a pair, so it is checked before partitioning.
+    """
     from points.points_12 import points_lesser_honors_and_knitted_tiles
-    lesser_honors_points = points_lesser_honors_and_knitted_tiles(main)
-    if lesser_honors_points > 0:
-        # This is a valid hand under the Lesser Honors and Knitted Tiles rule
-        flowers_pts = count_flowers(flowers)
-        breakdown = {'Lesser Honors and Knitted Tiles': lesser_honors_points}
-        valid_min8 = lesser_honors_points >= 8
-        return {
-            'valid': True,
-            'meets_min_8': valid_min8,
-            'base_points': lesser_honors_points,
-            'flower_points': flowers_pts,
-            'total_points_display': lesser_honors_points,
-            'breakdown': breakdown,
-            'sets': (),  # No standard sets for this special hand
-            'pair': (),  # No standard pair for this special hand
-            'flowers': flowers
-        }
+    lesser_honors_points = points_lesser_honors_and_knitted_tiles(counts)
+    if lesser_honors_points == 0:
+        return None
+    flowers_pts = count_flowers(flowers)
+    breakdown = {'Lesser Honors and Knitted Tiles': lesser_honors_points}
+    valid_min8 = lesser_honors_points >= 8
+    return {
+        'valid': True,
+        'meets_min_8': valid_min8,
+        'base_points': lesser_honors_points,
+        'flower_points': flowers_pts,
+        'total_points_display': lesser_honors_points,
+        'breakdown': breakdown,
+        'sets': (),  # No standard sets for this special hand
+        'pair': (),  # No standard pair for this special hand
+        'flowers': flowers
+    }
+
+
+def _best_score_counts(counts, meta, parts=None, search='exhaustive'):
+    """best_score on a prepared count vector; meta must already carry 'flowers'.
+
+    parts may be passed in when the caller already enumerated the partitions.
+    With RESULT_CACHE enabled, results are cached per (counts, meta); the cache keeps
+    its own copy and every hit returns a fresh one.
+    """
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {search!r} (expected one of {SEARCH_MODES})")
+    if RESULT_CACHE.max_entries == 0:
+        return _score_counts(counts, meta, parts, search)
+    key = (bytes(counts), meta_signature(meta))
+    result = RESULT_CACHE.get(key)
+    if result is not None:
+        return copy_result(result)
+    result = _score_counts(counts, meta, parts, search)
+    RESULT_CACHE.put(key, copy_result(result))
+    return result
+
+
+def _score_counts(counts, meta, parts, search):
+    flowers = meta['flowers']
+    special = lesser_honors_result(counts, flowers)
+    if special is not None:
+        return special
     
     # Standard mahjong hand processing
-    parts = enumerate_partitions(tiles_to_multiset(tuple(sorted(main))))
-    best = None
-    for sets, pair in parts:
-        pts, fpts, br = score_partition(sets, pair, main, meta)
-        if best is None or pts > best[0]:
-            best = (pts, fpts, br, sets, pair)
+    tile_hits = None
+    if parts is None:
+        stored = HAND_DB.get(counts) if HAND_DB is not None else None
+        if stored is not None:
+            parts, tile_hits = stored
+        else:
+            parts = enumerate_partitions(counts)
+    if PARTITION_STATS.enabled:
+        PARTITION_STATS.record(parts)
+    hand = hand_features(tuple(counts))
+    rules = EVALUATOR.bind(hand, meta, tile_hits)
+    if search == 'bound' and len(parts) > 1:
+        best = _search_bound(parts, hand, rules, meta)
+    else:
+        best = None
+        for sets, pair in parts:
+            total, mask, points = rules.evaluate(PartitionFeatures(sets, pair, hand), meta)
+            if best is None or total > best[0]:
+                best = (total, mask, points, sets, pair)
+        SEARCH_STATS.record(len(parts), len(parts), False)
     if best is None:
-        return {'valid': False, 'reason': 'No valid 4-sets+pair partition found.'}
-    base_pts, flowers_pts, breakdown, sets, pair = best
+        return no_partition_result()
+    base_pts, mask, points, sets, pair = best
+    return partition_result(base_pts, count_flowers(flowers), EVALUATOR.breakdown(mask, points), sets, pair, flowers)
+
+
+def _search_bound(parts, hand, rules, meta):
+    """Branch-and-bound over parts, returning what the exhaustive loop would pick.
+
+    Partitions are visited by decreasing upper bound (hand-level points plus
+    rules.partition_bound). One whose bound can't beat the best so far is
+    skipped, and once the next bound is below the best the rest can't either. Ties
+    go to the earliest partition in parts, as in the exhaustive loop. Bounds ignore
+    exclusions, which only lower a total, so they stay upper bounds.
+    """
+    feats = [PartitionFeatures(sets, pair, hand) for sets, pair in parts]
+    bounds = [rules.hand_points + rules.partition_bound(f, meta) for f in feats]
+    best = None
+    best_i = -1
+    scored = 0
+    stopped = False
+    for i in sorted(range(len(parts)), key=bounds.__getitem__, reverse=True):
+        if best is not None:
+            if bounds[i] < best[0]:
+                stopped = True
+                break
+            if bounds[i] == best[0] and i > best_i:
+                continue  # at most a tie, which the earlier partition wins
+        total, mask, points = rules.evaluate(feats[i], meta)
+        scored += 1
+        if best is None or total > best[0] or (total == best[0] and i < best_i):
+            best = (total, mask, points, feats[i].sets, feats[i].pair)
+            best_i = i
+    SEARCH_STATS.record(len(parts), scored, stopped)
+    return best
+
+
+def no_partition_result():
+    return {'valid': False, 'reason': 'No valid 4-sets+pair partition found.'}
+
+
+def partition_result(base_pts, flowers_pts, breakdown, sets, pair, flowers):
+    """best_score result dict for the winning partition (index melds converted to strings)."""
     valid_min8 = base_pts >= 8  # flowers don't count toward min-8
     return {
         'valid': True,
@@ -594,9 +301,84 @@ def best_score(hand14, meta):
         'flower_points': flowers_pts,
         'total_points_display': base_pts,  # display total (ex-flowers) per MCR min-8
         'breakdown': breakdown,
-        'sets': sets,
-        'pair': pair,
+        'sets': tuple(meld_names(m) for m in sets),
+        'pair': meld_names(pair),
         'flowers': flowers
     }
 
 
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def meta_signature(meta):
+    """Hashable, order-independent signature of a meta dict (lists become tuples)."""
+    return _freeze(meta)
+
+
+def copy_result(result):
+    out = dict(result)
+    if 'breakdown' in out:
+        out['breakdown'] = dict(out['breakdown'])
+    if 'flowers' in out:
+        out['flowers'] = list(out['flowers'])
+    return out
+
+
+def best_score_many(hands, metas, search='exhaustive'):
+    """Score many hands at once; returns a list of best_score results in input order.
+
+    metas is either one meta dict for every hand or a sequence aligned with hands.
+    Hands are canonicalized to their tile multiset, partitions are enumerated once
+    per distinct multiset and each distinct (multiset, flowers, meta) is scored once.
+    Every returned result is its own copy. search is passed on to best_score.
+    """
+    hands = list(hands)
+    prepared = []
+    for i, hand in enumerate(hands):
+        try:
+            prepared.append(prepare_hand(hand))
+        except ValueError as e:
+            raise ValueError(f"Hand {i}: {e}") from None
+    return best_score_prepared(prepared, metas, search=search)
+
+
+def best_score_prepared(prepared, metas, search='exhaustive'):
+    """best_score_many on already prepared (counts, flowers) pairs, as produced by prepare_hand.
+
+    counts may be any 34-slot sequence (tuple, bytes); this is the entry point batch
+    workers use after decoding compact hand encodings.
+    """
+    if isinstance(metas, dict):
+        metas = [metas] * len(prepared)
+    else:
+        metas = list(metas)
+    if len(metas) != len(prepared):
+        raise ValueError(f"Got {len(prepared)} hands but {len(metas)} metas.")
+
+    groups = {}  # (counts, flowers, meta signature) -> (counts, meta, [input indices])
+    for i, ((counts, flowers), meta) in enumerate(zip(prepared, metas)):
+        counts = tuple(counts)
+        key = (counts, tuple(flowers), meta_signature(meta))
+        group = groups.get(key)
+        if group is None:
+            meta = dict(meta)
+            meta['flowers'] = list(flowers)
+            groups[key] = group = (counts, meta, [])
+        group[2].append(i)
+
+    results = [None] * len(prepared)
+    parts_by_counts = {}
+    for counts, meta, idxs in groups.values():
+        parts = parts_by_counts.get(counts)
+        if parts is None and HAND_DB is None:
+            parts = parts_by_counts[counts] = enumerate_partitions(counts)
+        result = _best_score_counts(counts, meta, parts, search=search)
+        results[idxs[0]] = result
+        for i in idxs[1:]:
+            results[i] = copy_result(result)
+    return results
@@ -0,0 +1,381 @@
+"""
+Local HTTP/JSON scoring service with request micro-batching (standard library only).
+
+    python server.py --port 8765 --workers 4 --max-batch 64 --max-wait-ms 2
+
+Endpoints:
+    POST /score     {"hand": [...], "meta": {...}} -> best_score result
+    GET  /health    {"status": "ok", ...}
+    GET  /metrics   request and batch counters, queue depth, latency percentiles
+
+Hands are validated and converted to count vectors as requests arrive, then queued.
+Whenever a worker is free, the batcher takes the next queued request plus whatever
+else arrives within max_wait seconds (up to max_batch requests) and scores them with
+one best_score_prepared call in the worker pool; every request gets its own
+response. If that call raises, the batch is scored again one hand at a time, so
+only the failing request gets a 500. With workers=1 batches run on a thread,
+sharing this process's caches; more workers run them in a process pool, one batch
+per worker at a time.
+
+The queue holds at most queue_size requests. When it is full, requests are answered
+503 with Retry-After right away, so a burst can't make every later request wait.
+
+Connections are HTTP/1.1 keep-alive: requests on a connection are answered in order,
+and it is closed after keepalive_timeout idle seconds or on "Connection: close".
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from scoring import best_score_prepared, check_meta, prepare_hand
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+ROUTES = {'/score': 'POST', '/health': 'GET', '/metrics': 'GET'}
+MAX_HEADER_BYTES = 16 * 1024
+
+
+def _score_each(prepared, metas):
+    """best_score_prepared one hand at a time: a (result, None) or (None, error message) per hand."""
+    out = []
+    for item, meta in zip(prepared, metas):
+        try:
+            out.append((best_score_prepared([item], [meta])[0], None))
+        except Exception as e:
+            out.append((None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of sorted values (0 for none)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class ServerMetrics:
+    """Counters plus the latencies of the last `window` scored requests, reported by /metrics."""
+
+    def __init__(self, window=4096):
+        self.started = time.monotonic()
+        self.connections = 0
+        self.open_connections = 0
+        self.requests = 0
+        self.responses = {}
+        self.rejected = 0
+        self.batches = 0
+        self.batched = 0
+        self.largest_batch = 0
+        self.latencies = deque(maxlen=window)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched += size
+        self.largest_batch = max(self.largest_batch, size)
+
+    def snapshot(self, queue_depth=0):
+        latencies = sorted(self.latencies)
+        return {
+            'uptime': time.monotonic() - self.started,
+            'connections': self.connections,
+            'open_connections': self.open_connections,
+            'requests': self.requests,
+            'responses': {str(k): v for k, v in sorted(self.responses.items())},
+            'rejected': self.rejected,
+            'queue_depth': queue_depth,
+            'batches': self.batches,
+            'mean_batch_size': self.batched / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'latency_ms': {f'p{int(q * 100)}': 1000 * _percentile(latencies, q) for q in (0.5, 0.9, 0.99)},
+        }
+
+
+def _parse_head(head):
+    """(method, path, version, headers with lower-case names) of a request head."""
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+        raise HTTPError(400, "Malformed request line.")
+    method, target, version = parts
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise HTTPError(400, "Malformed header line.")
+        headers[name.strip().lower()] = value.strip()
+    return method, target.split('?', 1)[0], version, headers
+
+
+def _response(status, payload, keep_alive, headers=()):
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    lines = [
+        f"HTTP/1.1 {status} {REASONS[status]}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in headers]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class ScoringServer:
+    """Asyncio HTTP server in front of best_score_prepared; see the module docstring.
+
+    Use `async with ScoringServer(...) as server` (or start()/close()); port=0 picks a
+    free port, available as server.port once started.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=1, max_batch=64, max_wait=0.002,
+                 queue_size=1024, keepalive_timeout=5.0, max_body=64 * 1024):
+        if workers < 1 or max_batch < 1 or queue_size < 1:
+            raise ValueError("workers, max_batch and queue_size must be at least 1.")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative.")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue_size = queue_size
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = max_body
+        self.metrics = ServerMetrics()
+        self._server = None
+        self._pool = None
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._batches = set()
+        self._writers = set()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        if self.workers == 1:
+            self._pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._queue = asyncio.Queue(self.queue_size)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        self._batcher.cancel()
+        await asyncio.gather(self._batcher, *self._batches, return_exceptions=True)
+        while not self._queue.empty():
+            self._queue.get_nowait()[2].cancel()
+        await self._server.wait_closed()
+        self._pool.shutdown()
+
+    async def submit(self, hand, meta):
+        """Score one hand in the next micro-batch.
+
+        Raises ValueError for a hand best_score would reject or a malformed meta, and
+        asyncio.QueueFull when the queue is full.
+        """
+        counts, flowers = prepare_hand(hand)
+        check_meta(meta)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((bytes(counts), flowers), meta, future))
+        return await future
+
+    # ------------------------------
+    # batching
+    # ------------------------------
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            await self._slots.acquire()
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            task = asyncio.create_task(self._score_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _score_batch(self, batch):
+        try:
+            prepared = [p for p, _, _ in batch]
+            metas = [m for _, m, _ in batch]
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(self._pool, best_score_prepared, prepared, metas)
+                results = [(result, None) for result in results]
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [(None, f"{type(e).__name__}: {e}")]
+                else:
+                    # rescore one by one so only the request that fails gets the error
+                    results = await loop.run_in_executor(self._pool, _score_each, prepared, metas)
+            self.metrics.record_batch(len(batch))
+            for (_, _, future), (result, error) in zip(batch, results):
+                if future.done():  # cancelled if the client went away
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(RuntimeError(error))
+        finally:
+            self._slots.release()
+
+    # ------------------------------
+    # HTTP
+    # ------------------------------
+    async def _handle(self, reader, writer):
+        metrics = self.metrics
+        metrics.connections += 1
+        metrics.open_connections += 1
+        self._writers.add(writer)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(_response(400, {'error': "Request head too large."}, False))
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                metrics.requests += 1
+                headers = ()
+                try:
+                    method, path, version, request_headers = _parse_head(head)
+                    connection = request_headers.get('connection', '').lower()
+                    keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                    body = await self._read_body(reader, request_headers)
+                    status, payload = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                    if status in (400, 413):
+                        keep_alive = False  # the rest of the stream can't be trusted
+                    if status == 503:
+                        headers = (('Retry-After', '1'),)
+                metrics.responses[status] = metrics.responses.get(status, 0) + 1
+                writer.write(_response(status, payload, keep_alive, headers))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            metrics.open_connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_body(self, reader, headers):
+        if 'transfer-encoding' in headers:
+            raise HTTPError(400, "Chunked request bodies are not supported; send Content-Length.")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.") from None
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body over {self.max_body} bytes.")
+        if not length:
+            return b''
+        return await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout)
+
+    async def _route(self, method, path, body):
+        expected = ROUTES.get(path)
+        if expected is None:
+            raise HTTPError(404, f"No such endpoint: {path}")
+        if method != expected:
+            raise HTTPError(405, f"{path} expects {expected}.")
+        if path == '/health':
+            return 200, {'status': 'ok', 'uptime': time.monotonic() - self.metrics.started}
+        if path == '/metrics':
+            return 200, self.metrics.snapshot(self._queue.qsize())
+        return 200, await self._score(body)
+
+    async def _score(self, body):
+        try:
+            rec = json.loads(body)
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}") from None
+        if not isinstance(rec, dict) or not isinstance(rec.get('hand'), list):
+            raise HTTPError(400, "Request must be an object with a 'hand' list.")
+        start = time.perf_counter()
+        try:
+            result = await self.submit(rec['hand'], rec.get('meta', {}))
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise HTTPError(503, "Scoring queue is full; retry later.") from None
+        except Exception as e:
+            raise HTTPError(500, f"Scoring failed: {e}") from None
+        self.metrics.latencies.append(time.perf_counter() - start)
+        return result
+
+
+async def serve(**options):
+    async with ScoringServer(**options) as server:
+        print(f"Scoring on http://{server.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve best_score over HTTP/JSON.")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--workers', type=int, default=1, help="scoring processes (default: 1, a thread)")
+    ap.add_argument('--max-batch', type=int, default=64, help="most requests per micro-batch")
+    ap.add_argument('--max-wait-ms', type=float, default=2.0, help="longest wait for a batch to fill")
+    ap.add_argument('--queue-size', type=int, default=1024, help="queued requests before answering 503")
+    ap.add_argument('--keepalive-timeout', type=float, default=5.0, help="idle seconds before closing")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(host=args.host, port=args.port, workers=args.workers, max_batch=args.max_batch,
+                          max_wait=args.max_wait_ms / 1000, queue_size=args.queue_size,
+                          keepalive_timeout=args.keepalive_timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
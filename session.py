@@ -0,0 +1,129 @@
+"""
+Incremental scoring of a hand that is edited one tile at a time.
+
+A HandSession holds a hand's count vector, flowers and meta, plus what was derived
+from them, so each edit redoes only the part it affects:
+
+- the shanten table entry of each component (B, C, D, honors): adding or removing a
+  tile changes one component, so only that entry is looked up again
+- the wait decompositions of the current 13 tiles (wait_completions), which a meta
+  change keeps
+- the best_score / waits results of every (tiles, flowers, meta) seen, in a small
+  LRU cache, so undoing a click or toggling a meta option back is a lookup
+
+Scoring a 14-tile hand goes through best_score_prepared, so partitions come from the
+per-suit tables (or a loaded hand database) and RESULT_CACHE applies as usual.
+"""
+
+from cache import BoundedCache
+from scoring import best_score_prepared, copy_result, meta_signature
+from shanten import component_entry, shanten_from_entries
+from tiles import NUM_TILE_KINDS, TILE_NAMES, counts_to_tiles, is_flower, tile_index
+from waits import wait_completions, waits_counts
+
+
+class HandSession:
+    """A hand being edited with add_tile/remove_tile/set_meta, scored with best_score() or waits().
+
+    max_results bounds the per-session cache of results.
+    """
+
+    def __init__(self, tiles=(), meta=None, max_results=256):
+        self.meta = dict(meta or {})
+        self.flowers = []
+        self.n_tiles = 0
+        self._counts = bytearray(NUM_TILE_KINDS)
+        self._entries = [component_entry(self._counts, c) for c in range(4)]
+        self._completions = None  # (counts, wait_completions(counts)) of the last 13-tile hand
+        self._results = BoundedCache(max_entries=max_results)
+        for tile in tiles:
+            self.add_tile(tile)
+
+    @property
+    def counts(self):
+        return tuple(self._counts)
+
+    @property
+    def tiles(self):
+        """The hand's tile names, sorted, followed by its flowers."""
+        return [TILE_NAMES[i] for i in counts_to_tiles(self._counts)] + self.flowers
+
+    def add_tile(self, tile):
+        if is_flower(tile):
+            self.flowers.append(tile)
+            return
+        i = tile_index(tile)
+        if self.n_tiles == 14:
+            raise ValueError("Hand already has 14 non-flower tiles.")
+        if self._counts[i] == 4:
+            raise ValueError(f"Hand already has four {tile}.")
+        self._counts[i] += 1
+        self._changed(i, 1)
+
+    def remove_tile(self, tile):
+        if is_flower(tile):
+            if tile not in self.flowers:
+                raise ValueError(f"Hand has no {tile}.")
+            self.flowers.remove(tile)
+            return
+        i = tile_index(tile)
+        if not self._counts[i]:
+            raise ValueError(f"Hand has no {tile}.")
+        self._counts[i] -= 1
+        self._changed(i, -1)
+
+    def _changed(self, i, delta):
+        self.n_tiles += delta
+        c = min(i // 9, 3)
+        self._entries[c] = component_entry(self._counts, c)
+
+    def set_meta(self, meta=None, **changes):
+        """Replace the meta (if meta is given), then set the keys in changes."""
+        if meta is not None:
+            self.meta = dict(meta)
+        self.meta.update(changes)
+
+    def shanten(self):
+        """Shanten of the current tiles (see shanten.py), or None for an empty hand."""
+        if not self.n_tiles:
+            return None
+        return shanten_from_entries(self._entries, self.n_tiles)
+
+    def _key(self, kind):
+        return kind, bytes(self._counts), tuple(self.flowers), meta_signature(self.meta)
+
+    def best_score(self, search='exhaustive'):
+        """best_score of the current 14 tiles, flowers and meta."""
+        if self.n_tiles != 14:
+            raise ValueError(f"Need 14 non-flower tiles, have {self.n_tiles}.")
+        key = self._key(search)
+        result = self._results.get(key)
+        if result is None:
+            result = best_score_prepared([(self.counts, self.flowers)], self.meta, search=search)[0]
+            self._results.put(key, result)
+        return copy_result(result)
+
+    def waits(self):
+        """waits of the current 13 tiles, flowers and meta."""
+        if self.n_tiles != 13:
+            raise ValueError(f"Need 13 non-flower tiles, have {self.n_tiles}.")
+        key = self._key('waits')
+        results = self._results.get(key)
+        if results is None:
+            counts = bytes(self._counts)
+            if self._completions is None or self._completions[0] != counts:
+                self._completions = (counts, wait_completions(counts))
+            meta = dict(self.meta)
+            meta['flowers'] = list(self.flowers)
+            results = waits_counts(counts, meta, self._completions[1])
+            self._results.put(key, results)
+        return [copy_result(r) for r in results]
+
+    def status(self):
+        """What a UI shows after an edit: tiles, shanten, and best_score (14 tiles) or waits (13)."""
+        return {
+            'tiles': self.tiles,
+            'shanten': self.shanten(),
+            'result': self.best_score() if self.n_tiles == 14 else None,
+            'waits': self.waits() if self.n_tiles == 13 else None,
+        }
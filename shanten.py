@@ -0,0 +1,144 @@
+"""
+Shanten: how many tiles a standard hand (sets + a pair) is from ready.
+
+-1 means complete, 0 ready (one tile from complete), 1 one tile from ready, and so
+on. A hand of n tiles (1..14, e.g. fewer after declared melds) is aiming for
+n // 3 sets and a pair; with m sets, t partial sets (pairs, 12, 13-shapes) and p
+(1 if a pair is kept as the head) its shanten is
+
+    2 * (n // 3) - 2 * m - min(t, n // 3 - m) - p
+
+maximized over every way of splitting the hand into such blocks.
+
+Suits never share a block, so each suit is decomposed on its own: SUIT_TABLE maps
+a suit's 9-rank count vector (packed as 9 bytes) to its entry, the most partial sets
+it can hold for every (sets, head) combination. Honors form a fourth component
+without chows, keyed by their sorted counts. Entries are computed on first use and
+kept, as are merges of two entries, so a shanten call is four table lookups and
+three cached merges.
+
+This only counts standard hands; special hands (e.g. Lesser Honors and Knitted
+Tiles) and the limit of four copies per tile are not considered.
+"""
+
+from functools import lru_cache
+
+from tiles import NUM_TILE_KINDS, normalize_hand, tiles_to_counts
+
+MAX_SETS = 4
+_WIDTH = MAX_SETS + 1
+# Entry: tuple of 2 * _WIDTH ints; index head * _WIDTH + sets holds the most partial sets
+# (capped at MAX_SETS, they never count for more) or -1 when that combination is impossible.
+_NONE = (-1,) * (2 * _WIDTH)
+_EMPTY = (0,) + (-1,) * (2 * _WIDTH - 1)
+
+
+def _best(entry, head, sets, partials):
+    i = head * _WIDTH + sets
+    if sets <= MAX_SETS and entry[i] < min(partials, MAX_SETS):
+        entry[i] = min(partials, MAX_SETS)
+
+
+class _Table(dict):
+    """{packed counts: entry}, filled on first lookup.
+
+    An entry is built from the entries of what is left after each way of using the
+    lowest tile: a set, a head, a partial set, or leaving one copy unused.
+    """
+
+    def __init__(self, chows):
+        super().__init__()
+        self.chows = chows
+
+    def __missing__(self, key):
+        entry = self[key] = self._decompose(key)
+        return entry
+
+    def _decompose(self, key):
+        n = len(key)
+        i = 0
+        while i < n and not key[i]:
+            i += 1
+        if i == n:
+            return _EMPTY
+        chows = self.chows
+        # (tiles removed, head, sets, partials)
+        blocks = [((i,), 0, 0, 0)]
+        if key[i] >= 2:
+            blocks += [((i, i), 1, 0, 0), ((i, i), 0, 0, 1)]
+        if key[i] >= 3:
+            blocks.append(((i, i, i), 0, 1, 0))
+        if chows and i + 2 < n and key[i + 1] and key[i + 2]:
+            blocks.append(((i, i + 1, i + 2), 0, 1, 0))
+        if chows:
+            blocks += [((i, j), 0, 0, 1) for j in (i + 1, i + 2) if j < n and key[j]]
+        entry = list(_NONE)
+        for tiles, head, sets, partials in blocks:
+            rest = bytearray(key)
+            for t in tiles:
+                rest[t] -= 1
+            sub = self[bytes(rest)]
+            for h in range(2 - head):
+                for s in range(_WIDTH - sets):
+                    t = sub[h * _WIDTH + s]
+                    if t >= 0:
+                        _best(entry, h + head, s + sets, t + partials)
+        return tuple(entry)
+
+
+SUIT_TABLE = _Table(chows=True)
+HONOR_TABLE = _Table(chows=False)
+
+
+@lru_cache(maxsize=1 << 16)
+def _merge(a, b):
+    out = list(_NONE)
+    for ha in (0, 1):
+        for hb in (0, 1 - ha):
+            for sa in range(_WIDTH):
+                ta = a[ha * _WIDTH + sa]
+                if ta < 0:
+                    continue
+                for sb in range(_WIDTH - sa):
+                    tb = b[hb * _WIDTH + sb]
+                    if tb >= 0:
+                        _best(out, ha + hb, sa + sb, ta + tb)
+    return tuple(out)
+
+
+@lru_cache(maxsize=1 << 12)
+def _shanten_from_entry(entry, goal):
+    best = 0
+    for head in (0, 1):
+        for sets in range(min(goal, MAX_SETS) + 1):
+            partials = entry[head * _WIDTH + sets]
+            if partials >= 0:
+                best = max(best, 2 * sets + min(partials, goal - sets) + head)
+    return 2 * goal - best
+
+
+def component_entry(counts, c):
+    """Table entry of component c of a count vector: suits 0..2 (B, C, D), or 3 for the honors."""
+    if c == 3:
+        return HONOR_TABLE[bytes(sorted(counts[27:NUM_TILE_KINDS], reverse=True))]
+    return SUIT_TABLE[bytes(counts[9 * c:9 * c + 9])]
+
+
+def shanten_from_entries(entries, n):
+    """Shanten of an n-tile hand from its 4 component_entry values (B, C, D, honors)."""
+    b, c, d, honors = entries
+    return _shanten_from_entry(_merge(_merge(b, c), _merge(d, honors)), n // 3)
+
+
+def shanten_counts(counts):
+    """Shanten of a 34-slot count vector holding 1..14 tiles."""
+    n = sum(counts)
+    if not 1 <= n <= 14:
+        raise ValueError(f"Need 1 to 14 tiles, got {n}.")
+    return shanten_from_entries([component_entry(counts, c) for c in range(4)], n)
+
+
+def shanten(tiles):
+    """Shanten of a hand of tile names; flowers are ignored."""
+    main, _ = normalize_hand(tiles)
+    return shanten_counts(tiles_to_counts(main))
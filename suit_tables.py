@@ -0,0 +1,199 @@
+"""
+Precomputed per-suit decomposition tables, stored in a binary file and memory-mapped.
+
+A suit's tiles split into sets independently of the other suits, so every way to
+split a 14-tile hand into 4 sets and a pair is: a pair, then one decomposition of
+each suit's remaining count vector (and the honors, which only form pungs). This
+module precomputes, for every 9-rank count vector (ranks 0..4, at most 12 tiles)
+that splits into chows and pungs, all of its decompositions in the partitioner's
+canonical order, so enumerate_partitions can assemble partitions as a
+cross-product of lookups.
+
+File layout (little-endian):
+    header   MAGIC, u32 version, u32 number of keys, u32 data bytes
+    keys     u32 per vector, ascending: the count vector read as a base-5 number
+    offsets  u32 per vector + 1: start of its decompositions in data
+    data     4 bytes per decomposition: up to 4 meld codes, padded with NO_MELD
+
+Meld codes are 0..6 for a chow starting at rank 1..7 and 7..15 for a pung of rank
+1..9. The file is opened with mmap, so worker processes using the same file share
+its pages instead of each building caches.
+
+    python suit_tables.py [path]     # (re)build the table, default DEFAULT_PATH
+"""
+
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+
+from tiles import NUM_TILE_KINDS
+
+MAGIC = b'MJST'
+VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suit_tables.bin')
+NO_MELD = 255
+MAX_SUIT_TILES = 12
+
+_HEADER = struct.Struct('<4sIII')
+
+_DECOMPOSITIONS = {}
+
+
+def suit_key(counts):
+    """The base-5 number of a 9-rank count vector (rank 1 most significant)."""
+    key = 0
+    for n in counts:
+        key = key * 5 + n
+    return key
+
+
+def suit_decompositions(counts):
+    """Every split of a 9-rank count vector into chows and pungs, as tuples of meld codes.
+
+    Same canonical order as partition.enumerate_sets: the lowest rank is used up first,
+    by k chows starting there, then by a pung plus k - 3 chows.
+    """
+    counts = tuple(counts)
+    out = _DECOMPOSITIONS.get(counts)
+    if out is not None:
+        return out
+    i = 0
+    while i < 9 and not counts[i]:
+        i += 1
+    if i == 9:
+        return [()]
+    out = []
+    n = counts[i]
+    for trip in (0, 3):
+        k = n - trip
+        if k < 0:
+            break
+        if k and (i > 6 or counts[i + 1] < k or counts[i + 2] < k):
+            continue
+        rem = list(counts)
+        rem[i] = 0
+        head = (7 + i,) if trip else ()
+        if k:
+            rem[i + 1] -= k
+            rem[i + 2] -= k
+            head += (i,) * k
+        for rest in suit_decompositions(rem):
+            out.append(head + rest)
+    _DECOMPOSITIONS[counts] = out
+    return out
+
+
+def _suit_vectors(i=0, prefix=(), total=0):
+    if i == 9:
+        if total % 3 == 0:
+            yield prefix
+        return
+    for n in range(min(4, MAX_SUIT_TILES - total) + 1):
+        yield from _suit_vectors(i + 1, prefix + (n,), total + n)
+
+
+def build_suit_tables(path=DEFAULT_PATH):
+    """Write the decomposition table of every suit vector with at least one split to path."""
+    keys = []
+    offsets = [0]
+    data = bytearray()
+    for counts in _suit_vectors():
+        decomps = suit_decompositions(counts)
+        if not decomps:
+            continue
+        keys.append(suit_key(counts))
+        for melds in decomps:
+            data += bytes(melds) + bytes((NO_MELD,)) * (4 - len(melds))
+        offsets.append(len(data))
+    # _suit_vectors counts up from rank 1, so keys come out ascending
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fp:
+        fp.write(_HEADER.pack(MAGIC, VERSION, len(keys), len(data)))
+        fp.write(struct.pack(f'<{len(keys)}I', *keys))
+        fp.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        fp.write(data)
+    os.replace(tmp, path)
+    return len(keys)
+
+
+class SuitTables:
+    """A memory-mapped suit table file."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_keys, n_data = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a version {VERSION} suit table")
+        self._view = view = memoryview(self._mm)
+        start = _HEADER.size
+        self._keys = view[start:start + 4 * n_keys].cast('I')
+        start += 4 * n_keys
+        self._offsets = view[start:start + 4 * (n_keys + 1)].cast('I')
+        start += 4 * (n_keys + 1)
+        self._data = view[start:start + n_data]
+        self.n_keys = n_keys
+        self.nbytes = len(self._mm)
+        # interned melds; per suit, meld code -> meld of tile indices
+        self._pairs = tuple((t, t) for t in range(NUM_TILE_KINDS))
+        self._pungs = tuple((t, t, t) for t in range(NUM_TILE_KINDS))
+        self._melds = tuple(
+            tuple((9 * s + r, 9 * s + r + 1, 9 * s + r + 2) for r in range(7)) + self._pungs[9 * s:9 * s + 9]
+            for s in range(3))
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    def _lookup(self, suit, counts):
+        """Decompositions of one suit's 9-rank counts (bytes) as tuples of melds; () if none."""
+        key = suit_key(counts)
+        i = bisect_left(self._keys, key)
+        if i == self.n_keys or self._keys[i] != key:
+            return ()
+        melds = self._melds[suit]
+        data = self._data
+        out = []
+        for at in range(self._offsets[i], self._offsets[i + 1], 4):
+            out.append(tuple(melds[c] for c in data[at:at + 4] if c != NO_MELD))
+        return tuple(out)
+
+    def partitions(self, counts):
+        """enumerate_partitions for a 14-tile count vector (bytes), same order and melds."""
+        out = []
+        rem = bytearray(counts)
+        for p in range(NUM_TILE_KINDS):
+            if rem[p] < 2:
+                continue
+            rem[p] -= 2
+            honors = ()
+            for t in range(27, NUM_TILE_KINDS):
+                if rem[t] == 3:
+                    honors += (self._pungs[t],)
+                elif rem[t]:
+                    break
+            else:
+                b = self.lookup(0, bytes(rem[0:9]))
+                c = self.lookup(1, bytes(rem[9:18])) if b else ()
+                d = self.lookup(2, bytes(rem[18:27])) if c else ()
+                pair = self._pairs[p]
+                for mb in b:
+                    for mc in c:
+                        for md in d:
+                            out.append((mb + mc + md + honors, pair))
+            rem[p] += 2
+        return out
+
+    def close(self):
+        self._keys.release()
+        self._offsets.release()
+        self._data.release()
+        self._view.release()
+        self._mm.close()
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    print(f"{build_suit_tables(target)} suit vectors written to {target}")
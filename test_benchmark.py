@@ -0,0 +1,38 @@
+import json
+
+import partition
+from benchmark import CATEGORIES, CORPUS_PATH, STAGES, clear_caches, compare_reports, generate_corpus, load_corpus, \
+    run_benchmark, write_corpus
+from features import CHOW_RULES, hand_features
+from scoring import best_score
+
+
+def test_checked_in_corpus_is_up_to_date(tmp_path):
+    path = str(tmp_path / 'corpus.jsonl')
+    write_corpus(generate_corpus(), path)
+    with open(path, 'rb') as a, open(CORPUS_PATH, 'rb') as b:
+        assert a.read() == b.read()
+    assert {category for category, _, _ in load_corpus()} == set(CATEGORIES)
+
+
+def test_report_is_json_and_covers_every_category_and_stage():
+    corpus = load_corpus()[::25]
+    report = json.loads(json.dumps(run_benchmark(corpus, repeat=1)))
+    assert report['hands'] == len(corpus)
+    assert set(report['best_score']['categories']) == {category for category, _, _ in corpus}
+    assert sum(c['hands'] for c in report['best_score']['categories'].values()) == len(corpus)
+    assert set(report['stages']) == set(STAGES)
+    assert report['memory']['tracemalloc_peak_bytes'] > 0
+    assert set(compare_reports(report, report).values()) == {1.0}
+
+
+def test_clear_caches_leaves_nothing_warm():
+    for _, hand, meta in load_corpus()[::10]:
+        best_score(hand, meta)
+    assert hand_features.cache_info().currsize and any(fn.cache_info().currsize for fn in CHOW_RULES)
+    clear_caches()
+    assert hand_features.cache_info().currsize == 0
+    assert all(fn.cache_info().currsize == 0 for fn in CHOW_RULES)
+    assert partition.PARTITIONS_CACHE.info()['entries'] == 0
+    if partition.SUIT_TABLES is not None:
+        assert partition.SUIT_TABLES.lookup.cache_info().currsize == 0
@@ -0,0 +1,97 @@
+from cache import BoundedCache
+from partition import clear_partition_caches, configure_partition_cache, enumerate_partitions, partition_cache_info
+from scoring import RESULT_CACHE, best_score, clear_result_cache, configure_result_cache, result_cache_info
+from tiles import tiles_to_counts
+
+
+def test_lru_evicts_least_recently_used():
+    c = BoundedCache(max_entries=2)
+    c.put('a', 1)
+    c.put('b', 2)
+    assert c.get('a') == 1
+    c.put('c', 3)
+    assert 'b' not in c and 'a' in c and 'c' in c
+    info = c.info()
+    assert (info['hits'], info['misses'], info['evictions']) == (1, 0, 1)
+
+
+def test_lfu_keeps_frequently_used_entries():
+    c = BoundedCache(max_entries=2, policy='lfu')
+    c.put('a', 1)
+    c.put('b', 2)
+    c.get('a')
+    c.get('a')
+    c.get('b')
+    c.put('c', 3)
+    assert 'b' not in c and 'a' in c and 'c' in c
+    c.put('d', 4)
+    assert 'c' not in c and 'a' in c
+
+
+def test_byte_budget_and_resize():
+    c = BoundedCache(max_bytes=100, sizeof=lambda k, v: v)
+    c.put('a', 40)
+    c.put('b', 40)
+    c.put('c', 40)
+    assert len(c) == 2 and c.nbytes == 80
+    c.put('huge', 500)
+    assert 'huge' not in c and len(c) == 2
+    c.resize(max_entries=1)
+    assert len(c) == 1 and c.evictions == 2
+    c.clear()
+    assert len(c) == 0 and c.info()['evictions'] == 0
+
+
+def test_partition_cache_is_bounded():
+    clear_partition_caches()
+    old_max = partition_cache_info()['partitions']['max_entries']
+    configure_partition_cache(max_entries=3)
+    try:
+        base = ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+        for pung in ("B5", "B6", "B7", "B8", "C1"):
+            enumerate_partitions(tiles_to_counts(base + [pung] * 3))
+        counts = tiles_to_counts(base + ["C1"] * 3)
+        assert len(enumerate_partitions(counts)) == 1
+        info = partition_cache_info()['partitions']
+        assert info['entries'] == 3 and info['evictions'] == 2 and info['hits'] == 1
+    finally:
+        configure_partition_cache(max_entries=old_max)
+        clear_partition_caches()
+
+
+def test_ttl_expires_entries():
+    now = [0.0]
+    c = BoundedCache(ttl=10, clock=lambda: now[0])
+    c.put('a', 1)
+    now[0] = 5
+    c.put('b', 2)
+    assert c.get('a') == 1
+    now[0] = 12
+    assert c.get('a') is None and c.get('b') == 2
+    c.put('c', 3)
+    now[0] = 20
+    c.put('d', 4)
+    assert len(c) == 2 and 'b' not in c
+    info = c.info()
+    assert (info['hits'], info['misses'], info['expirations']) == (2, 1, 2)
+
+
+def test_result_cache_returns_copies():
+    hand = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "F1"]
+    meta = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+    expected = best_score(hand, meta)
+    clear_result_cache()
+    configure_result_cache(max_entries=10, max_bytes=2**20, ttl=60)
+    try:
+        first = best_score(hand, meta)
+        first['breakdown'].clear()
+        first['flowers'].append('F2')
+        shuffled = hand[::-1]
+        assert best_score(shuffled, dict(reversed(list(meta.items())))) == expected
+        assert best_score(hand, dict(meta, win_by='discard')) != expected
+        info = result_cache_info()
+        assert (info['entries'], info['hits'], info['misses']) == (2, 1, 2)
+    finally:
+        configure_result_cache(max_entries=0)
+        clear_result_cache()
+    assert len(RESULT_CACHE) == 0
@@ -0,0 +1,57 @@
+import gzip
+import json
+
+from cli import main, parse_records, score_records
+from scoring import best_score
+
+HAND = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+
+
+def _lines():
+    return [
+        json.dumps({'id': 'a', 'hand': HAND, 'meta': META}),
+        'not json',
+        '',
+        json.dumps({'hand': HAND[:5]}),
+        json.dumps({'id': 'b', 'hand': HAND, 'meta': dict(META, win_by='discard')}),
+    ]
+
+
+def test_score_records_keeps_order_and_reports_bad_lines():
+    outputs = list(score_records(parse_records(_lines()), chunk_size=2))
+    assert [o['line'] for o in outputs] == [1, 2, 4, 5]
+    assert 'error' in outputs[1] and 'error' in outputs[2]
+    assert outputs[0]['id'] == 'a'
+    assert outputs[0]['result'] == best_score(HAND, META)
+    assert outputs[3]['result']['base_points'] == best_score(HAND, dict(META, win_by='discard'))['base_points']
+
+
+def test_poisoned_records_become_errors_without_stopping_the_stream():
+    lines = [json.dumps({'id': i, 'hand': HAND, 'meta': META}) for i in range(5)]
+    lines[1] = json.dumps({'hand': [1] * 14, 'meta': META})
+    lines[3] = json.dumps({'hand': HAND, 'meta': dict(META, seat_wind={'wind': 'E'})})
+    outputs = list(score_records(parse_records(lines), chunk_size=2))
+    assert [o['line'] for o in outputs] == [1, 2, 3, 4, 5]
+    assert [o['id'] for o in outputs if 'result' in o] == [0, 2, 4]
+    assert outputs[1]['error'] == "Unknown tile: 1"
+    assert outputs[3]['error'] == "meta 'seat_wind' must be a string, number, boolean, null or a list of those."
+
+
+def test_list_valued_meta_is_scored():
+    hand = ["B1", "B1", "B1", "C4", "C4", "C4", "C5", "C6", "C7", "D7", "D8", "D9", "DR", "DR"]
+    meta = dict(META, win_by='discard', melds_open=True, concealed_melds=[True, True, False, False])
+    (out,) = score_records(parse_records([json.dumps({'hand': hand, 'meta': meta})]))
+    assert json.loads(json.dumps(out['result'])) == json.loads(json.dumps(best_score(hand, meta)))
+    assert 'Two Concealed Pungs' in out['result']['breakdown']
+
+
+def test_main_round_trips_gzip_files(tmp_path):
+    src = tmp_path / 'in.jsonl.gz'
+    dst = tmp_path / 'out.jsonl.gz'
+    with gzip.open(src, 'wt') as f:
+        f.write('\n'.join(_lines()) + '\n')
+    assert main([str(src), '-o', str(dst)]) == 0
+    with gzip.open(dst, 'rt') as f:
+        outputs = [json.loads(line) for line in f]
+    assert [o['line'] for o in outputs] == [1, 2, 4, 5]
@@ -0,0 +1,28 @@
+from features import PartitionFeatures, hand_features
+from points.points_1 import points_mixed_double_chow
+from tiles import TILE_INDEX, meld_names, tiles_to_counts
+
+
+def _meld(*names):
+    return tuple(TILE_INDEX[n] for n in names)
+
+
+def test_partition_features():
+    sets = (_meld("B1", "B2", "B3"), _meld("C1", "C2", "C3"), _meld("D7", "D7", "D7", "D7"), _meld("DR", "DR", "DR"))
+    pair = _meld("WE", "WE")
+    counts = tiles_to_counts([n for m in sets + (pair,) for n in meld_names(m)])
+    f = PartitionFeatures(sets, pair, hand_features(counts))
+    assert f.chow_sig == (TILE_INDEX["B1"], TILE_INDEX["C1"])
+    assert f.chow_masks == [1, 1, 0]
+    assert f.pung_mask == (1 << TILE_INDEX["D7"]) | (1 << TILE_INDEX["DR"])
+    assert f.kong_mask == 1 << TILE_INDEX["D7"]
+    assert (f.n_chows, f.n_pungs, f.n_kongs, f.n_dragon_pungs, f.n_wind_pungs) == (2, 2, 1, 1, 0)
+    assert f.hand.n_suits == 3 and f.hand.has_honor
+
+
+def test_chow_rules_memoized_on_signature():
+    points_mixed_double_chow.cache_clear()
+    sig = (TILE_INDEX["B4"], TILE_INDEX["C4"], TILE_INDEX["D4"])
+    assert points_mixed_double_chow(sig) == 3
+    assert points_mixed_double_chow(sig) == 3
+    assert points_mixed_double_chow.cache_info().hits == 1
@@ -0,0 +1,60 @@
+from itertools import islice
+
+from features import hand_features
+from hand_db import HandDB, build_hand_db, complete_hands
+from partition import enumerate_partitions
+from scoring import EVALUATOR, best_score, best_score_many, load_hand_db
+from tiles import tiles_to_counts
+
+HANDS = [
+    ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9", "B5"],
+    ["B1", "B1", "B2", "B2", "B3", "B3", "B4", "B4", "B5", "B5", "B6", "B6", "B7", "B7"],
+    ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "WE", "WE", "WE", "DR", "DR"],
+    ["C1", "C1", "C1", "C2", "C2", "C2", "C3", "C3", "C3", "DR", "DR", "DR", "WE", "WE"],
+]
+NOT_STORED = ["B2", "B2", "B2", "C3", "C4", "C5", "D6", "D7", "D8", "WS", "WS", "WS", "DG", "DG"]
+META = {
+    'seat_wind': 'E',
+    'prevalent_wind': 'E',
+    'win_by': 'discard',
+    'melds_open': False,
+    'wait_type': 'closed',
+}
+
+
+def test_records_match_search(tmp_path):
+    path = str(tmp_path / 'hands.db')
+    incomplete = HANDS[0][:13] + ["DR"]
+    assert build_hand_db(path, [tiles_to_counts(h) for h in HANDS + [incomplete]]) == len(HANDS)
+    db = HandDB(path)
+    try:
+        assert len(db) == len(HANDS)
+        for hand in HANDS:
+            counts = tiles_to_counts(hand)
+            parts, hits = db.get(counts)
+            assert parts == enumerate_partitions(counts)
+            assert hits == EVALUATOR.tile_hits(hand_features(tuple(counts)))
+        assert db.get(tiles_to_counts(NOT_STORED)) is None
+        assert db.get(tiles_to_counts(incomplete)) is None
+    finally:
+        db.close()
+
+
+def test_best_score_with_database_matches_search(tmp_path):
+    path = str(tmp_path / 'hands.db')
+    build_hand_db(path, [tiles_to_counts(h) for h in HANDS])
+    hands = HANDS + [NOT_STORED, HANDS[2] + ["F1"]]
+    metas = [META, dict(META, win_by='self', melds_open=True)]
+    expected = [best_score(h, m) for h in hands for m in metas]
+    try:
+        load_hand_db(path)
+        assert [best_score(h, m) for h in hands for m in metas] == expected
+        assert best_score_many([h for h in hands for _ in metas], metas * len(hands)) == expected
+    finally:
+        load_hand_db(None)
+
+
+def test_complete_hands_are_sorted_and_complete():
+    first = list(islice(complete_hands(), 2000))
+    assert first == sorted(first)
+    assert all(sum(c) == 14 and enumerate_partitions(list(c)) for c in first)
@@ -0,0 +1,79 @@
+import json
+
+import ledger
+from ledger import MatchLedger, parse_rounds, settle
+
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'melds_open': False, 'wait_type': None}
+WIN = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "F1"]
+PLAYERS = ["A", "B", "C", "D"]
+
+
+def _rounds():
+    return [
+        {'match': 'm1', 'players': PLAYERS, 'winner': 'A', 'discarder': None, 'hand': WIN, 'meta': META},
+        {'match': 'm1', 'winner': None},
+        {'match': 'm1', 'winner': 'B', 'discarder': 'C', 'hand': WIN, 'meta': META},
+        {'match': 'm2', 'winner': 'B', 'discarder': 'C', 'hand': WIN, 'meta': META},
+        {'match': 'm2', 'players': PLAYERS, 'winner': 'C', 'discarder': 'C', 'hand': WIN, 'meta': META},
+        {'match': 'm2', 'players': PLAYERS, 'winner': 'D', 'discarder': 'A', 'hand': WIN[:13] + ["WN"], 'meta': META},
+        {'match': 'm2', 'players': PLAYERS, 'winner': 'D', 'discarder': 'A', 'hand': WIN, 'meta': META},
+    ]
+
+
+def test_settle():
+    assert settle(10, 'A', None, PLAYERS) == {'A': 54, 'B': -18, 'C': -18, 'D': -18}
+    assert settle(10, 'A', 'C', PLAYERS) == {'A': 34, 'B': -8, 'C': -18, 'D': -8}
+
+
+def test_ledger_streams_totals_and_errors():
+    lines = [json.dumps(r) for r in _rounds()]
+    lines.insert(3, "not json")
+    outputs = list(MatchLedger().process(parse_rounds(lines), chunk_size=2))
+    assert [o['line'] for o in outputs] == list(range(1, 9))
+    self_drawn, drawn, discard = outputs[:3]
+    # 22 + 1 flower self-drawn, 19 + 1 flower on a discard
+    assert self_drawn['points'] == 23 and self_drawn['payments'] == {'A': 93, 'B': -31, 'C': -31, 'D': -31}
+    assert drawn['payments'] == {p: 0 for p in PLAYERS}
+    assert discard['points'] == 20 and discard['totals'] == {'A': 85, 'B': 13, 'C': -59, 'D': -39}
+    assert [o.get('error', '')[:14] for o in outputs[3:7]] == [
+        "Invalid JSON: ", "'players' is m", "'discarder' mu", "Winning hand i"]
+    assert outputs[7]['totals'] == {'A': 57, 'B': 5, 'C': -67, 'D': 5}
+
+
+def test_ledger_workers_and_cli(tmp_path):
+    lines = [json.dumps(r) for r in _rounds()] * 50
+    single = list(MatchLedger().process(parse_rounds(lines)))
+    assert list(MatchLedger().process(parse_rounds(lines), workers=2, chunk_size=16)) == single
+
+    src = tmp_path / "season.jsonl"
+    src.write_text("\n".join(lines) + "\n")
+    out = tmp_path / "ledger.jsonl.gz"
+    assert ledger.main([str(src), '-o', str(out)]) == 0
+    import gzip
+    with gzip.open(out, 'rt') as fp:
+        assert [json.loads(line) for line in fp] == json.loads(json.dumps(single))
+
+
+def test_poisoned_rounds_and_long_runs_without_wins():
+    good = json.dumps(_rounds()[0])
+    lines = [good,
+             json.dumps(dict(_rounds()[0], meta=dict(META, seat_wind={'wind': 'E'}))),
+             json.dumps(dict(_rounds()[0], hand=[1] * 14)),
+             good]
+    outputs = list(MatchLedger().process(parse_rounds(lines)))
+    assert [o['line'] for o in outputs] == [1, 2, 3, 4]
+    assert outputs[1]['error'] == "meta 'seat_wind' must be a string, number, boolean, null or a list of those."
+    assert outputs[2]['error'] == "Unknown tile: 1"
+    assert outputs[3]['totals']['A'] == 2 * outputs[0]['totals']['A']
+
+    read = []
+
+    def draws():
+        yield good
+        for i in range(10_000):
+            read.append(i)
+            yield json.dumps({'match': 'm1', 'winner': None})
+
+    outputs = MatchLedger().process(parse_rounds(draws()), chunk_size=16)
+    assert next(outputs)['points'] == 23
+    assert len(read) < 16  # outputs come out without waiting for the next win
@@ -0,0 +1,37 @@
+import pytest
+
+from montecarlo import estimate_hand
+from scoring import best_score
+
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+READY = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "DR", "DR"]
+
+
+def test_one_missing_tile_matches_exact_odds():
+    est = estimate_hand(READY, META, seed=3, max_samples=6000, min_samples=6000)
+    # D6 and D9 win: 8 of the 34 * 4 - 13 unseen tiles
+    p = 8 / 123
+    lo, hi = est['win_rate_ci']
+    assert est['samples'] == 6000 and est['draw'] == 1 and lo < p < hi
+    wins = [best_score(READY + [t], META)['base_points'] for t in ("D6", "D9")]
+    assert min(wins) <= est['mean_score_if_win'] <= max(wins)
+    assert est['mean_score'] == pytest.approx(est['win_rate'] * est['mean_score_if_win'])
+    assert est['rule_frequencies']['All Chows'] == est['win_rate']
+    assert est['percentiles']['p50'] == 0
+
+
+def test_visible_tiles_and_complete_hands():
+    est = estimate_hand(READY, META, visible=["D6"] * 4 + ["D9"] * 4, max_samples=2000)
+    assert est['win_rate'] == 0 and est['stopped_early'] is False
+    est = estimate_hand(READY + ["D9"], META)
+    assert est['samples'] == 1 and est['win_rate'] == 1
+    with pytest.raises(ValueError):
+        estimate_hand(READY, META, visible=["DR"] * 3)
+
+
+def test_early_stop_and_workers_agree():
+    one = estimate_hand(READY, META, seed=5, batch=500, min_samples=1000, tol_win_rate=0.02, tol_mean=1.0)
+    assert one['stopped_early'] and one['samples'] < 100_000
+    two = estimate_hand(READY, META, seed=5, batch=500, min_samples=1000, tol_win_rate=0.02, tol_mean=1.0,
+                        workers=2)
+    assert two == one
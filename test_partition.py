@@ -0,0 +1,72 @@
+from partition import (PARTITION_STATS, PARTITIONS_CACHE, clear_partition_caches, enumerate_partitions,
+                       enumerate_partitions_backtrack, has_partition, iter_partitions, partition_counts)
+from scoring import best_score
+from tiles import tiles_to_counts
+
+NINE_GATES = ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9"]
+
+
+def _distinct(parts):
+    return {(tuple(sorted(sets)), pair) for sets, pair in parts}
+
+
+def test_backtrack_matches_recursive_partitions():
+    hands = [NINE_GATES + [x] for x in ("B1", "B2", "B5", "B8", "B9")]
+    hands.append(["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"])
+    hands.append(["C6", "C6", "C7", "C7", "C7", "C7", "C8", "C9", "WN", "WN", "WN", "DR", "DR", "DR"])
+    for hand in hands:
+        counts = tiles_to_counts(hand)
+        fast = enumerate_partitions_backtrack(counts)
+        assert len(fast) == len(_distinct(fast))
+        assert _distinct(fast) == _distinct(enumerate_partitions(counts))
+
+
+def test_backtrack_neither_reads_nor_fills_the_cache():
+    counts = tiles_to_counts(NINE_GATES + ["B5"])
+    clear_partition_caches()
+    parts = enumerate_partitions_backtrack(counts)
+    assert PARTITIONS_CACHE.info()['entries'] == 0
+    cached = enumerate_partitions(counts)
+    assert enumerate_partitions_backtrack(counts) == parts == cached
+    assert enumerate_partitions_backtrack(counts)[0] is not cached[0]
+
+
+def test_backtrack_leaves_no_partition_for_broken_hand():
+    counts = tiles_to_counts(["B1", "B2", "B4", "B5", "C1", "C1", "C1", "D3", "D3", "D3", "WE", "WE", "DR", "DG"])
+    assert enumerate_partitions_backtrack(counts) == []
+
+
+def test_enumerate_partitions_emits_each_partition_once():
+    # pung of B1 + chow B1B2B3 can be found in either order; it must come back once
+    counts = tiles_to_counts(["B1", "B1", "B1", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"])
+    parts = enumerate_partitions(counts)
+    assert len(parts) == len(_distinct(parts)) == 1
+    assert partition_counts(counts) == (24, 1)
+
+
+def test_partition_stats_are_opt_in():
+    hand = ["B1", "B1", "B1", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+    meta = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False}
+    PARTITION_STATS.reset()
+    best_score(hand, meta)
+    assert PARTITION_STATS.hands == 0
+    PARTITION_STATS.enabled = True
+    try:
+        best_score(hand, meta)
+    finally:
+        PARTITION_STATS.enabled = False
+    assert PARTITION_STATS.as_dict()['raw_partitions'] == 24
+
+
+def test_iter_partitions_streams_enumerate_partitions_order():
+    broken = ["B1", "B2", "B4", "B5", "C1", "C1", "C1", "D3", "D3", "D3", "WE", "WE", "DR", "DG"]
+    for hand in [NINE_GATES + [x] for x in ("B1", "B2", "B5", "B8", "B9")] + [broken]:
+        counts = tiles_to_counts(hand)
+        clear_partition_caches()
+        parts = iter_partitions(counts)
+        first = next(parts, None)
+        assert PARTITIONS_CACHE.info()['entries'] == 0
+        streamed = [first] + list(parts) if first is not None else []
+        assert streamed == enumerate_partitions(counts)
+        assert list(iter_partitions(counts)) == streamed  # replayed from the cache
+        assert has_partition(counts) == bool(streamed)
@@ -0,0 +1,40 @@
+import re
+
+import scoring
+from profiling import Profiler, disable_profiling, enable_profiling, profiling
+from scoring import best_score
+
+HAND = ["B1", "B1", "B1", "B2", "B2", "B2", "B3", "B3", "B3", "B7", "B8", "B9", "DR", "DR"]  # pungs or chows
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+
+
+def test_profiled_results_match_and_stats_cover_stages_and_rules():
+    expected = [best_score(HAND, META), best_score(HAND, META, search='bound')]
+    evaluator = scoring.EVALUATOR
+    with profiling() as prof:
+        assert [best_score(HAND, META), best_score(HAND, META, search='bound')] == expected
+    assert scoring.EVALUATOR is evaluator
+    stats = prof.as_dict()
+    assert stats['stages']['best_score']['calls'] == 2
+    assert {'partition', 'features', 'bind', 'evaluate', 'exclusions', 'bound'} <= set(stats['stages'])
+    assert stats['stages']['exclusions']['calls'] == stats['stages']['evaluate']['calls']
+    assert 'best_score;evaluate;exclusions' in stats['paths']
+    assert stats['rules']['Half Flush']['tier'] == 6
+    assert stats['paths']['best_score;bind;points_6;Half Flush']['calls'] == 2
+    for line in prof.collapsed().splitlines():
+        assert re.fullmatch(r"best_score(;[^;]+)* \d+", line)
+
+
+def test_enable_disable_and_fixed_clock():
+    ticks = iter(range(1000))
+    prof = enable_profiling(Profiler(clock=lambda: next(ticks)))
+    try:
+        best_score(HAND, META)
+    finally:
+        assert disable_profiling() is prof
+    assert disable_profiling() is None
+    best_score(HAND, META)
+    stats = prof.as_dict()
+    assert stats['stages']['best_score']['calls'] == 1
+    paths = stats['paths']
+    assert sum(p['self_seconds'] for p in paths.values()) == paths['best_score']['seconds']
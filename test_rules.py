@@ -0,0 +1,72 @@
+import pytest
+
+from rules import PARTITION, TILES, Rule, compile_rules
+from scoring import REGISTRY, RULE_NAMES
+
+
+def test_registry_names_and_ids_unique_and_ordered_by_tier():
+    assert len(set(RULE_NAMES)) == len(REGISTRY)
+    assert len({r.id for r in REGISTRY}) == len(REGISTRY)
+    assert all(RULE_NAMES[r.id] == r.name for r in REGISTRY)
+    tiers = [r.tier for r in REGISTRY]
+    assert tiers == sorted(tiers)
+
+
+def test_failed_precondition_skips_rule():
+    calls = []
+
+    class F:
+        n_chows = 1
+
+    def rule(f, meta):
+        calls.append(f)
+        return 5
+
+    ev = compile_rules([
+        Rule(0, 'Needs Chows', 5, 1, PARTITION, rule, {'n_chows': 2}),
+        Rule(1, 'Always', 1, 1, PARTITION, lambda f, meta: 1),
+    ])
+    rules = ev.bind(object(), {})
+    assert rules.partition_hits(F(), {}) == [(1, 1)]
+    assert calls == []
+    F.n_chows = 2
+    total, mask, points = rules.evaluate(F(), {})
+    assert total == 6
+    assert ev.breakdown(mask, points) == {'Needs Chows': 5, 'Always': 1}
+
+
+def test_excluded_rules_leave_total_and_breakdown():
+    ev = compile_rules([
+        Rule(0, 'Small', 2, 1, PARTITION, lambda f, meta: 2),
+        Rule(1, 'Hand Small', 1, 1, TILES, lambda hand, meta: 1),
+        Rule(3, 'Big', 8, 8, PARTITION, lambda f, meta: 8 if meta.get('big') else 0),
+    ], {'Big': {'Small', 'Hand Small'}})
+    assert ev.names == ('Small', 'Hand Small', None, 'Big')
+    rules = ev.bind(object(), {'big': True})
+    total, mask, points = rules.evaluate(object(), {'big': True})
+    assert (total, mask) == (8, 0b1000)
+    assert ev.breakdown(mask, points) == {'Big': 8}
+    total, mask, points = ev.bind(object(), {}).evaluate(object(), {})
+    assert total == 3
+    assert ev.breakdown(mask, points) == {'Small': 2, 'Hand Small': 1}
+
+
+def test_hand_level_preconditions_drop_rules_once_per_hand():
+    ev = compile_rules([
+        Rule(0, 'Only Open', 6, 6, PARTITION, lambda f, meta: 6, when=lambda hand, meta: meta.get('melds_open')),
+        Rule(1, 'Fixed', 1, 1, PARTITION, lambda f, meta: 1, bound=3),
+    ])
+    assert ev.bind(object(), {'melds_open': True}).partition_bound(object(), {}) == 9
+    assert ev.bind(object(), {}).partition_bound(object(), {}) == 3
+
+
+def test_compile_rejects_bad_registry():
+    rule = Rule(0, 'X', 1, 1, TILES, lambda hand, meta: 1)
+    with pytest.raises(ValueError):
+        compile_rules([rule, rule])
+    with pytest.raises(ValueError):
+        compile_rules([rule, rule._replace(name='Y')])
+    with pytest.raises(ValueError):
+        compile_rules([rule], {'X': {'Missing'}})
+    with pytest.raises(ValueError):
+        compile_rules([rule._replace(inputs='hand')])
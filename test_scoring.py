@@ -0,0 +1,98 @@
+import pytest
+
+from features import PartitionFeatures, hand_features
+from partition import enumerate_partitions
+from scoring import EVALUATOR, SEARCH_STATS, best_score, best_score_many, meets_min_8, prepare_hand, score_partition
+
+HAND = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+META = {
+    'seat_wind': 'E',
+    'prevalent_wind': 'E',
+    'win_by': 'self',
+    'melds_open': False,
+    'wait_type': None,
+}
+
+
+def test_best_score_many_matches_best_score_in_input_order():
+    shuffled = list(reversed(HAND))
+    discard = dict(META, win_by='discard')
+    pungs = ["WE", "WE", "WE", "B5", "B5", "B5", "C7", "C7", "C7", "D2", "D3", "D4", "DG", "DG"]
+    hands = [HAND, shuffled, HAND + ["F1"], pungs, HAND, shuffled]
+    metas = [META, META, META, discard, discard, META]
+    results = best_score_many(hands, metas)
+    assert results == [best_score(h, m) for h, m in zip(hands, metas)]
+
+
+def test_best_score_many_returns_independent_copies():
+    results = best_score_many([HAND, list(reversed(HAND))], META)
+    results[0]['breakdown'].clear()
+    assert results[1]['breakdown'] == best_score(HAND, META)['breakdown']
+
+
+def test_parallel_scorer_matches_best_score():
+    from parallel import ParallelScorer
+
+    hands = [HAND, list(reversed(HAND)), HAND + ["S1"]] * 5
+    with ParallelScorer(workers=2, chunk_size=4) as scorer:
+        ordered = scorer.score(hands, META)
+        unordered = dict(scorer.imap(iter(hands), [META] * len(hands), ordered=False))
+    expected = [best_score(h, META) for h in hands]
+    assert ordered == expected
+    assert [unordered[i] for i in range(len(hands))] == expected
+
+
+# hands with several partitions: nine gates waits and triple chows / three pungs
+MULTI = [["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9", x] for x in ("B2", "B5", "B9")]
+MULTI += [["C1", "C1", "C1", "C2", "C2", "C2", "C3", "C3", "C3", "DR", "DR", "DR", "WE", "WE"],
+          ["D3", "D3", "D3", "D4", "D4", "D4", "D5", "D5", "D5", "D6", "D7", "D8", "D6", "D6"]]
+
+
+def test_bound_search_matches_exhaustive():
+    SEARCH_STATS.reset()
+    for hand in MULTI:
+        for meta in (META, dict(META, win_by='discard', melds_open=True, seat_wind='S')):
+            assert best_score(hand, meta, search='bound') == best_score(hand, meta, search='exhaustive')
+    stats = SEARCH_STATS.as_dict()
+    assert stats['pruned'] == stats['partitions'] - stats['scored'] > 0
+
+
+def test_partition_bound_is_an_upper_bound():
+    for hand in MULTI + [HAND]:
+        counts, _ = prepare_hand(hand)
+        meta = dict(META, flowers=[])
+        rules = EVALUATOR.bind(hand_features(counts), meta)
+        for sets, pair in enumerate_partitions(counts):
+            bound = rules.hand_points + rules.partition_bound(PartitionFeatures(sets, pair, hand_features(counts)), meta)
+            assert score_partition(sets, pair, counts, meta)[0] <= bound
+
+
+def test_base_points_exclude_excluded_rules():
+    nine_gates = ["C1", "C1", "C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9", "C9", "C9", "C1"]
+    for hand in MULTI + [HAND, nine_gates]:
+        for search in ('bound', 'exhaustive'):
+            result = best_score(hand, META, search=search)
+            assert result['base_points'] == sum(result['breakdown'].values())
+    assert 'Full Flush' not in best_score(nine_gates, META)['breakdown']
+
+
+def test_meets_min_8_matches_best_score():
+    low = ["B1", "B2", "B3", "C4", "C5", "C6", "D6", "D7", "D8", "B7", "B8", "B9", "D2", "D2"]
+    broken = ["B1", "B2", "B4", "B5", "C1", "C1", "C1", "D3", "D3", "D3", "WE", "WE", "DR", "DG"]
+    lesser_honors = ["B1", "B4", "B7", "C2", "C5", "C8", "D3", "D6", "D9", "WE", "WS", "WW", "DR", "DG"]
+    discard = dict(META, win_by='discard', seat_wind='S')
+    for hand in MULTI + [HAND, low, low + ["F1"], broken, lesser_honors]:
+        for meta in (META, discard):
+            result = best_score(hand, meta)
+            assert meets_min_8(hand, meta) == (result['valid'] and result['meets_min_8'])
+    assert not meets_min_8(low, discard)
+
+
+def test_malformed_meta_values_and_tiles():
+    # a wind or wait type of the wrong type simply doesn't match, as an unknown string wouldn't
+    for bad in (["E"], {"E": 1}, 1):
+        for key in ('seat_wind', 'prevalent_wind', 'wait_type'):
+            assert best_score(HAND, dict(META, **{key: bad})) == best_score(HAND, dict(META, **{key: 'X'}))
+    for tile in (1, ["B1"], None):
+        with pytest.raises(ValueError):
+            best_score(HAND[:13] + [tile], META)
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+
+import server
+from scoring import best_score, best_score_prepared
+from server import ScoringServer
+
+HAND = ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+
+
+async def _request(reader, writer, method, path, payload=None, close=False):
+    body = b'' if payload is None else json.dumps(payload).encode()
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    writer.write(head.encode() + b"\r\n" + body)
+    await writer.drain()
+    lines = (await reader.readuntil(b'\r\n\r\n')).decode().split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:] if line)
+    data = await reader.readexactly(int(headers['Content-Length']))
+    return int(lines[0].split()[1]), headers, json.loads(data)
+
+
+async def _one(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        return await _request(reader, writer, method, path, payload, close=True)
+    finally:
+        writer.close()
+
+
+def _expected(hand, meta):
+    return json.loads(json.dumps(best_score(hand, meta)))
+
+
+def test_keep_alive_batching_and_errors():
+    discard = dict(META, win_by='discard')
+
+    async def run():
+        async with ScoringServer(port=0, max_wait=0.05) as srv:
+            reader, writer = await asyncio.open_connection('127.0.0.1', srv.port)
+            status, headers, body = await _request(reader, writer, 'POST', '/score', {'hand': HAND, 'meta': META})
+            assert (status, headers['Connection'], body) == (200, 'keep-alive', _expected(HAND, META))
+            status, _, body = await _request(reader, writer, 'GET', '/health')
+            assert (status, body['status']) == (200, 'ok')
+            writer.close()
+
+            replies = await asyncio.gather(*[
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': discard if i % 2 else META})
+                for i in range(8)])
+            assert [body for _, _, body in replies] == [_expected(HAND, discard if i % 2 else META) for i in range(8)]
+
+            assert (await _one(srv.port, 'POST', '/score', {'hand': HAND[:5]}))[0] == 400
+            assert (await _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': []}))[0] == 400
+            assert (await _one(srv.port, 'GET', '/score'))[0] == 405
+            assert (await _one(srv.port, 'GET', '/nope'))[0] == 404
+            _, _, metrics = await _one(srv.port, 'GET', '/metrics')
+            return metrics
+
+    metrics = asyncio.run(run())
+    assert metrics['batches'] < 9 and metrics['largest_batch'] > 1
+    assert metrics['responses']['200'] == 10
+    assert metrics['connections'] == 14
+
+
+def test_full_queue_answers_503(monkeypatch):
+    def slow(prepared, metas):
+        time.sleep(0.2)
+        return [best_score(HAND, META)] * len(prepared)
+
+    monkeypatch.setattr(server, 'best_score_prepared', slow)
+
+    async def run():
+        async with ScoringServer(port=0, max_batch=1, max_wait=0, queue_size=1) as srv:
+            first = asyncio.create_task(_one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': META}))
+            await asyncio.sleep(0.05)  # being scored
+            second = asyncio.create_task(_one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': META}))
+            await asyncio.sleep(0.05)  # queued
+            status, headers, _ = await _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': META})
+            assert (status, headers['Retry-After']) == (503, '1')
+            assert [r[0] for r in await asyncio.gather(first, second)] == [200, 200]
+            return srv.metrics.rejected
+
+    assert asyncio.run(run()) == 1
+
+
+def test_errors_stay_with_their_request(monkeypatch):
+    def poisoned(prepared, metas):
+        if any(meta.get('poison') for meta in metas):
+            raise RuntimeError("poisoned")
+        return best_score_prepared(prepared, metas)
+
+    monkeypatch.setattr(server, 'best_score_prepared', poisoned)
+
+    async def run():
+        async with ScoringServer(port=0, max_wait=0.05) as srv:
+            replies = await asyncio.gather(
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': META}),
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': dict(META, poison=True)}),
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': META}),
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': dict(META, seat_wind={'wind': 'E'})}),
+                _one(srv.port, 'POST', '/score', {'hand': [1] * 14, 'meta': META}),
+                _one(srv.port, 'POST', '/score', {'hand': HAND, 'meta': concealed}))
+            return replies, srv.metrics.largest_batch
+
+    concealed = dict(META, concealed_melds=[True, True, False, False])
+    replies, largest_batch = asyncio.run(run())
+    assert [status for status, _, _ in replies] == [200, 500, 200, 400, 400, 200] and largest_batch == 4
+    assert replies[-1][2] == _expected(HAND, concealed)
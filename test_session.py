@@ -0,0 +1,53 @@
+import pytest
+
+from scoring import best_score
+from session import HandSession
+from shanten import shanten
+from tiles import TILE_INDEX
+from waits import waits
+
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False, 'wait_type': None}
+HAND = ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "C1", "C2", "C3"]
+
+
+def test_session_matches_stateless_calls_after_each_edit():
+    session = HandSession(meta=META)
+    for n, tile in enumerate(HAND, 1):
+        session.add_tile(tile)
+        assert session.shanten() == shanten(HAND[:n])
+    assert session.best_score() == best_score(HAND, META)
+    session.add_tile("F1")
+    assert session.best_score() == best_score(HAND + ["F1"], META)
+    session.set_meta(win_by='discard', wait_type='edge')
+    discard = dict(META, win_by='discard', wait_type='edge')
+    assert session.best_score() == best_score(HAND + ["F1"], discard)
+
+    session.remove_tile("C3")
+    assert session.waits() == waits(HAND[:13] + ["F1"], discard)
+    session.set_meta(META)
+    assert session.waits() == waits(HAND[:13] + ["F1"], META)
+    assert session.status()['waits'] == waits(HAND[:13] + ["F1"], META)
+
+    session.add_tile("C3")
+    status = session.status()
+    assert status['shanten'] == -1
+    assert status['result'] == best_score(HAND + ["F1"], META)
+    assert status['tiles'] == sorted(HAND, key=TILE_INDEX.__getitem__) + ["F1"]
+
+
+def test_results_are_copies_and_edits_are_checked():
+    session = HandSession(HAND, META)
+    session.best_score()['breakdown'].clear()
+    assert session.best_score() == best_score(HAND, META)
+    with pytest.raises(ValueError):
+        session.add_tile("B5")
+    session.remove_tile("DR")
+    with pytest.raises(ValueError):
+        session.best_score()
+    with pytest.raises(ValueError):
+        session.remove_tile("WE")
+    with pytest.raises(ValueError):
+        session.remove_tile("F2")
+    session.remove_tile("B1")
+    with pytest.raises(ValueError):
+        session.waits()
@@ -0,0 +1,38 @@
+import pytest
+
+from partition import enumerate_partitions
+from shanten import shanten, shanten_counts
+from tiles import TILE_NAMES, tiles_to_counts
+from waits import waits
+
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False}
+NINE_GATES = ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9"]
+
+
+def test_shanten_of_known_hands():
+    assert shanten(NINE_GATES) == 0
+    assert shanten(NINE_GATES + ["B5"]) == -1
+    assert shanten(["B1", "B4", "B7", "C2", "C5", "C8", "D3", "D6", "D9", "WE", "WS", "WW", "WN"]) == 8
+    assert shanten(["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "WE", "WE", "DR", "DG", "F1"]) == 1
+
+
+def test_small_hands():
+    assert shanten(["DR"]) == 0
+    assert shanten(["DR", "DR"]) == -1
+    assert shanten(["DR", "DG"]) == 0
+    assert shanten(["B1", "B2", "B3", "C5"]) == 0
+    assert shanten(["B1", "B2", "C4", "C5", "C7"]) == 1
+    with pytest.raises(ValueError):
+        shanten_counts([0] * 34)
+    with pytest.raises(ValueError):
+        shanten(NINE_GATES * 2)
+
+
+def test_shanten_agrees_with_partitions_and_waits():
+    hands = [NINE_GATES[:i] + NINE_GATES[i + 1:] + [t] for i in (0, 4, 12) for t in ("B1", "C2", "DR")]
+    hands.append(["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "C1", "C2"])
+    for hand in hands:
+        assert (shanten(hand) == 0) == bool(waits(hand, META))
+        for t in TILE_NAMES:
+            complete = bool(enumerate_partitions(tiles_to_counts(hand + [t])))
+            assert (shanten(hand + [t]) == -1) == complete
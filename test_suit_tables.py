@@ -0,0 +1,32 @@
+from partition import enumerate_partitions, load_suit_tables
+from suit_tables import DEFAULT_PATH, SuitTables, build_suit_tables
+from tiles import tiles_to_counts
+
+HANDS = [
+    ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9", "B5"],
+    ["B1", "B1", "B2", "B2", "B3", "B3", "B4", "B4", "B5", "B5", "B6", "B6", "B7", "B7"],
+    ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "WE", "WE", "WE", "DR", "DR"],
+    ["C1", "C1", "C1", "C2", "C2", "C2", "C3", "C3", "C3", "DR", "DR", "DR", "WE", "WE"],
+    ["B1", "B2", "B4", "B5", "C1", "C1", "C1", "D3", "D3", "D3", "WE", "WE", "DR", "DG"],
+]
+
+
+def test_checked_in_table_is_up_to_date(tmp_path):
+    path = str(tmp_path / 'suit_tables.bin')
+    build_suit_tables(path)
+    with open(path, 'rb') as a, open(DEFAULT_PATH, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_table_partitions_match_search(tmp_path):
+    path = str(tmp_path / 'suit_tables.bin')
+    build_suit_tables(path)
+    try:
+        load_suit_tables(None)
+        expected = [enumerate_partitions(tiles_to_counts(hand)) for hand in HANDS]
+        tables = load_suit_tables(path)
+        assert [tables.partitions(bytes(tiles_to_counts(hand))) for hand in HANDS] == expected
+        assert [enumerate_partitions(tiles_to_counts(hand)) for hand in HANDS] == expected
+    finally:
+        load_suit_tables(DEFAULT_PATH)
+    assert isinstance(load_suit_tables(), SuitTables)
@@ -0,0 +1,34 @@
+import pytest
+
+from scoring import best_score_many
+
+np = pytest.importorskip("numpy")
+
+from vectorized import RULE_NAMES, best_score_many_vectorized  # noqa: E402
+
+META = {'seat_wind': 'S', 'prevalent_wind': 'E', 'win_by': 'discard', 'melds_open': False, 'wait_type': None}
+
+HANDS = [
+    ["B1", "B2", "B3", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"],
+    ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9", "B5"],
+    ["B1", "B2", "B3", "C1", "C2", "C3", "D1", "D2", "D3", "B7", "B8", "B9", "WE", "WE"],
+    ["WE", "WE", "WE", "WS", "WS", "WS", "WW", "WW", "WW", "WN", "WN", "WN", "B5", "B5"],
+    ["B2", "B3", "B4", "B2", "B3", "B4", "B6", "B6", "B6", "B8", "B8", "B8", "DG", "DG"],
+    ["B1", "B9", "C1", "C9", "D1", "D9", "WE", "WS", "WW", "WN", "DR", "DG", "DW", "DW"],
+    ["B2", "B2", "B3", "B3", "B4", "B4", "B5", "B5", "B6", "B6", "B7", "B7", "B8", "B8"],
+    ["B1", "B4", "B7", "C2", "C5", "C8", "D3", "D6", "D9", "WE", "WS", "WW", "DR", "DG"],
+    ["B1", "B2", "B4", "B5", "C1", "C1", "C1", "D3", "D3", "D3", "WE", "WE", "DR", "DG"],
+]
+
+
+def test_vectorized_backend_matches_python_rules():
+    metas = [META, dict(META, win_by='self', melds_open=True, wait_type='edge')]
+    hands = [h for h in HANDS for _ in metas]
+    all_metas = [m for _ in HANDS for m in metas]
+    assert best_score_many_vectorized(hands, all_metas) == best_score_many(hands, all_metas)
+
+
+def test_rule_columns_cover_every_breakdown_name():
+    results = best_score_many(HANDS, META)
+    for result in results:
+        assert set(result.get('breakdown', {})) <= set(RULE_NAMES)
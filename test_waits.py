@@ -0,0 +1,46 @@
+from scoring import best_score
+from waits import waits
+
+META = {'seat_wind': 'E', 'prevalent_wind': 'E', 'win_by': 'self', 'melds_open': False}
+NINE_GATES = ["B1", "B1", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B9", "B9"]
+
+
+def test_nine_gates_waits_on_every_tile_of_its_suit():
+    result = waits(NINE_GATES, META)
+    assert [r['tile'] for r in result] == [f"B{r}" for r in range(1, 10)]
+    for r in result:
+        assert r['base_points'] == best_score(NINE_GATES + [r['tile']], dict(META, wait_type=r['wait_type']))[
+            'base_points']
+        assert 'Nine Gates' in r['breakdown']
+
+
+def test_wait_types_and_four_held_tiles():
+    hand = ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "C1", "C2"]
+    (r,) = waits(hand, META)
+    assert (r['tile'], r['wait_type'], r['pair']) == ('C3', 'edge', ('DR', 'DR'))
+    assert 'Wait Type (edge/closed/pair)' in r['breakdown']
+    hand = ["B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR", "WE", "WE"]
+    assert [(r['tile'], r['wait_type']) for r in waits(hand, META)] == [('WE', 'pung'), ('DR', 'pung')]
+    hand = ["B1", "B1", "B1", "B1", "B2", "B3", "C4", "C5", "C6", "D7", "D8", "D9", "DR"]
+    assert [r['tile'] for r in waits(hand, META)] == ['DR']
+
+
+def test_wait_point_needs_a_single_winning_tile():
+    # B1 B2 B3 B4: pair wait on B1 or on B4
+    hand = ["B1", "B2", "B3", "B4", "C4", "C5", "C6", "D7", "D8", "D9", "WE", "WE", "WE"]
+    result = waits(hand, META)
+    assert [(r['tile'], r['wait_type']) for r in result] == [('B1', 'open'), ('B4', 'open')]
+    assert not any('Wait Type (edge/closed/pair)' in r['breakdown'] for r in result)
+    # B1 B2 B3 B4 B5: B3 completes the edge B1 B2, but B6 wins too
+    hand = ["B1", "B2", "B3", "B4", "B5", "C4", "C5", "C6", "D7", "D8", "D9", "DR", "DR"]
+    result = waits(hand, META)
+    assert [(r['tile'], r['wait_type']) for r in result] == [('B3', 'open'), ('B6', 'open')]
+    for r in result:
+        assert 'Wait Type (edge/closed/pair)' not in r['breakdown']
+        assert r['base_points'] == best_score(hand + [r['tile']], dict(META, wait_type='open'))['base_points']
+
+
+def test_lesser_honors_and_broken_hands():
+    knitted = waits(["B1", "B4", "B7", "C2", "C5", "C8", "D3", "D6", "D9", "WE", "WS", "WW", "WN"], META)
+    assert [(r['tile'], r['wait_type']) for r in knitted] == [('DR', None), ('DG', None), ('DW', None)]
+    assert waits(["B1", "B1", "B4", "B7", "C2", "C5", "C8", "D3", "D6", "WE", "WS", "WW", "WN"], META) == []
@@ -0,0 +1,43 @@
+import gzip
+import json
+from collections import Counter
+
+import pytest
+
+from cli import parse_records, score_records
+
+np = pytest.importorskip("numpy")
+
+from wall import FLOWER_NAMES, deal, iter_deal_lines, shuffle_walls, wall_codes, write_deals  # noqa: E402
+
+
+def test_deal_draws_in_turn_and_replaces_flowers():
+    walls = shuffle_walls(5, np.random.default_rng(3))
+    assert all(Counter(w.tolist()) == Counter(wall_codes().tolist()) for w in walls)
+    tiles, flowers = deal(walls, hand_size=13)
+    for w, wall in enumerate(walls.tolist()):
+        for p in range(4):
+            hand = []
+            drawn = []
+            while len(hand) < 13:
+                t = wall.pop(0)
+                (drawn if t >= 34 else hand).append(t)
+            assert tiles[4 * w + p].tolist() == sorted(hand)
+            assert flowers[4 * w + p].tolist() == drawn
+
+
+def test_lines_are_seeded_scorer_input(tmp_path):
+    lines = list(iter_deal_lines(10, seed=5, batch=2))
+    assert lines == list(iter_deal_lines(10, seed=5, batch=2))
+    assert lines != list(iter_deal_lines(10, seed=6, batch=2))
+    records = [json.loads(line) for line in lines]
+    assert [r['id'] for r in records] == list(range(10))
+    assert [r['meta']['seat_wind'] for r in records[:5]] == ['E', 'S', 'W', 'N', 'E']
+    assert all(len([t for t in r['hand'] if t not in FLOWER_NAMES]) == 14 for r in records)
+    outputs = list(score_records(parse_records(lines)))
+    assert [o['id'] for o in outputs] == list(range(10)) and all('result' in o for o in outputs)
+
+    path = str(tmp_path / 'deals.jsonl.gz')
+    assert write_deals(path, 10, seed=5) == 10
+    with gzip.open(path, 'rt') as f:
+        assert len(f.readlines()) == 10
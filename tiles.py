@@ -26,7 +26,7 @@ def is_honor(tile):
 
 
 def is_flower(tile):
-    return tile.startswith('F') or tile.startswith('S')
+    return isinstance(tile, str) and (tile.startswith('F') or tile.startswith('S'))
 
 
 def normalize_hand(tiles):
@@ -52,3 +52,83 @@ def remove_tiles(pool, tiles):
     return tuple(sorted(res))
 
 
+# ------------------------------
+# Integer tile encoding
+# ------------------------------
+# Every tile kind has an index 0..33: B1..B9 -> 0..8, C1..C9 -> 9..17,
+# D1..D9 -> 18..26, WE WS WW WN -> 27..30, DR DG DW -> 31..33.
+# A hand is a 34-slot count vector indexed by tile kind; melds and pairs are
+# sorted tuples of indices. Strings are only used at the API boundary.
+NUM_TILE_KINDS = 34
+TILE_NAMES = tuple(f"{s}{r}" for s in ('B', 'C', 'D') for r in range(1, 10)) + (
+    'WE', 'WS', 'WW', 'WN', 'DR', 'DG', 'DW')
+TILE_INDEX = {t: i for i, t in enumerate(TILE_NAMES)}
+
+# Per-index lookup tables; suit is 0/1/2 for B/C/D, None for honors (like suit()/rank())
+IDX_SUIT = tuple(i // 9 if i < 27 else None for i in range(NUM_TILE_KINDS))
+IDX_RANK = tuple(i % 9 + 1 if i < 27 else None for i in range(NUM_TILE_KINDS))
+
+WIND_IDS = frozenset(TILE_INDEX[t] for t in WINDS)
+DRAGON_IDS = frozenset(TILE_INDEX[t] for t in DRAGONS)
+HONOR_IDS = WIND_IDS | DRAGON_IDS
+TERMINAL_IDS = frozenset(i for i in range(27) if IDX_RANK[i] in (1, 9))
+TERMINAL_HONOR_IDS = TERMINAL_IDS | HONOR_IDS
+# seat/prevalent wind as given in meta ('E','S','W','N') -> tile index
+WIND_INDEX = {'E': TILE_INDEX['WE'], 'S': TILE_INDEX['WS'], 'W': TILE_INDEX['WW'], 'N': TILE_INDEX['WN']}
+
+
+def wind_index(wind):
+    """Tile index of a meta wind ('E', 'S', 'W', 'N'); None for anything else, including non-strings."""
+    return WIND_INDEX.get(wind) if isinstance(wind, str) else None
+
+
+def tile_index(tile):
+    try:
+        return TILE_INDEX[tile]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown tile: {tile!r}") from None
+
+
+def tile_name(idx):
+    return TILE_NAMES[idx]
+
+
+def tiles_to_counts(tiles):
+    """Return the 34-slot count vector (tuple) of an iterable of tile strings."""
+    counts = [0] * NUM_TILE_KINDS
+    for t in tiles:
+        counts[tile_index(t)] += 1
+    return tuple(counts)
+
+
+def counts_to_tiles(counts):
+    """Return the sorted tuple of tile indices held in a count vector."""
+    res = []
+    for i, n in enumerate(counts):
+        if n:
+            res += [i] * n
+    return tuple(res)
+
+
+def suits_present(counts):
+    """Set of suit indices (0/1/2) with at least one tile in the count vector."""
+    return {s for s, b in enumerate((0, 9, 18)) if any(counts[b:b + 9])}
+
+
+def has_honor(counts):
+    return any(counts[27:])
+
+
+def remove_counts(counts, idxs):
+    """Count-vector analogue of remove_tiles: new tuple with idxs removed, or None."""
+    c = list(counts)
+    for i in idxs:
+        if c[i] == 0:
+            return None
+        c[i] -= 1
+    return tuple(c)
+
+
+def meld_names(meld):
+    """Convert a meld/pair of tile indices back to tile strings."""
+    return tuple(TILE_NAMES[i] for i in meld)
@@ -0,0 +1,397 @@
+"""
+Optional NumPy backend: evaluate every rule over a batch of partitions at once.
+
+A batch of partitions is encoded as fixed-shape arrays:
+- chows:  (B, 3, 7) number of chows starting at each (suit, rank 1..7)
+- pungs:  (B, 34)   1 where the partition has a pung of that tile
+- kongs:  (B, 34)   1 where the partition has a kong of that tile
+- pair:   (B,)      tile index of the pair
+- counts: (B, 34)   the hand's tile count vector
+plus per-row meta columns. evaluate() turns that into a (B, len(RULE_NAMES))
+points matrix with the same values score_partition produces, and
+best_score_vectorized / best_score_many_vectorized pick the winning partition of
+each hand with argmax instead of looping over score_partition.
+
+NumPy is not a dependency of the package; importing this module works without
+it, and the functions raise ImportError when called.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # optional backend
+    np = None
+
+from partition import PARTITION_STATS, enumerate_partitions
+from scoring import EVALUATOR, RULE_NAMES, copy_result, count_flowers, lesser_honors_result, meta_signature, \
+    no_partition_result, partition_result, prepare_hand
+from tiles import DRAGON_IDS, IDX_RANK, IDX_SUIT, NUM_TILE_KINDS, TERMINAL_HONOR_IDS, TERMINAL_IDS, TILE_INDEX, \
+    WIND_IDS, wind_index
+
+# Column order of the points matrix: rule id, which is also the breakdown order.
+RULE_INDEX = EVALUATOR.index
+
+_SUIT_PERMS = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+_WIND_LIST = sorted(WIND_IDS)
+_DRAGON_LIST = sorted(DRAGON_IDS)
+_TH_LIST = sorted(TERMINAL_HONOR_IDS)
+_NON_TH_LIST = [t for t in range(NUM_TILE_KINDS) if t not in TERMINAL_HONOR_IDS]
+_TERMINAL_LIST = sorted(TERMINAL_IDS)
+_REVERSIBLE = [TILE_INDEX[t] for t in ('D1', 'D2', 'D3', 'D4', 'D5', 'D8', 'D9', 'B2', 'B4', 'B5', 'B6', 'B8',
+                                       'B9', 'DW')]
+_GREEN = [TILE_INDEX[t] for t in ('B2', 'B3', 'B4', 'B6', 'B8', 'DG')]
+_KNITTED = ((0, 3, 6), (1, 4, 7), (2, 5, 8))  # rank offsets of 147 / 258 / 369
+_NINE_GATES_NEED = (3, 1, 1, 1, 1, 1, 1, 1, 3)
+
+# meta columns, one row per partition
+_META_FIELDS = (
+    'seat', 'prevalent', 'has_seat', 'has_prevalent', 'self_drawn', 'discard', 'melds_open', 'wait',
+    'last_tile_draw', 'last_tile_claim', 'replacement', 'robbing', 'chicken', 'conc_pungs', 'conc_kongs',
+    'conc_kongs_loose',
+)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The vectorized scoring backend needs NumPy (pip install numpy).")
+
+
+def _meta_row(meta):
+    seat_wind = meta.get('seat_wind')
+    prevalent_wind = meta.get('prevalent_wind')
+    win_by = meta.get('win_by')
+    seat = wind_index(seat_wind)
+    prevalent = wind_index(prevalent_wind)
+    return [
+        -1 if seat is None else seat,
+        -1 if prevalent is None else prevalent,
+        bool(seat_wind) and seat is not None,
+        bool(prevalent_wind) and prevalent is not None,
+        win_by == 'self',
+        win_by == 'discard',
+        bool(meta.get('melds_open', False)),
+        meta.get('wait_type') in ('edge', 'closed', 'pair'),
+        bool(meta.get('last_tile_draw', False)),
+        bool(meta.get('last_tile_claim', False)),
+        bool(meta.get('replacement_tile_win', False)),
+        bool(meta.get('robbing_kong', False)),
+        bool(meta.get('chicken_hand', False)),
+    ]
+
+
+def _concealed_columns(sets, mask):
+    """Concealed pung/kong counts as points_2 / points_8 read them (mask aligned with sets order)."""
+    conc_pungs = conc_kongs = loose = 0
+    if isinstance(mask, (list, tuple)) and len(mask) == len(sets):
+        for flag, s in zip(mask, sets):
+            if flag and s[0] == s[-1]:
+                conc_pungs += 1
+                conc_kongs += len(s) == 4
+    if mask is not None:
+        for i, s in enumerate(sets):
+            if len(s) == 4 and i < len(mask) and mask[i]:
+                loose += 1
+    return [conc_pungs, conc_kongs, loose]
+
+
+def encode_partitions(items):
+    """Encode (parts, counts, meta) items into one batch.
+
+    Returns (batch, hand_of_row, partitions) where batch is a dict of arrays with one
+    row per partition, hand_of_row maps rows back to the item they came from, and
+    partitions lists the (sets, pair) of every row.
+    """
+    _require_numpy()
+    rows = sum(len(parts) for parts, _, _ in items)
+    chows = np.zeros((rows, 3, 7), dtype=np.int8)
+    pungs = np.zeros((rows, NUM_TILE_KINDS), dtype=np.int8)
+    kongs = np.zeros((rows, NUM_TILE_KINDS), dtype=np.int8)
+    pair = np.zeros(rows, dtype=np.int16)
+    counts = np.zeros((rows, NUM_TILE_KINDS), dtype=np.int8)
+    n_sets = np.zeros(rows, dtype=np.int8)
+    meta_cols = np.zeros((rows, len(_META_FIELDS)), dtype=np.int16)
+    hand_of_row = np.zeros(rows, dtype=np.int64)
+    partitions = []
+    r = 0
+    for item, (parts, hand_counts, meta) in enumerate(items):
+        if not parts:
+            continue
+        end = r + len(parts)
+        counts[r:end] = hand_counts
+        hand_of_row[r:end] = item
+        base = _meta_row(meta)
+        mask = meta.get('concealed_melds')
+        for sets, p in parts:
+            for s in sets:
+                t = s[0]
+                if len(s) == 4:
+                    kongs[r, t] = 1
+                elif s[1] == t:
+                    pungs[r, t] = 1
+                else:
+                    chows[r, IDX_SUIT[t], IDX_RANK[t] - 1] += 1
+            pair[r] = p[0]
+            n_sets[r] = len(sets)
+            meta_cols[r] = base + _concealed_columns(sets, mask)
+            partitions.append((sets, p))
+            r += 1
+    batch = {'chows': chows, 'pungs': pungs, 'kongs': kongs, 'pair': pair, 'counts': counts, 'n_sets': n_sets}
+    for i, name in enumerate(_META_FIELDS):
+        batch[name] = meta_cols[:, i]
+    return batch, hand_of_row, partitions
+
+
+def evaluate(batch):
+    """Return the (B, len(RULE_NAMES)) int32 points matrix for an encoded batch."""
+    _require_numpy()
+    C = batch['chows'].astype(np.int32)
+    S = C > 0
+    P = batch['pungs'].astype(np.int32)
+    K = batch['kongs'].astype(np.int32)
+    PK = P + K
+    N = batch['counts'].astype(np.int32)
+    pair = batch['pair']
+    n_sets = batch['n_sets'].astype(np.int32)
+    B = N.shape[0]
+    rows = np.arange(B)
+    out = np.zeros((B, len(RULE_NAMES)), dtype=np.int32)
+
+    def put(name, values):
+        out[:, RULE_INDEX[name]] = values
+
+    suited = N[:, :27].reshape(B, 3, 9) > 0
+    n_suits = suited.any(axis=2).sum(axis=1)
+    honors = N[:, 27:].sum(axis=1) > 0
+    n_chows = C.sum(axis=(1, 2))
+    n_kongs = K.sum(axis=1)
+    n_pk = PK.sum(axis=1)
+    PKs = PK[:, :27].reshape(B, 3, 9)
+    seat, prevalent = batch['seat'], batch['prevalent']
+    self_drawn = batch['self_drawn'] > 0
+    discard = batch['discard'] > 0
+    melds_open = batch['melds_open'] > 0
+
+    # 1-point
+    put('Pure Double Chow', (C >= 2).sum(axis=(1, 2)))
+    per_rank = C.sum(axis=1)
+    put('Mixed Double Chow', ((per_rank * per_rank - (C * C).sum(axis=1)) // 2).sum(axis=1))
+    put('Short Straight', (S[:, :, :4] & S[:, :, 3:]).sum(axis=(1, 2)))
+    put('Two Terminal Chows', (S[:, :, 0] & S[:, :, 6]).sum(axis=1))
+    winds = np.array(_WIND_LIST)
+    wind_pk = PK[:, winds]
+    other_wind = (winds[None, :] != seat[:, None]) & (winds[None, :] != prevalent[:, None])
+    put('Pung of Terminals/Honors (non-seat/prevalent)',
+        PK[:, _TERMINAL_LIST].sum(axis=1) + (wind_pk * other_wind).sum(axis=1))
+    put('Melded Kong', n_kongs)
+    put('One Voided Suit', n_suits <= 2)
+    put('No Honor Tiles', ~honors)
+    put('Self Drawn', self_drawn)
+    put('Wait Type (edge/closed/pair)', batch['wait'] > 0)
+
+    # 2-point
+    put('Dragon Pung/Kong', 2 * PK[:, _DRAGON_LIST].sum(axis=1))
+    seat_pk = np.where(seat >= 0, PK[rows, np.maximum(seat, 0)], 0)
+    prevalent_pk = np.where(prevalent >= 0, PK[rows, np.maximum(prevalent, 0)], 0)
+    put('Seat Wind Pung/Kong', 2 * seat_pk * (batch['has_seat'] > 0))
+    put('Prevalent Wind Pung/Kong', 2 * prevalent_pk * (batch['has_prevalent'] > 0))
+    put('Concealed Hand (won by discard)', 2 * (~melds_open & discard))
+    put('All Chows', 2 * (n_chows == n_sets))
+    put('Tile Hog', 2 * ((N == 4) & (K == 0)).any(axis=1))
+    put('Double Pung', 2 * ((PKs > 0).sum(axis=1) >= 2).any(axis=1))
+    put('Two Concealed Pungs', 2 * (batch['conc_pungs'] >= 2))
+    put('Concealed Kong', 2 * batch['conc_kongs'])
+    put('All Simples', 2 * (N[:, _TH_LIST].sum(axis=1) == 0))
+
+    # 4-point
+    outside = (PK[:, _NON_TH_LIST].sum(axis=1) == 0) & (C[:, :, 1:6].sum(axis=(1, 2)) == 0)
+    pair_th = np.isin(pair, _TH_LIST)
+    put('Outside Hand', 4 * (outside & pair_th))
+    put('Two Melded Kongs', 4 * (n_kongs == 2))
+    put('Fully Concealed Hand (self-draw)', 4 * (~melds_open & self_drawn))
+
+    # 6-point
+    put('All Pungs', 6 * (n_pk == n_sets))
+    put('Half Flush', 6 * ((n_suits == 1) & honors))
+    shifted = np.zeros(B, dtype=np.int32)
+    for r in range(5):
+        found = np.zeros(B, dtype=bool)
+        for a, b, c in _SUIT_PERMS:
+            found |= S[:, a, r] & S[:, b, r + 1] & S[:, c, r + 2]
+        shifted += found
+    put('Mixed Shifted Chows', 6 * shifted)
+    put('Two Dragon Pungs', 6 * ((PK[:, _DRAGON_LIST] > 0).sum(axis=1) >= 2))
+    put('All Types', 6 * ((n_suits == 3) & honors))
+    put('Melded Hand', 6 * (melds_open & discard & (n_sets == 4)))
+
+    # 8-point
+    put('Mixed Triple Chow', 8 * S.all(axis=1).sum(axis=1))
+    straight = np.zeros(B, dtype=bool)
+    for a, b, c in _SUIT_PERMS:
+        straight |= S[:, a, 0] & S[:, b, 3] & S[:, c, 6]
+    put('Mixed Straight', 8 * straight)
+    not_reversible = np.ones(NUM_TILE_KINDS, dtype=bool)
+    not_reversible[_REVERSIBLE] = False
+    put('Reversible Tiles', 8 * (N[:, not_reversible].sum(axis=1) == 0))
+    shifted_pungs = np.zeros(B, dtype=bool)
+    for r in range(7):
+        M = PKs[:, :, r:r + 3] > 0
+        shifted_pungs |= ((M.sum(axis=(1, 2)) == 3) & (M.sum(axis=2) == 1).all(axis=1)
+                          & (M.sum(axis=1) == 1).all(axis=1))
+    put('Mixed Shifted Pungs', 8 * shifted_pungs)
+    put('Two Concealed Kongs', 8 * (batch['conc_kongs_loose'] >= 2))
+    put('Last Tile Draw', 8 * ((batch['last_tile_draw'] > 0) & self_drawn))
+    put('Last Tile Claim', 8 * ((batch['last_tile_claim'] > 0) & discard))
+    put('Out with Replacement Tile', 8 * (batch['replacement'] > 0))
+    put('Robbing the Kong', 8 * (batch['robbing'] > 0))
+    put('Chicken Hand', 8 * (batch['chicken'] > 0))
+
+    # 12-point
+    knitted = np.zeros((B, 3, 3), dtype=bool)  # (row, suit, pattern)
+    for k, ranks in enumerate(_KNITTED):
+        pattern = np.zeros(9, dtype=bool)
+        pattern[list(ranks)] = True
+        knitted[:, :, k] = (suited == pattern).all(axis=2)
+    knitted_ok = knitted.any(axis=2).all(axis=1) & knitted.any(axis=1).all(axis=1)
+    put('Lesser Honors and Knitted Tiles', 12 * (knitted_ok & (N.max(axis=1) <= 1)))
+    put('Knitted Straight', 12 * (knitted_ok & (n_sets == 4)))
+
+    # 16-point
+    put('Pure Straight', 16 * (S[:, :, 0] & S[:, :, 3] & S[:, :, 6]).sum(axis=1))
+    put('Three Kongs', 16 * (n_kongs == 3))
+
+    # 24-point
+    put('Full Flush', 24 * ((n_suits == 1) & ~honors))
+
+    # 64-point
+    n_wind_pk = (wind_pk > 0).sum(axis=1)
+    put('Big Three Winds', 64 * (n_wind_pk == 3))
+    all_th = N[:, _NON_TH_LIST].sum(axis=1) == 0
+    put('All Terminals and Honors', 64 * all_th)
+    put('Pure Terminal Chows', 64 * ((n_chows == 4) & ((C[:, :, 0] == 2) & (C[:, :, 6] == 2)).any(axis=1)))
+
+    # 88-point
+    put('Big Four Winds', 88 * (n_wind_pk == 4))
+    put('Big Three Dragons', 88 * ((PK[:, _DRAGON_LIST] > 0).sum(axis=1) == 3))
+    put('Four Kongs', 88 * (n_kongs == 4))
+    not_green = np.ones(NUM_TILE_KINDS, dtype=bool)
+    not_green[_GREEN] = False
+    put('All Green', 88 * (N[:, not_green].sum(axis=1) == 0))
+    total_tiles = N.sum(axis=1)
+    Ns = N[:, :27].reshape(B, 3, 9)
+    gates = (Ns >= np.array(_NINE_GATES_NEED)).all(axis=2).any(axis=1)
+    put('Nine Gates', 88 * (~melds_open & ~honors & (n_suits == 1) & gates & (total_tiles == 14)))
+    th = N[:, _TH_LIST]
+    orphans = all_th & (total_tiles == 14) & ((th >= 1).sum(axis=1) == 13) & ((th == 2).sum(axis=1) == 1)
+    put('Thirteen Orphans', 88 * (~melds_open & orphans))
+    E = Ns == 2
+    seven = np.zeros(B, dtype=bool)
+    for r in range(3):
+        seven |= E[:, :, r:r + 7].all(axis=2).any(axis=1)
+    put('Seven Shifted Pairs', 88 * (~melds_open & (E.sum(axis=(1, 2)) == 7) & seven))
+    return out
+
+
+def _exclusion_matrix():
+    # (rule, excluded rule) -> 1, from the evaluator's compiled exclusion bitmasks
+    size = len(RULE_NAMES)
+    matrix = np.zeros((size, size), dtype=np.int32)
+    for i, excluded in enumerate(EVALUATOR.excludes):
+        for j in range(size):
+            if excluded >> j & 1:
+                matrix[i, j] = 1
+    return matrix
+
+
+_EXCLUSIONS = _exclusion_matrix() if np is not None else None
+
+
+def apply_exclusions(points):
+    """Return (totals, breakdown_points) the way score_partition combines a points row.
+
+    Every rule that scored removes the rules it excludes; totals are summed after that.
+    """
+    _require_numpy()
+    present = points > 0
+    kept = present & ((present.astype(np.int32) @ _EXCLUSIONS) == 0)
+    shown = points * kept
+    return shown.sum(axis=1), shown
+
+
+def _prepare_items(prepared, metas):
+    groups = {}
+    items = []
+    slots = []
+    for (counts, flowers), meta in zip(prepared, metas):
+        counts = tuple(counts)
+        key = (counts, tuple(flowers), meta_signature(meta))
+        slot = groups.get(key)
+        if slot is None:
+            meta = dict(meta)
+            meta['flowers'] = list(flowers)
+            slot = groups[key] = len(items)
+            items.append((counts, meta))
+        slots.append(slot)
+    return items, slots
+
+
+def best_score_many_vectorized(hands, metas):
+    """best_score_many computed with the NumPy backend; results equal the Python path."""
+    _require_numpy()
+    hands = list(hands)
+    if isinstance(metas, dict):
+        metas = [metas] * len(hands)
+    else:
+        metas = list(metas)
+    if len(metas) != len(hands):
+        raise ValueError(f"Got {len(hands)} hands but {len(metas)} metas.")
+    prepared = []
+    for i, hand in enumerate(hands):
+        try:
+            prepared.append(prepare_hand(hand))
+        except ValueError as e:
+            raise ValueError(f"Hand {i}: {e}") from None
+    items, slots = _prepare_items(prepared, metas)
+
+    results = [None] * len(items)
+    batch_items = []
+    batch_slots = []
+    for slot, (counts, meta) in enumerate(items):
+        special = lesser_honors_result(counts, meta['flowers'])
+        if special is not None:
+            results[slot] = special
+            continue
+        parts = enumerate_partitions(counts)
+        if PARTITION_STATS.enabled:
+            PARTITION_STATS.record(parts)
+        batch_items.append((parts, counts, meta))
+        batch_slots.append(slot)
+
+    if batch_items:
+        batch, hand_of_row, partitions = encode_partitions(batch_items)
+        if len(partitions):
+            points = evaluate(batch)
+            totals, shown = apply_exclusions(points)
+            # best row per hand: highest total, first row on ties (as best_score does)
+            order = np.lexsort((np.arange(len(totals)), -totals, hand_of_row))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = hand_of_row[order[1:]] != hand_of_row[order[:-1]]
+            for row in order[first]:
+                counts, meta = batch_items[hand_of_row[row]][1:]
+                breakdown = {RULE_NAMES[j]: int(shown[row, j]) for j in np.flatnonzero(shown[row])}
+                sets, pair = partitions[row]
+                results[batch_slots[hand_of_row[row]]] = partition_result(
+                    int(totals[row]), count_flowers(meta['flowers']), breakdown, sets, pair, meta['flowers'])
+        for slot in batch_slots:
+            if results[slot] is None:
+                results[slot] = no_partition_result()
+
+    out = []
+    used = set()
+    for slot in slots:
+        out.append(copy_result(results[slot]) if slot in used else results[slot])
+        used.add(slot)
+    return out
+
+
+def best_score_vectorized(hand14, meta):
+    """best_score computed with the NumPy backend."""
+    return best_score_many_vectorized([hand14], [meta])[0]
@@ -0,0 +1,164 @@
+"""
+Winning tiles ("waits") of a 13-tile hand.
+
+A winning tile completes the hand in one of these shapes, and every 14-tile partition
+is the 13 tiles decomposed into one of them plus the winning tile:
+
+- 'pair':   4 sets + a single tile, waiting on its pair
+- 'pung':   3 sets + two pairs, waiting on either pair to become a pung
+- 'edge':   3 sets + a pair + 12 or 89 of a suit, waiting on 3 or 7
+- 'closed': 3 sets + a pair + e.g. 46, waiting on 5
+- 'open':   3 sets + a pair + e.g. 45, waiting on 3 or 6
+
+The 13 tiles are decomposed once: enumerate_sets is called on what is left after
+taking out the single tile, or the pair and the two-tile partial, and each
+decomposition gives the partition for its winning tile directly. The 34 candidate
+tiles therefore share one search (and the partition caches) instead of each
+re-enumerating a 14-tile hand.
+
+Each completion is scored with meta['wait_type'] set to its shape; 'edge', 'closed'
+and 'pair' score the 1-point wait rule, which only counts for a single wait. When
+more than one tile wins, those shapes are scored (and reported) as 'open'. When a
+tile completes the hand in several ways, the best scoring one is reported.
+"""
+
+from features import PartitionFeatures, hand_features
+from partition import enumerate_sets
+from scoring import EVALUATOR, count_flowers, lesser_honors_result, partition_result
+from tiles import IDX_RANK, IDX_SUIT, NUM_TILE_KINDS, normalize_hand, tile_name, tiles_to_counts
+
+WAIT_TYPES = ('pair', 'pung', 'edge', 'closed', 'open')
+# shapes scoring the 1-point wait rule, when they are the hand's only winning tile
+SINGLE_WAITS = ('edge', 'closed', 'pair')
+
+
+def _same_suit(a, b):
+    return b < NUM_TILE_KINDS and IDX_SUIT[a] is not None and IDX_SUIT[a] == IDX_SUIT[b]
+
+
+def wait_completions(counts):
+    """{winning tile: [(sets, pair, wait type)]} for a 13-tile count vector.
+
+    sets are sorted tuples of 4 melds, as in enumerate_partitions. Tiles the hand
+    already holds four of are left out.
+    """
+    out = {}
+    seen = set()
+
+    def add(tile, sets, pair, wait):
+        if counts[tile] < 4 and (sets, pair, wait) not in seen:
+            seen.add((sets, pair, wait))
+            out.setdefault(tile, []).append((sets, pair, wait))
+
+    rem = bytearray(counts)
+    for t in range(NUM_TILE_KINDS):
+        if not rem[t]:
+            continue
+        rem[t] -= 1
+        for sets in enumerate_sets(bytes(rem), 4):
+            add(t, sets, (t, t), 'pair')
+        rem[t] += 1
+
+    for p in range(NUM_TILE_KINDS):
+        if rem[p] < 2:
+            continue
+        rem[p] -= 2
+        for a in range(NUM_TILE_KINDS):
+            if not rem[a]:
+                continue
+            rem[a] -= 1
+            # (partial's other tile, [(winning tile, wait type)])
+            partials = []
+            if rem[a]:
+                partials.append((a, [(a, 'pung')]))
+            if _same_suit(a, a + 1) and rem[a + 1]:
+                r = IDX_RANK[a]
+                if r == 1:
+                    partials.append((a + 1, [(a + 2, 'edge')]))
+                elif r == 8:
+                    partials.append((a + 1, [(a - 1, 'edge')]))
+                else:
+                    partials.append((a + 1, [(a - 1, 'open'), (a + 2, 'open')]))
+            if _same_suit(a, a + 2) and rem[a + 2]:
+                partials.append((a + 2, [(a + 1, 'closed')]))
+            for b, wins in partials:
+                rem[b] -= 1
+                for sets3 in enumerate_sets(bytes(rem), 3):
+                    for w, wait in wins:
+                        meld = tuple(sorted((a, b, w)))
+                        add(w, tuple(sorted(sets3 + (meld,))), (p, p), wait)
+                rem[b] += 1
+            rem[a] += 1
+        rem[p] += 2
+    return out
+
+
+def waits(hand13, meta):
+    """Every tile that completes a concealed 13-tile hand, with what the completion scores.
+
+    Returns a list ordered by tile index of best_score-style result dicts (for the
+    best completion with that tile) plus 'tile' (the winning tile's name) and
+    'wait_type' (one of WAIT_TYPES, or None for Lesser Honors and Knitted Tiles;
+    'open' for edge, closed and pair shapes when more than one tile wins).
+    Flowers in hand13 are split off as in best_score.
+    """
+    main, flowers = normalize_hand(hand13)
+    if len(main) != 13:
+        raise ValueError("Need 13 non-flower tiles (flowers are allowed separately).")
+    meta = dict(meta)
+    meta['flowers'] = flowers
+    return waits_counts(tiles_to_counts(main), meta)
+
+
+def waits_counts(counts, meta, completions=None):
+    """waits on a 13-tile count vector; meta must already carry 'flowers'.
+
+    completions (wait_completions(counts)) may be passed in when the caller kept them.
+    """
+    flowers = meta['flowers']
+    if completions is None:
+        completions = wait_completions(counts)
+    # Lesser Honors and Knitted Tiles has 14 different tiles
+    all_single = max(counts) == 1
+
+    winners = []  # (tile, counts14, Lesser Honors result or None)
+    for tile in range(NUM_TILE_KINDS):
+        if counts[tile] == 4:
+            continue
+        counts14 = list(counts)
+        counts14[tile] += 1
+        special = lesser_honors_result(counts14, flowers) if all_single and not counts[tile] else None
+        if special is not None or tile in completions:
+            winners.append((tile, counts14, special))
+
+    single = len(winners) == 1
+    results = []
+    for tile, counts14, special in winners:
+        if special is not None:
+            result = dict(special, wait_type=None)
+        else:
+            result = _best_completion(counts14, completions[tile], meta, single)
+        result['tile'] = tile_name(tile)
+        results.append(result)
+    return results
+
+
+def _best_completion(counts14, completions, meta, single=True):
+    hand = hand_features(tuple(counts14))
+    bound = {}  # wait type -> (meta, HandRules)
+    best = None
+    for sets, pair, wait in completions:
+        if not single and wait in SINGLE_WAITS:
+            wait = 'open'
+        if wait not in bound:
+            wait_meta = dict(meta, wait_type=wait)
+            bound[wait] = (wait_meta, EVALUATOR.bind(hand, wait_meta))
+        wait_meta, rules = bound[wait]
+        total, mask, points = rules.evaluate(PartitionFeatures(sets, pair, hand), wait_meta)
+        if best is None or total > best[0]:
+            best = (total, mask, points, sets, pair, wait)
+    total, mask, points, sets, pair, wait = best
+    flowers = meta['flowers']
+    result = partition_result(total, count_flowers(flowers), EVALUATOR.breakdown(mask, points), sets, pair, flowers)
+    result['wait_type'] = wait
+    return result
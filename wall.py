@@ -0,0 +1,149 @@
+"""
+Seeded random walls and deals for load testing, written as streaming scorer input.
+
+A wall is the full 144-tile set: 4 of each of the 34 kinds plus the 8 flower and
+season tiles (FLOWER_NAMES). Walls are shuffled and dealt in batches with NumPy.
+Players draw in turn, `hand_size` tiles each; a flower goes to the player who drew
+it and is replaced by the next tile of the wall, as in play. Each hand becomes one
+JSON Lines record for cli.py / best_score_many:
+
+    {"id": 0, "hand": ["B1", ..., "F2"], "meta": {"seat_wind": "E", ...}}
+
+Seats go E, S, W, N around each wall; the prevalent wind is drawn per wall and
+win_by, melds_open and wait_type per hand. Random deals are rarely complete, so
+most 14-tile hands score as invalid: they load the scorer like real traffic, not
+like a corpus of wins.
+
+    python wall.py -n 1000000 -o deals.jsonl.gz --seed 7
+
+The output depends only on (seed, hand_size, players, batch). NumPy is needed to
+generate deals but not to import this module.
+"""
+
+import argparse
+import json
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, as in vectorized.py
+    np = None
+
+from cli import open_output
+from tiles import NUM_TILE_KINDS, TILE_NAMES
+
+FLOWER_NAMES = ('F1', 'F2', 'F3', 'F4', 'S1', 'S2', 'S3', 'S4')
+# tile codes: 0..33 as in tiles.TILE_INDEX, then the flowers
+WALL_NAMES = TILE_NAMES + FLOWER_NAMES
+WALL_SIZE = 4 * NUM_TILE_KINDS + len(FLOWER_NAMES)
+
+_WINDS = ('E', 'S', 'W', 'N')
+_WIN_BY = ('self', 'discard')
+_WAIT_TYPES = (None, 'edge', 'closed', 'pair', 'open')
+_QUOTED = tuple(json.dumps(name) for name in WALL_NAMES)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Generating deals needs NumPy (pip install numpy).")
+
+
+def wall_codes():
+    """One wall's tile codes, in order."""
+    _require_numpy()
+    return np.concatenate([np.repeat(np.arange(NUM_TILE_KINDS), 4),
+                           np.arange(NUM_TILE_KINDS, NUM_TILE_KINDS + len(FLOWER_NAMES))]).astype(np.uint8)
+
+
+def shuffle_walls(n, rng):
+    """(n, WALL_SIZE) array of independently shuffled walls, using a numpy Generator."""
+    return rng.permuted(np.tile(wall_codes(), (n, 1)), axis=1)
+
+
+def deal(walls, hand_size=14, players=4):
+    """Deal `players` hands of hand_size tiles from each wall.
+
+    Returns (tiles, flowers): tiles is an (n * players, hand_size) array of sorted tile
+    codes, hand h being player h % players of wall h // players; flowers[h] is the
+    array of flower codes that hand drew.
+    """
+    if not 1 <= hand_size * players <= 4 * NUM_TILE_KINDS:
+        raise ValueError("A wall can't deal that many tiles.")
+    n = len(walls)
+    suited = walls < NUM_TILE_KINDS
+    drawn = np.cumsum(suited, axis=1)
+    # a tile goes to the player drawing when it comes up: before it, drawn - suited tiles were kept
+    owner = (drawn - suited) // hand_size
+    dealt = owner < players
+    tiles = np.sort(walls[suited & dealt].reshape(n * players, hand_size), axis=1)
+    is_flower = ~suited & dealt
+    hands = (np.arange(n)[:, None] * players + owner)[is_flower]
+    flower_codes = walls[is_flower]
+    bounds = np.cumsum(np.bincount(hands, minlength=n * players))[:-1]
+    return tiles, np.split(flower_codes, bounds)
+
+
+def iter_deal_lines(n_hands, seed=0, hand_size=14, players=4, batch=4096):
+    """Yield n_hands JSON Lines records (with trailing newline) of dealt hands."""
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    metas = [json.dumps({'seat_wind': seat, 'prevalent_wind': prevalent, 'win_by': win_by,
+                         'melds_open': open_, 'wait_type': wait}, separators=(',', ':'))
+             for seat in _WINDS for prevalent in _WINDS for win_by in _WIN_BY for open_ in (False, True)
+             for wait in _WAIT_TYPES]
+    per_seat = len(metas) // len(_WINDS)
+    per_prevalent = per_seat // len(_WINDS)
+    per_win_by = per_prevalent // len(_WIN_BY)
+    quoted = _QUOTED
+    next_id = 0
+    while next_id < n_hands:
+        walls_needed = min(batch, -(-(n_hands - next_id) // players))
+        tiles, flowers = deal(shuffle_walls(walls_needed, rng), hand_size, players)
+        count = min(len(tiles), n_hands - next_id)
+        seats = np.arange(count) % players
+        prevalent = rng.integers(0, len(_WINDS), walls_needed)[np.arange(count) // players]
+        win_by = (rng.random(count) < 0.5).astype(np.int64)
+        melds_open = (rng.random(count) < 0.3).astype(np.int64)
+        wait = rng.integers(0, len(_WAIT_TYPES), count)
+        meta_ids = (seats * per_seat + prevalent * per_prevalent + win_by * per_win_by
+                    + melds_open * len(_WAIT_TYPES) + wait).tolist()
+        tile_rows = tiles[:count].tolist()
+        for h in range(count):
+            names = [quoted[t] for t in tile_rows[h]]
+            if len(flowers[h]):
+                names += [quoted[t] for t in flowers[h].tolist()]
+            yield f'{{"id":{next_id},"hand":[{",".join(names)}],"meta":{metas[meta_ids[h]]}}}\n'
+            next_id += 1
+
+
+def write_deals(path, n_hands, seed=0, hand_size=14, players=4, compress=False):
+    """Write n_hands dealt hands to path ('-' for stdout, .gz compressed); returns the count."""
+    fp = open_output(path, compress=compress)
+    count = 0
+    try:
+        for line in iter_deal_lines(n_hands, seed, hand_size, players):
+            fp.write(line)
+            count += 1
+    finally:
+        if fp is sys.stdout:
+            fp.flush()
+        else:
+            fp.close()
+    return count
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write random dealt hands as scorer JSON Lines input.")
+    ap.add_argument('-n', '--hands', type=int, default=1_000_000, help="hands to write")
+    ap.add_argument('-o', '--output', default='-', help="output .jsonl or .jsonl.gz (default: stdout)")
+    ap.add_argument('--gzip', action='store_true', help="gzip the output even without a .gz suffix")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--hand-size', type=int, default=14, choices=(13, 14))
+    ap.add_argument('--players', type=int, default=4)
+    args = ap.parse_args(argv)
+    write_deals(args.output, args.hands, args.seed, args.hand_size, args.players, compress=args.gzip)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())